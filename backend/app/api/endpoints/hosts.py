@@ -0,0 +1,62 @@
+import time
+from fastapi import APIRouter
+from app.core.agent import pusher
+from app.core.aggregator import registry
+from app.core.collector import collector
+from app.core.config import MONITOR_MODE, HOST_NAME
+
+router = APIRouter()
+
+@router.get("")
+async def get_hosts():
+    """
+    获取可查询的主机列表
+
+    第一项始终是本机；aggregator模式下还包含所有连接过的agent，
+    在/api/system/*接口上加?host=<name>即可查询对应主机的快照和历史。
+
+    Returns:
+        Dict: 包含以下字段：
+            - mode: 运行模式（standalone/agent/aggregator）
+            - hosts: 主机列表，每项包含：
+                - name: 主机名（MONITOR_HOST_NAME）
+                - local: 是否为本机
+                - online: 是否在线（最近MONITOR_AGGREGATOR_HOST_TIMEOUT秒内收到过数据）
+                - address: agent的连接地址
+                - connected_at/last_seen: 连接建立/最近一次收到数据的时间戳
+                - cpu_percent/cpu_count/memory_percent: 最新快照中的概要信息
+                - frames/samples/bytes: 收到的帧数、数据点数和字节数
+                - history_series: 该主机保存的历史序列数量
+                - alerts_firing: 该主机触发中的告警数量（见/api/system/alerts?host=<name>）
+            - ingest: aggregator的接收统计（仅aggregator模式），含samples_per_sec
+            - agent: 向aggregator推送的状态（仅agent模式）
+
+    示例响应:
+        {
+            "mode": "aggregator",
+            "hosts": [
+                {"name": "monitor-1", "local": true, "online": true, "cpu_percent": 3.1, ...},
+                {"name": "web-01", "local": false, "online": true, "address": "10.0.0.12:53122",
+                 "last_seen": 1648456789.1, "cpu_percent": 45.2, "samples": 18231, ...}
+            ],
+            "ingest": {"listening": true, "connections": 1, "samples_per_sec": 1240, ...}
+        }
+    """
+    cpu = await collector.get_snapshot("cpu")
+    memory = await collector.get_snapshot("memory")
+    local = {
+        "name": HOST_NAME,
+        "local": True,
+        "online": True,
+        "address": None,
+        "last_seen": round(time.time() - cpu["snapshot_age"], 3),
+        "cpu_percent": cpu.get("cpu_percent"),
+        "cpu_count": cpu.get("cpu_count"),
+        "memory_percent": memory.get("memory_percent"),
+    }
+    result = {"mode": MONITOR_MODE, "hosts": [local, *registry.hosts()]}
+    if MONITOR_MODE == "aggregator":
+        result["ingest"] = registry.stats()
+    elif MONITOR_MODE == "agent":
+        result["agent"] = pusher.stats()
+    return result
@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from app.core.collector import collector
+from app.core.openmetrics import CONTENT_TYPE
+
+router = APIRouter()
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    以OpenMetrics文本格式导出所有指标，供Prometheus直接抓取
+    
+    输出由后台采集器的快照渲染，各子系统的文本在快照更新时渲染并缓存，
+    抓取本身只拼接缓存的内容，不会触发采集。
+    
+    示例响应:
+        # TYPE system_cpu_usage_percent gauge
+        # HELP system_cpu_usage_percent Overall CPU utilization over the last sample interval
+        system_cpu_usage_percent 12.5
+        # TYPE system_cpu_core_usage_percent gauge
+        # HELP system_cpu_core_usage_percent Per-core CPU utilization over the last sample interval
+        system_cpu_core_usage_percent{cpu="0"} 40.1
+        ...
+        # EOF
+    """
+    return Response(content=collector.render_metrics(), media_type=CONTENT_TYPE)
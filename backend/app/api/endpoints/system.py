@@ -1,15 +1,67 @@
-from fastapi import APIRouter
-from app.core.system_monitor import SystemMonitor
+import asyncio
+import fnmatch
+import re
+import time
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from app.core.aggregator import registry
+from app.core.alerts import rules as alert_rules
+from app.core.collector import collector
+from app.core.config import HOST_NAME, STREAM_KEEPALIVE
+from app.core.downsample import downsample
+from app.core.instrumentation import instrumentation
+from app.core.processes import SORT_KEYS
+from app.core.sampling import BURST_MIN_INTERVAL, BURST_MAX_DURATION
+from app.core.serialization import encode_response
 from app.schemas.system_info import SystemInfo
 
 router = APIRouter()
-system_monitor = SystemMonitor()
+
+def _source(host: Optional[str]):
+    """
+    按host参数选择数据来源：省略或为本机名时是本机采集器，否则是aggregator中的远程主机
+    
+    Raises:
+        HTTPException: 主机不存在时返回404
+    """
+    if host is None or host == HOST_NAME:
+        return collector
+    remote = registry.get(host)
+    if remote is None:
+        raise HTTPException(status_code=404, detail=f"Unknown host: {host}")
+    return remote
+
+def _respond(request: Request, data) -> Response:
+    """
+    按Accept/Accept-Encoding编码响应：JSON（orjson）或MessagePack，可选gzip/brotli压缩
+    
+    直接编码快照字典，不经过response_model的逐字段校验
+    """
+    body, media_type, headers = encode_response(
+        data, request.headers.get("accept", ""), request.headers.get("accept-encoding", "")
+    )
+    return Response(content=body, media_type=media_type, headers=headers)
+
+async def _snapshot(name: str, host: Optional[str]):
+    """读取本机或远程主机的子系统快照，远程主机尚未上报该子系统时返回404"""
+    try:
+        return await _source(host).get_snapshot(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"No {name} data received from host {host} yet")
 
 @router.get("/info", response_model=SystemInfo)
-async def get_system_info():
+async def get_system_info(request: Request, host: Optional[str] = None):
     """
     获取系统所有监控指标的汇总信息
     
+    本接口和其他/api/system/*快照接口都支持内容协商：Accept为application/msgpack时返回MessagePack，
+    否则返回紧凑JSON；Accept-Encoding包含br或gzip时压缩响应（小于1KB的响应不压缩）。
+    响应直接由快照编码，SystemInfo模型只用于接口文档，不再逐请求校验。
+    
+    Args:
+        host: 主机名（见/api/hosts），省略时为本机；aggregator模式下可查询各agent的数据
+    
     Returns:
         SystemInfo: 包含以下系统信息的对象：
             - timestamp: 数据采集时间戳
@@ -17,6 +69,10 @@ async def get_system_info():
             - memory: 内存和交换空间使用情况
             - disk: 各分区的存储使用情况
             - network: 网络接口的数据传输统计
+            - cgroup: 当前cgroup及各子cgroup（容器）的资源使用
+            - pressure: PSI、系统负载和缺页/换页/OOM计数
+            - sensors: 温度传感器和CPU热降频计数
+            - snapshot_age: 最旧子系统快照距今的秒数
             
     示例响应:
         {
@@ -31,39 +87,58 @@ async def get_system_info():
                 ...
             },
             ...
+            "snapshot_age": 1.2
         }
     """
-    return system_monitor.get_all_info()
+    return _respond(request, await _source(host).get_all())
 
 @router.get("/cpu")
-async def get_cpu_info():
+async def get_cpu_info(request: Request, host: Optional[str] = None):
     """
     获取CPU相关监控指标
     
+    Args:
+        host: 主机名（见/api/hosts），省略时为本机；aggregator模式下可查询各agent的数据
+    
     Returns:
         Dict: 包含以下CPU信息的字典：
+            - cpu_percent: 总体CPU使用率（百分比，为两次采样之间的区间值）
             - cpu_per_core: 每个CPU核心的使用率列表
+            - cpu_breakdown: 总体使用率按user/system/iowait/irq/steal/guest拆分（仅宿主机模式）
+            - cpu_per_core_breakdown: 各类别的每核使用率列表（仅宿主机模式）
             - cpu_freq_current: 当前CPU频率（MHz）
             - cpu_freq_min: CPU最小频率（MHz）
             - cpu_freq_max: CPU最大频率（MHz）
+            - cpu_freq_per_core: 每个核心的当前频率（MHz，离线核心为null；仅宿主机模式且有cpufreq时）
             - cpu_count: CPU核心数量
+            - snapshot_age: 快照距今的秒数
+            - sample_interval: 当前采样周期（秒），见/sampling
             
     示例响应:
         {
+            "cpu_percent": 45.2,
             "cpu_per_core": [40.1, 50.3, 45.6, 44.8],
+            "cpu_breakdown": {"user": 30.1, "system": 10.2, "iowait": 1.5,
+                              "irq": 0.8, "steal": 2.6, "guest": 0.0},
+            "cpu_per_core_breakdown": {"user": [28.0, 35.1, 29.9, 27.4], ...},
             "cpu_freq_current": 2500.0,
             "cpu_freq_min": 800.0,
             "cpu_freq_max": 3200.0,
-            "cpu_count": 4
+            "cpu_freq_per_core": [2400.0, 2600.0, 2500.0, 2500.0],
+            "cpu_count": 4,
+            "snapshot_age": 0.42
         }
     """
-    return system_monitor.get_cpu_info()
+    return _respond(request, await _snapshot("cpu", host))
 
 @router.get("/memory")
-async def get_memory_info():
+async def get_memory_info(request: Request, host: Optional[str] = None):
     """
     获取内存和交换空间使用情况
     
+    Args:
+        host: 主机名（见/api/hosts），省略时为本机；aggregator模式下可查询各agent的数据
+    
     Returns:
         Dict: 包含以下内存信息的字典：
             - memory_total: 总物理内存大小（字节）
@@ -74,6 +149,8 @@ async def get_memory_info():
             - swap_used: 已使用的交换空间大小（字节）
             - swap_free: 可用交换空间大小（字节）
             - swap_percent: 交换空间使用率（百分比）
+            - snapshot_age: 快照距今的秒数
+            - sample_interval: 当前采样周期（秒），见/sampling
             
     示例响应:
         {
@@ -84,18 +161,25 @@ async def get_memory_info():
             "swap_total": 4194304,
             "swap_used": 1048576,
             "swap_free": 3145728,
-            "swap_percent": 25.0
+            "swap_percent": 25.0,
+            "snapshot_age": 1.07
         }
     """
-    return system_monitor.get_memory_info()
+    return _respond(request, await _snapshot("memory", host))
 
 @router.get("/disk")
-async def get_disk_info():
+async def get_disk_info(request: Request, host: Optional[str] = None):
     """
-    获取系统所有磁盘分区的使用情况
+    获取系统所有磁盘分区的使用情况和块设备I/O统计
+    
+    挂载表只在变化时重新解析，同一块设备的多个挂载只保留一个；
+    容量查询在有界线程池中执行并带超时，卡住的挂载点不会阻塞接口。
+    
+    Args:
+        host: 主机名（见/api/hosts），省略时为本机；aggregator模式下可查询各agent的数据
     
     Returns:
-        Dict: 包含磁盘分区信息列表的字典：
+        Dict: 包含磁盘分区信息列表和I/O统计的字典：
             disks: 分区信息列表，每个分区包含：
                 - device: 设备名称
                 - mountpoint: 挂载点
@@ -104,6 +188,16 @@ async def get_disk_info():
                 - used: 已使用空间大小（字节）
                 - free: 可用空间大小（字节）
                 - percent: 使用率（百分比）
+                - stale: 容量查询超时（例如失联的NFS挂载），数据为上一次成功查询的结果
+            io: 块设备I/O列表（来自/proc/diskstats，默认只统计整块磁盘），每个设备包含：
+                - device: 设备名
+                - read_bytes_rate/write_bytes_rate: 读/写吞吐（字节/秒）
+                - read_iops/write_iops: 每秒读/写请求数
+                - await_ms: 请求平均等待时间（毫秒）
+                - util_percent: 设备繁忙度（百分比）
+                - queue_depth: 平均队列深度
+            snapshot_age: 快照距今的秒数
+            sample_interval: 当前采样周期（秒），见/sampling
                 
     示例响应:
         {
@@ -115,32 +209,668 @@ async def get_disk_info():
                     "total": 250790436864,
                     "used": 168732672000,
                     "free": 82057764864,
-                    "percent": 67.3
+                    "percent": 67.3,
+                    "stale": false
                 },
                 ...
-            ]
+            ],
+            "io": [
+                {
+                    "device": "sda",
+                    "read_bytes_rate": 1048576.0,
+                    "write_bytes_rate": 524288.0,
+                    "read_iops": 120.0,
+                    "write_iops": 45.5,
+                    "await_ms": 0.84,
+                    "util_percent": 12.3,
+                    "queue_depth": 0.15
+                },
+                ...
+            ],
+            "snapshot_age": 3.5
         }
     """
-    return system_monitor.get_disk_info()
+    return _respond(request, await _snapshot("disk", host))
 
 @router.get("/network")
-async def get_network_info():
+async def get_network_info(request: Request, host: Optional[str] = None):
     """
     获取网络接口的数据传输统计信息
     
+    只统计通过过滤规则的接口（MONITOR_NET_INCLUDE / MONITOR_NET_EXCLUDE），
+    速率由后台采集器根据相邻两次采样的计数差和单调时钟时间差计算。
+    
+    Args:
+        host: 主机名（见/api/hosts），省略时为本机；aggregator模式下可查询各agent的数据
+    
     Returns:
         Dict: 包含以下网络统计信息的字典：
             - bytes_sent: 发送的总字节数
             - bytes_recv: 接收的总字节数
             - packets_sent: 发送的数据包总数
             - packets_recv: 接收的数据包总数
+            - bytes_sent_rate/bytes_recv_rate: 发送/接收速率（字节/秒）
+            - packets_sent_rate/packets_recv_rate: 发送/接收速率（包/秒）
+            - interfaces: 每个接口的计数（含errin/errout/dropin/dropout）和速率
+            - snapshot_age: 快照距今的秒数
+            - sample_interval: 当前采样周期（秒），见/sampling
             
     示例响应:
         {
             "bytes_sent": 1048576,
             "bytes_recv": 2097152,
             "packets_sent": 1000,
-            "packets_recv": 2000
+            "packets_recv": 2000,
+            "bytes_sent_rate": 5120.0,
+            "bytes_recv_rate": 20480.0,
+            "packets_sent_rate": 12.5,
+            "packets_recv_rate": 30.0,
+            "interfaces": [
+                {
+                    "name": "eth0",
+                    "bytes_recv": 2097152,
+                    "packets_recv": 2000,
+                    "errin": 0,
+                    "dropin": 0,
+                    "bytes_sent": 1048576,
+                    "packets_sent": 1000,
+                    "errout": 0,
+                    "dropout": 0,
+                    "bytes_recv_rate": 20480.0,
+                    "packets_recv_rate": 30.0,
+                    "bytes_sent_rate": 5120.0,
+                    "packets_sent_rate": 12.5
+                }
+            ],
+            "snapshot_age": 0.8
+        }
+    """
+    return _respond(request, await _snapshot("network", host))
+
+@router.get("/pressure")
+async def get_pressure_info(request: Request, host: Optional[str] = None):
+    """
+    获取系统饱和度指标：PSI（Pressure Stall Information）、负载和vmstat计数
+    
+    使用率只说明资源被用了多少，PSI说明任务因为等待资源而停顿了多久，更适合判断是否过载。
+    默认每0.5秒采样一次（MONITOR_PRESSURE_INTERVAL）。
+    
+    Args:
+        host: 主机名（见/api/hosts），省略时为本机；aggregator模式下可查询各agent的数据
+    
+    Returns:
+        Dict: 包含以下字段：
+            - cpu/memory/io: 各资源的PSI，内核未启用PSI时为null：
+                - some_avg10/some_avg60/some_avg300: 至少一个任务停顿的时间占比（内核计算的指数平均）
+                - some_percent: 本采样区间内至少一个任务停顿的时间占比
+                - full_*: 所有非空闲任务同时停顿的时间占比（含义同上）
+            - load1/load5/load15: 1/5/15分钟系统负载
+            - procs_running/procs_total: 可运行的/全部调度实体数
+            - pgmajfault_rate: 主缺页次数（次/秒）
+            - pswpin_rate/pswpout_rate: 换入/换出页数（页/秒）
+            - oom_kill: 开机以来的OOM kill次数
+            - oom_kill_delta: 本采样区间内新增的OOM kill次数
+            - snapshot_age: 快照距今的秒数
+            - sample_interval: 当前采样周期（秒），见/sampling
+            
+    示例响应:
+        {
+            "cpu": {"some_avg10": 3.83, "some_avg60": 1.84, "some_avg300": 1.34, "some_percent": 4.1,
+                    "full_avg10": 0.0, "full_avg60": 0.0, "full_avg300": 0.0, "full_percent": 0.0},
+            "memory": {...},
+            "io": {...},
+            "load1": 0.22,
+            "load5": 0.11,
+            "load15": 0.08,
+            "procs_running": 2,
+            "procs_total": 412,
+            "pgmajfault_rate": 0.0,
+            "pswpin_rate": 0.0,
+            "pswpout_rate": 0.0,
+            "oom_kill": 0,
+            "oom_kill_delta": 0,
+            "snapshot_age": 0.21
+        }
+    """
+    return _respond(request, await _snapshot("pressure", host))
+
+@router.get("/sensors")
+async def get_sensors_info(request: Request, host: Optional[str] = None):
+    """
+    获取温度传感器和CPU热降频计数
+    
+    hwmon、thermal zone和thermal_throttle的属性文件在首次采样时发现并保持打开，之后每次采样
+    每个文件只有一次pread。默认每5秒采样一次（MONITOR_SENSORS_INTERVAL）。各核心频率见/cpu的cpu_freq_per_core。
+    
+    Args:
+        host: 主机名（见/api/hosts），省略时为本机；aggregator模式下可查询各agent的数据
+    
+    Returns:
+        Dict: 包含以下字段：
+            - temperatures: hwmon温度传感器列表（sensor驱动名、label、current/high/critical，摄氏度；
+              读取失败时current为null，没有阈值时high/critical为null）
+            - thermal_zones: thermal zone列表（zone为目录名thermal_zoneN，type为类型，同一类型可能有多个zone；current）
+            - cpu_temperature: CPU温度传感器中的最高值，没有时为null
+            - max_temperature: 所有传感器中的最高值，没有时为null
+            - throttle: CPU热降频计数（仅宿主机模式的x86），不支持时为null：
+                - core_events/package_events: 开机以来按物理核心/CPU封装累计的降频次数
+                - core_events_rate/package_events_rate: 本采样区间内的每秒降频次数
+                - throttled_cpus: 本采样区间内发生降频的逻辑CPU
+            - snapshot_age: 快照距今的秒数
+            - sample_interval: 当前采样周期（秒），见/sampling
+            
+    示例响应:
+        {
+            "temperatures": [
+                {"sensor": "coretemp", "label": "Package id 0", "current": 54.0, "high": 80.0, "critical": 100.0},
+                {"sensor": "coretemp", "label": "Core 0", "current": 51.0, "high": 80.0, "critical": 100.0},
+                {"sensor": "nvme", "label": "Composite", "current": 38.9, "high": 81.8, "critical": 84.8},
+                ...
+            ],
+            "thermal_zones": [{"zone": "thermal_zone0", "type": "acpitz", "current": 27.8},
+                              {"zone": "thermal_zone1", "type": "x86_pkg_temp", "current": 54.0}, ...],
+            "cpu_temperature": 54.0,
+            "max_temperature": 54.0,
+            "throttle": {"core_events": 12, "package_events": 3, "core_events_rate": 0.0,
+                         "package_events_rate": 0.0, "throttled_cpus": []},
+            "snapshot_age": 1.3
+        }
+    """
+    return _respond(request, await _snapshot("sensors", host))
+
+@router.get("/cgroups")
+async def get_cgroup_info(request: Request, host: Optional[str] = None):
+    """
+    获取cgroup（容器）级别的资源使用和限流情况
+    
+    支持cgroup v2以及v1（混合模式下从unified层级读取cpu.pressure）。设置MONITOR_CGROUP_ROOT后
+    同时统计该路径下的各子cgroup（例如/system.slice下的docker-*.scope），子cgroup较多时分批轮流读取。
+    
+    Args:
+        host: 主机名（见/api/hosts），省略时为本机；aggregator模式下可查询各agent的数据
+    
+    Returns:
+        Dict: 包含以下字段：
+            - version: cgroup版本
+            - current: 当前进程所在cgroup的资源使用
+            - root: 子cgroup的根路径
+            - children: 各子cgroup的资源使用，每项包含：
+                - name: 相对于root的路径
+                - cpu_percent: CPU使用率（百分比，单核满载为100）
+                - cpu_limit: CPU配额（核数，0表示不限制）
+                - cpu_limit_percent: 相对于配额的使用率
+                - throttled_percent: 被限流的调度周期占比（百分比）
+                - throttled_time: 累计被限流的时间（秒）
+                - memory_current: 内存用量（字节，含页缓存）
+                - memory_working_set: 工作集（字节）
+                - memory_limit: 内存限制（字节，0表示不限制）
+                - memory_percent: 工作集占内存限制的百分比
+                - io_read_bytes_rate/io_write_bytes_rate: 读/写吞吐（字节/秒）
+                - cpu_pressure_some/cpu_pressure_full: CPU压力的10秒平均值（百分比，不可用时为null）
+            - snapshot_age: 快照距今的秒数
+            - sample_interval: 当前采样周期（秒），见/sampling
+            
+    示例响应:
+        {
+            "version": 2,
+            "current": {"name": "/", "cpu_percent": 3.2, "cpu_limit": 2.0, ...},
+            "root": "/system.slice",
+            "children": [
+                {
+                    "name": "/docker-3f2a9c.scope",
+                    "cpu_percent": 185.0,
+                    "cpu_limit": 2.0,
+                    "cpu_limit_percent": 92.5,
+                    "throttled_percent": 41.7,
+                    "throttled_time": 12.875,
+                    "memory_current": 536870912,
+                    "memory_working_set": 402653184,
+                    "memory_limit": 1073741824,
+                    "memory_percent": 37.5,
+                    "io_read_bytes_rate": 0.0,
+                    "io_write_bytes_rate": 40960.0,
+                    "cpu_pressure_some": 12.5,
+                    "cpu_pressure_full": 3.1
+                },
+                ...
+            ],
+            "snapshot_age": 1.2
+        }
+    """
+    return _respond(request, await _snapshot("cgroup", host))
+
+@router.get("/processes")
+async def get_processes(request: Request, sort: str = "cpu", limit: int = Query(20, ge=1, le=500)):
+    """
+    获取资源占用最高的进程
+    
+    进程表按需增量扫描：CPU占用最高的进程每次都会重新读取，其余进程分批轮流读取，
+    每个进程大约每MONITOR_PROCESS_ROTATION秒（默认20秒）至少读取一次，
+    CPU使用率由每个进程两次读取之间的jiffies增量计算（单核满载为100%）。
+    
+    Args:
+        sort: 排序字段，cpu（CPU使用率）或memory（常驻内存）
+        limit: 返回的进程数量（1-500）
+    
+    Returns:
+        Dict: 包含以下字段：
+            - timestamp: 数据采集时间戳
+            - total: 进程总数
+            - sort: 排序字段
+            - max_age: 非热点进程数据的最长滞后（秒）
+            - processes: 进程列表，每个进程包含：
+                - pid: 进程ID
+                - name: 进程名
+                - state: 进程状态（R运行、S睡眠、D不可中断等）
+                - cpu_percent: CPU使用率（百分比）
+                - memory_rss: 常驻内存（字节）
+                - memory_percent: 常驻内存占总内存的百分比
+                - num_threads: 线程数
+            
+    示例响应:
+        {
+            "timestamp": 1648456789.123,
+            "total": 412,
+            "sort": "cpu",
+            "max_age": 18.4,
+            "processes": [
+                {
+                    "pid": 1234,
+                    "name": "python3",
+                    "state": "R",
+                    "cpu_percent": 87.5,
+                    "memory_rss": 268435456,
+                    "memory_percent": 1.6,
+                    "num_threads": 12
+                },
+                ...
+            ]
+        }
+    """
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"Unsupported sort: {sort}, expected one of {', '.join(SORT_KEYS)}")
+    return _respond(request, await collector.get_processes(sort, limit))
+
+@router.get("/stream")
+async def stream_system_info():
+    """
+    以Server-Sent Events方式推送所有监控指标，替代客户端轮询
+    
+    连接建立后先发送一条snapshot事件（格式与/info相同），之后采集器每完成一次采样，
+    推送一条delta事件，只包含发生变化的子系统字段。所有订阅者共享同一份编码结果。
+    
+    事件格式:
+        event: snapshot
+        data: {"timestamp": 1648456789.123, "cpu": {...}, "memory": {...}, ...}
+        
+        event: delta
+        data: {"timestamp": 1648456791.123, "cpu": {"cpu_percent": 12.5, "cpu_per_core": [...]}}
+        
+        event: alerts
+        data: {"timestamp": 1648456791.123, "change": {"rule": "memory-high", "state": "firing", ...},
+               "alerts": [{"rule": "memory-high", "metric": "memory.memory_percent", ...}]}
+    
+    alerts事件在连接建立时发送一次（change为null），之后每当告警触发或恢复时发送，
+    alerts字段始终是当前所有触发中的告警。
+    """
+    queue = collector.stream.subscribe()
+    
+    async def events():
+        try:
+            yield collector.stream.snapshot_event(await collector.get_all())
+            yield collector.stream.encode("alerts", {"timestamp": time.time(), "change": None,
+                                                     "alerts": collector.alerts.firing()})
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if message is None:
+                    break
+                yield message
+        finally:
+            collector.stream.unsubscribe(queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # 禁止nginx缓冲推送流
+        }
+    )
+
+@router.get("/history")
+async def get_history(request: Request, metric: str, since: float = -600, until: Optional[float] = None,
+                      step: Optional[float] = None, points: Optional[int] = Query(None, ge=3, le=100000),
+                      host: Optional[str] = None):
+    """
+    获取指标的历史时间序列（由后台采集器写入的环形缓冲区）
+    
+    启用持久化（MONITOR_STORAGE_DIR）时，起始时间早于本次启动或超出内存保留时长的查询
+    从磁盘上的段文件读取，未指定step时按最多1000个点自动选择步长。
+    
+    Args:
+        metric: 指标名称，例如 cpu.percent、cpu.core.3、memory.memory_percent、
+                disk./.percent、network.bytes_recv_rate，完整列表见 /history/metrics
+        since: 起始时间，正数为Unix时间戳，零或负数表示相对当前时间的秒数（默认最近10分钟）
+        until: 结束时间（Unix时间戳），默认为当前时间
+        step: 返回数据的步长（秒），会自动选择合适的存储分辨率（1秒/10秒/1分钟）并在桶内取平均
+        points: 最多返回的点数（通常取图表的像素宽度），超出时用LTTB降采样：与按步长取平均不同，
+                尖峰和谷底会被保留，返回的时间戳不再等距
+        host: 主机名（见/api/hosts），省略时为本机
+    
+    Returns:
+        Dict: 包含以下字段：
+            - metric: 指标名称
+            - resolution: 实际使用的存储分辨率（秒）
+            - step: 返回数据的步长（秒）
+            - timestamps: 每个数据点的时间戳列表
+            - values: 对应的值列表，缺失数据为null
+            - points: 实际返回的点数（仅指定points时）
+            
+    示例响应:
+        {
+            "metric": "cpu.percent",
+            "resolution": 10,
+            "step": 30,
+            "timestamps": [1648456770, 1648456800, ...],
+            "values": [12.5, 14.1, ...]
+        }
+    """
+    if since <= 0:
+        since = time.time() + since
+    result = await asyncio.to_thread(_query_history, _source(host), metric, since, until, step, points)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Unknown metric: {metric}")
+    return _respond(request, result)
+
+def _query_history(source, metric: str, since: float, until: Optional[float], step: Optional[float],
+                   points: Optional[int]):
+    """查询一个指标的历史并按需降采样（在线程池中执行）"""
+    result = source.query_history(metric, since, until, step)
+    if result is not None and points:
+        result = downsample(result, points)
+    return result
+
+def _natural_key(name: str):
+    """按数字大小排序指标名（cpu.core.2排在cpu.core.10之前）"""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+@router.get("/history/series")
+async def get_history_series(request: Request, metric: str, since: float = -600, until: Optional[float] = None,
+                             step: Optional[float] = None, points: Optional[int] = Query(None, ge=3, le=100000),
+                             limit: int = Query(256, ge=1, le=4096), host: Optional[str] = None):
+    """
+    一次获取多个指标的历史，例如全部核心（cpu.core.*）
+    
+    参数与/history相同，metric可以包含*通配符或用逗号分隔多个名称/模式；每个序列单独按points降采样。
+    
+    Args:
+        metric: 指标名称或模式，例如 cpu.core.*、network.*.bytes_recv_rate
+        limit: 最多返回的序列数量（按名称排序，数字按大小）
+    
+    Returns:
+        Dict: 包含以下字段：
+            - series: 每个匹配指标的历史，格式与/history相同
+            - truncated: 匹配的指标是否超过limit
+    """
+    if since <= 0:
+        since = time.time() + since
+    source = _source(host)
+    names = set(source.history.names())
+    if source is collector and collector.storage is not None:
+        names.update(await asyncio.to_thread(collector.storage.names))
+    matched = set()
+    for pattern in metric.split(","):
+        pattern = pattern.strip()
+        matched.update(fnmatch.filter(names, pattern) if "*" in pattern else [pattern] if pattern in names else [])
+    matched = sorted(matched, key=_natural_key)
+
+    def query():
+        series = []
+        for name in matched[:limit]:
+            result = _query_history(source, name, since, until, step, points)
+            if result is not None:
+                series.append(result)
+        return series
+
+    return _respond(request, {"series": await asyncio.to_thread(query), "truncated": len(matched) > limit})
+
+@router.get("/history/metrics")
+async def get_history_metrics(request: Request, host: Optional[str] = None):
+    """
+    获取所有已记录历史的指标名称
+    
+    Args:
+        host: 主机名（见/api/hosts），省略时为本机；aggregator模式下可查询各agent的数据
+    
+    Returns:
+        Dict: 包含以下字段：
+            - metrics: 指标名称列表（启用持久化时包含磁盘上的指标）
+            - memory_bytes: 历史数据占用的内存（字节）
+            - storage: 持久化存储的目录、段文件数量、占用磁盘空间和累计写入字节数（仅启用持久化时）
+    """
+    source = _source(host)
+    result = {
+        "metrics": source.history.names(),
+        "memory_bytes": source.history.nbytes()
+    }
+    if source is collector and collector.storage is not None:
+        stored = await asyncio.to_thread(collector.storage.names)
+        result["metrics"] = sorted(set(result["metrics"]).union(stored))
+        result["storage"] = await asyncio.to_thread(collector.storage.stats)
+    return _respond(request, result)
+
+@router.get("/self")
+async def get_self_info(request: Request):
+    """
+    获取监控程序自身的开销：后端进程的CPU和内存占用，以及每个采集函数的耗时和错误统计
+    
+    可据此为采集设定开销预算，并在提高采样频率后检查回归。统计从进程启动开始累计。
+    
+    Returns:
+        Dict: 包含以下字段：
+            - timestamp: 数据时间戳
+            - process: 后端进程的资源占用
+                - pid: 进程ID
+                - uptime: 运行时长（秒）
+                - cpu_percent: 距上一次请求的平均CPU使用率（单核满载为100%）
+                - cpu_user_seconds / cpu_system_seconds: 累计CPU时间
+                - memory_rss / memory_vms: 常驻内存和虚拟内存（字节）
+                - num_threads: 线程数
+                - num_fds: 打开的文件描述符数
+            - collector_cpu_percent: 采集本身平均占用的CPU（单核百分比）
+            - bytes_read: 所有采集从/proc和/sys读取的字节数
+            - errors: 错误总数
+            - fallbacks: 读取宿主机失败后回退到psutil的总次数
+            - collectors: 每个采集（cpu、memory、disk、network、cgroup、pressure、sensors、processes，
+              以及渲染OpenMetrics文本的openmetrics）的统计：
+                - calls / errors / fallbacks / bytes_read: 调用次数、错误次数、回退次数、读取字节数
+                - total_seconds / cpu_seconds: 累计墙钟耗时和CPU时间
+                - mean_ms / p50_ms / p99_ms / max_ms / last_ms: 单次耗时（分位数由直方图估计，取桶上界）
+                - histogram: 耗时直方图，le为各桶上界（秒），counts为累计计数
+                - last_error / last_error_at: 最近一次错误信息和时间
+            
+    示例响应:
+        {
+            "timestamp": 1648456789.123,
+            "process": {"pid": 1, "uptime": 3600.2, "cpu_percent": 1.8, "memory_rss": 52428800, ...},
+            "collector_cpu_percent": 0.9,
+            "bytes_read": 73400320,
+            "errors": 0,
+            "fallbacks": 0,
+            "collectors": {
+                "cpu": {
+                    "calls": 3600,
+                    "mean_ms": 0.412,
+                    "p99_ms": 1.0,
+                    "bytes_read": 11520000,
+                    "histogram": {"le": [0.0005, 0.001, ..., "+Inf"], "counts": [3012, 3580, ..., 3600]},
+                    ...
+                },
+                ...
+            }
         }
     """
-    return system_monitor.get_network_info()
\ No newline at end of file
+    return _respond(request, await asyncio.to_thread(instrumentation.summary))
+
+@router.get("/sampling")
+async def get_sampling(request: Request):
+    """
+    获取各子系统的采样周期
+    
+    启用自适应采样（MONITOR_ADAPTIVE_SAMPLING，默认开启）时，子系统在没有客户端
+    （轮询、推送流订阅者或/metrics抓取）且指标稳定时逐次把周期翻倍，最长到MONITOR_ADAPTIVE_MAX_INTERVAL，
+    客户端访问或指标变化时立即恢复基础周期；POST /burst可以临时切换为高频采样。
+    
+    Returns:
+        Dict: 包含以下字段：
+            - adaptive: 是否启用自适应采样
+            - sections: 每个子系统的采样状态：
+                - base_interval: 基础周期（秒）
+                - interval: 当前周期（秒）
+                - last_sample: 最近一次采样的时间戳
+                - burst: 正在进行或最近一次的高频采样（interval、started、until、active、samples），没有时为null
+    
+    示例响应:
+        {
+            "adaptive": true,
+            "sections": {
+                "cpu": {"base_interval": 2.0, "interval": 0.1, "last_sample": 1648456789.1,
+                        "burst": {"interval": 0.1, "started": 1648456760.0, "until": 1648456820.0,
+                                  "active": true, "samples": 291}},
+                "disk": {"base_interval": 10.0, "interval": 40.0, "last_sample": 1648456750.3, "burst": null},
+                ...
+            }
+        }
+    """
+    return _respond(request, collector.sampling())
+
+def _section(section: str) -> str:
+    """校验子系统名称"""
+    if section not in collector.intervals:
+        raise HTTPException(status_code=404, detail=f"Unknown section: {section}")
+    return section
+
+@router.post("/burst")
+async def start_burst(request: Request, section: str = "cpu",
+                      interval: float = Query(0.1, ge=BURST_MIN_INTERVAL),
+                      duration: float = Query(60, gt=0, le=BURST_MAX_DURATION)):
+    """
+    临时以高频采样一个子系统（例如排查问题时以100毫秒采样CPU 60秒）
+    
+    期间的每次采样以原始精度保存，可通过GET /burst查询（历史的最小分辨率为1秒，
+    高频数据会被平均）；采样同时照常写入历史、告警和推送流。结束后恢复原来的周期，
+    对同一子系统再次请求会替换正在进行的高频采样。
+    
+    Args:
+        section: 子系统（cpu、memory、disk、network、cgroup、pressure、sensors）
+        interval: 采样周期（秒），最短0.05
+        duration: 持续时间（秒），最长600
+    
+    Returns:
+        Dict: section、interval、started、until、active、samples
+    """
+    return _respond(request, collector.burst(_section(section), interval, duration))
+
+@router.get("/burst")
+async def get_burst(request: Request, metric: str, section: Optional[str] = None):
+    """
+    获取正在进行或最近一次高频采样中某个指标的原始采样
+    
+    Args:
+        metric: 指标名称（与/history相同，例如cpu.percent、cpu.core.0）
+        section: 子系统，省略时取指标名的第一段
+    
+    Returns:
+        Dict: 包含metric、interval、started、until、active、samples，
+        以及timestamps和values（一一对应，采样中缺少该指标时为null）
+    
+    示例响应:
+        {
+            "metric": "cpu.percent",
+            "interval": 0.1,
+            "started": 1648456760.0,
+            "until": 1648456820.0,
+            "active": false,
+            "samples": 600,
+            "timestamps": [1648456760.1, 1648456760.2, ...],
+            "values": [12.5, 80.0, ...]
+        }
+    """
+    result = collector.burst_samples(_section(section or metric.split(".", 1)[0]), metric)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"No burst samples for metric: {metric}")
+    return _respond(request, result)
+
+@router.get("/alerts")
+async def get_alerts(request: Request, host: Optional[str] = None):
+    """
+    获取当前的告警
+    
+    告警规则（MONITOR_ALERT_RULES，未设置时为内置规则）在每次采样写入历史时由服务端增量求值：
+    条件成立后进入pending，持续成立满for秒后变为firing，条件不再成立时恢复。
+    规则中的指标名与/history/metrics相同，可以包含*通配符（例如disk.*.percent），
+    每个匹配的指标单独求值。
+    
+    Args:
+        host: 主机名（见/api/hosts），省略时为本机；aggregator模式下各agent的数据按相同规则独立求值
+    
+    Returns:
+        Dict: 包含以下字段：
+            - timestamp: 数据时间戳
+            - alerts: 触发中（firing）和待定（pending）的告警，firing在前，每项包含：
+                - rule: 规则名称
+                - metric: 指标名称
+                - expr: 规则表达式
+                - severity: 严重程度
+                - state: firing或pending
+                - value: 最近一次求值时的（聚合后的）指标值
+                - threshold: 阈值
+                - since: 条件开始成立的时间戳
+                - fired_at: 开始触发的时间戳（pending时为null）
+            - recent: 最近的状态变化（firing/resolved）事件，按时间顺序
+            - stats: 规则数、求值中的序列数、滑动窗口数和累计求值次数
+    
+    示例响应:
+        {
+            "timestamp": 1648456789.123,
+            "alerts": [
+                {
+                    "rule": "disk-full",
+                    "metric": "disk./data.percent",
+                    "expr": "disk.*.percent > 85",
+                    "severity": "warning",
+                    "state": "firing",
+                    "value": 91.2,
+                    "threshold": 85.0,
+                    "since": 1648450000.0,
+                    "fired_at": 1648450000.0
+                }
+            ],
+            "recent": [...],
+            "stats": {"rules": 4, "series": 7, "windows": 7, "evaluations": 182733}
+        }
+    """
+    engine = _source(host).alerts
+    return _respond(request, {
+        "timestamp": time.time(),
+        "alerts": engine.active(),
+        "recent": list(engine.recent),
+        "stats": engine.stats()
+    })
+
+@router.get("/alerts/rules")
+async def get_alert_rules(request: Request):
+    """
+    获取已编译的告警规则
+    
+    规则表达式的格式为「聚合(指标, 窗口秒数) 比较符 阈值」或「指标 比较符 阈值」：
+    聚合为avg、min、max或last（省略时为last，窗口省略时为60秒），比较符为>、>=、<、<=、==、!=。
+    
+    Returns:
+        Dict: 包含rules字段，每条规则包含name、expr、metric、aggregate、window、op、threshold、for、severity
+    """
+    return _respond(request, {"rules": [rule.to_dict() for rule in alert_rules]})
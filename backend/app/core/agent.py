@@ -0,0 +1,111 @@
+import asyncio
+from collections import deque
+from typing import Dict, Any, Deque, Optional, Tuple
+
+from app.core.config import HOST_NAME, AGGREGATOR_ADDRESS, AGENT_BATCH_INTERVAL, AGENT_MAX_PENDING, parse_address
+from app.core.wire import BatchEncoder, encode_hello
+
+# 重连的退避间隔（秒）
+RECONNECT_MIN = 1.0
+RECONNECT_MAX = 30.0
+
+
+class AgentPusher:
+    """
+    agent模式下把本机采样推送给aggregator
+
+    作为采集器的sink注册，每次采样后submit()只把采样放入有界队列；后台任务按
+    AGENT_BATCH_INTERVAL把队列中的所有采样编码为一帧（wire.BatchEncoder）写入长连接。
+    与aggregator断开期间采样继续排队，队列满时丢弃最旧的采样；断线后自动按指数退避重连，
+    重连后新的编码器会先发送完整快照和指标定义。
+    """
+
+    def __init__(self, address: str = AGGREGATOR_ADDRESS, host: str = HOST_NAME,
+                 batch_interval: float = AGENT_BATCH_INTERVAL, max_pending: int = AGENT_MAX_PENDING):
+        self.host = host
+        self.address = parse_address(address, 9100)
+        self.batch_interval = batch_interval
+        self._pending: Deque[Tuple[str, float, Dict[str, Any], Dict[str, float]]] = deque(maxlen=max_pending)
+        self._task: Optional[asyncio.Task] = None
+        self.connected = False
+        self.sent_frames = 0
+        self.sent_bytes = 0
+        self.dropped = 0
+
+    def submit(self, name: str, timestamp: float, data: Dict[str, Any], points: Dict[str, float]) -> None:
+        """采集器sink：在事件循环中调用，只入队不做编码"""
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+        self._pending.append((name, timestamp, data, points))
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="agent-pusher")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        """连接aggregator并循环推送，连接失败或断开时退避重连"""
+        delay = RECONNECT_MIN
+        while True:
+            writer = None
+            try:
+                _, writer = await asyncio.open_connection(*self.address)
+                writer.write(encode_hello(self.host))
+                await writer.drain()
+                self.connected = True
+                delay = RECONNECT_MIN
+                print(f"Agent connected to aggregator {self.address[0]}:{self.address[1]} as {self.host}")
+                await self._push(writer)
+            except (OSError, asyncio.IncompleteReadError) as e:
+                if self.connected:
+                    print(f"Agent lost connection to aggregator: {e}")
+            finally:
+                self.connected = False
+                if writer is not None:
+                    writer.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX)
+
+    async def _push(self, writer: asyncio.StreamWriter) -> None:
+        """在一个连接上按批次推送，直到连接出错"""
+        encoder = BatchEncoder()
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            pending = self._pending
+            while pending:
+                name, timestamp, data, points = pending.popleft()
+                encoder.add_points(timestamp, points)
+                encoder.add_snapshot(name, timestamp, data)
+            payload = encoder.flush()
+            if payload is not None:
+                writer.write(payload)
+                await writer.drain()
+                self.sent_frames += 1
+                self.sent_bytes += len(payload)
+            if writer.is_closing():
+                raise ConnectionResetError("connection closed")
+            next_tick += self.batch_interval
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            if loop.time() > next_tick + self.batch_interval:
+                next_tick = loop.time()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "host": self.host,
+            "aggregator": f"{self.address[0]}:{self.address[1]}",
+            "connected": self.connected,
+            "pending": len(self._pending),
+            "sent_frames": self.sent_frames,
+            "sent_bytes": self.sent_bytes,
+            "dropped": self.dropped,
+        }
+
+
+# 全局推送器，agent模式下由main.py中的应用生命周期启动
+pusher = AgentPusher()
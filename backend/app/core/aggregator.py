@@ -0,0 +1,271 @@
+import asyncio
+import time
+from typing import Dict, Any, List, Optional, Set
+
+from app.core.alerts import AlertEngine, rules as alert_rules
+from app.core.config import (
+    INGEST_LISTEN, AGGREGATOR_RETENTION, AGGREGATOR_MAX_SERIES, AGGREGATOR_MAX_HOSTS,
+    AGGREGATOR_HOST_TIMEOUT, AGGREGATOR_HOST_RETENTION, parse_address,
+)
+from app.core.history import HistoryStore
+from app.core.wire import (
+    FRAME_HELLO, FRAME_BATCH, MAX_FRAME_SIZE, BatchDecoder, WireError, decode_hello, parse_header,
+)
+
+# 远程主机快照包含的子系统，与采集器一致
+SECTIONS = ("cpu", "memory", "disk", "network", "cgroup", "pressure", "sensors")
+
+
+class RemoteHost:
+    """
+    aggregator中单台远程主机的状态：各子系统的最新快照和独立的历史环形缓冲区
+
+    提供与MetricsCollector相同的get_snapshot()/get_all()/history接口，
+    /api/system/*接口通过host参数在本机采集器和远程主机之间切换。
+    """
+
+    def __init__(self, name: str, retention: Dict[int, float], max_series: int):
+        self.name = name
+        self.history = HistoryStore(retention, max_series)
+        # 与本机相同的告警规则，按该主机的数据独立求值
+        self.alerts = AlertEngine(alert_rules)
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._timestamps: Dict[str, float] = {}
+        self.address: Optional[str] = None
+        self.connected = False
+        # 当前的连接：同名agent重新连接时旧连接可能尚未关闭，只有当前连接断开时才标记为未连接
+        self.connection: Optional[asyncio.StreamWriter] = None
+        self.connected_at: Optional[float] = None
+        self.last_seen = 0.0
+        self.frames = 0
+        self.samples = 0
+        self.bytes = 0
+
+    def record(self, timestamp: float, points: Dict[str, float]) -> None:
+        """写入agent发送的一次采样：历史和告警求值"""
+        self.history.record(timestamp, points)
+        self.alerts.observe(timestamp, points)
+
+    def update_snapshot(self, section: str, timestamp: float, changed: Dict[str, Any]) -> None:
+        """合并agent发送的增量（只包含变化的顶层字段）"""
+        snapshot = self._snapshots.get(section)
+        # 整体替换字典，读取方拿到的旧快照不会被修改
+        self._snapshots[section] = {**snapshot, **changed} if snapshot is not None else changed
+        self._timestamps[section] = timestamp
+
+    def snapshot_age(self, section: str) -> float:
+        return round(max(0.0, time.time() - self._timestamps[section]), 3)
+
+    async def get_snapshot(self, name: str) -> Dict[str, Any]:
+        """
+        读取指定子系统的最新快照
+
+        Raises:
+            KeyError: 该主机尚未上报此子系统
+        """
+        return {**self._snapshots[name], "snapshot_age": self.snapshot_age(name)}
+
+    async def get_all(self) -> Dict[str, Any]:
+        """读取所有子系统的快照，尚未上报的子系统为空字典"""
+        result: Dict[str, Any] = {"timestamp": time.time()}
+        for name in SECTIONS:
+            result[name] = self._snapshots.get(name, {})
+        ages = [self.snapshot_age(name) for name in self._timestamps]
+        result["snapshot_age"] = max(ages) if ages else 0.0
+        return result
+
+    def query_history(self, metric: str, since: float, until: Optional[float] = None,
+                      step: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        return self.history.query(metric, since, until, step)
+
+    def online(self, now: float, timeout: float) -> bool:
+        return self.connected or now - self.last_seen <= timeout
+
+    def summary(self, now: float, timeout: float) -> Dict[str, Any]:
+        cpu = self._snapshots.get("cpu", {})
+        memory = self._snapshots.get("memory", {})
+        return {
+            "name": self.name,
+            "local": False,
+            "online": self.online(now, timeout),
+            "address": self.address,
+            "connected_at": self.connected_at,
+            "last_seen": self.last_seen,
+            "cpu_percent": cpu.get("cpu_percent"),
+            "cpu_count": cpu.get("cpu_count"),
+            "memory_percent": memory.get("memory_percent"),
+            "frames": self.frames,
+            "samples": self.samples,
+            "bytes": self.bytes,
+            "history_series": len(self.history.names()),
+            "alerts_firing": len(self.alerts.firing()),
+        }
+
+
+class HostRegistry:
+    """
+    aggregator：接收agent连接并维护各主机的状态
+
+    每个agent一个长连接，事件循环中按帧读取（4字节长度前缀），解码与写入历史都在事件循环中完成：
+    一帧是agent在一个批次间隔内的全部采样，解码只涉及varint和float32数组，
+    单个进程可以处理每秒数千帧、数十万个数据点。
+    """
+
+    def __init__(self, retention: Optional[Dict[int, float]] = None, max_series: int = AGGREGATOR_MAX_SERIES,
+                 max_hosts: int = AGGREGATOR_MAX_HOSTS, host_timeout: float = AGGREGATOR_HOST_TIMEOUT,
+                 host_retention: float = AGGREGATOR_HOST_RETENTION):
+        self.retention = dict(retention or AGGREGATOR_RETENTION)
+        self.max_series = max_series
+        self.max_hosts = max_hosts
+        self.host_timeout = host_timeout
+        self.host_retention = host_retention
+        self._hosts: Dict[str, RemoteHost] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self.connections = 0
+        self.frames = 0
+        self.samples = 0
+        self.bytes = 0
+        self.errors = 0
+        # 最近一个完整秒的接收速率
+        self._rate_second = 0
+        self._rate_samples = 0
+        self.samples_per_sec = 0
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None
+
+    def get(self, name: str) -> Optional[RemoteHost]:
+        return self._hosts.get(name)
+
+    def hosts(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        self._evict(now)
+        return [self._hosts[name].summary(now, self.host_timeout) for name in sorted(self._hosts)]
+
+    def stats(self) -> Dict[str, Any]:
+        second = int(time.time())
+        return {
+            "listening": self.running,
+            "connections": self.connections,
+            "frames": self.frames,
+            "samples": self.samples,
+            "bytes": self.bytes,
+            "errors": self.errors,
+            # 超过一秒没有数据时速率为0
+            "samples_per_sec": self.samples_per_sec if second - self._rate_second <= 1 else 0,
+        }
+
+    async def start(self, listen: str = INGEST_LISTEN) -> None:
+        if self._server is not None:
+            return
+        host, port = parse_address(listen, 9100)
+        self._server = await asyncio.start_server(self._handle, host, port)
+        print(f"Aggregator listening for agents on {host}:{port}")
+
+    async def stop(self) -> None:
+        server, self._server = self._server, None
+        if server is not None:
+            server.close()
+            # 关闭仍在连接的agent，连接处理任务随之结束
+            for writer in list(self._writers):
+                writer.close()
+            await server.wait_closed()
+
+    def _evict(self, now: float) -> None:
+        """移除离线超过host_retention的主机"""
+        for name in [name for name, host in self._hosts.items()
+                     if not host.connected and now - host.last_seen > self.host_retention]:
+            del self._hosts[name]
+            print(f"Removed agent {name} after {self.host_retention:.0f}s offline")
+
+    def _admit(self, name: str, now: float) -> RemoteHost:
+        """
+        返回主机名对应的RemoteHost，新主机时创建
+
+        达到max_hosts时先移除过期的主机，仍然已满则复用离线最久的主机的位置；
+        所有主机都在线时拒绝新主机。
+        """
+        host = self._hosts.get(name)
+        if host is not None:
+            return host
+        if len(self._hosts) >= self.max_hosts:
+            self._evict(now)
+        if len(self._hosts) >= self.max_hosts:
+            offline = [host for host in self._hosts.values() if not host.online(now, self.host_timeout)]
+            if not offline:
+                raise WireError(f"host limit reached, rejecting {name}")
+            stale = min(offline, key=lambda host: host.last_seen)
+            del self._hosts[stale.name]
+            print(f"Host limit reached, replacing offline agent {stale.name} with {name}")
+        host = self._hosts[name] = RemoteHost(name, self.retention, self.max_series)
+        return host
+
+    def _count(self, host: RemoteHost, size: int, samples: int) -> None:
+        now = time.time()
+        host.last_seen = now
+        host.frames += 1
+        host.samples += samples
+        host.bytes += size
+        self.frames += 1
+        self.samples += samples
+        self.bytes += size
+        second = int(now)
+        if second != self._rate_second:
+            self.samples_per_sec = self._rate_samples if second - self._rate_second == 1 else 0
+            self._rate_second = second
+            self._rate_samples = 0
+        self._rate_samples += samples
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """单个agent连接：第一帧为HELLO，之后都是BATCH"""
+        peer = writer.get_extra_info("peername")
+        address = f"{peer[0]}:{peer[1]}" if isinstance(peer, tuple) else str(peer)
+        host: Optional[RemoteHost] = None
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            payload = await self._read_frame(reader)
+            if parse_header(payload) != FRAME_HELLO:
+                raise WireError("expected HELLO frame")
+            name = decode_hello(payload)
+            host = self._admit(name, time.time())
+            host.address = address
+            host.connection = writer
+            host.connected = True
+            host.connected_at = time.time()
+            self._count(host, len(payload), 0)
+            print(f"Agent {name} connected from {address}")
+
+            decoder = BatchDecoder(host.record, host.update_snapshot)
+            while True:
+                payload = await self._read_frame(reader)
+                if parse_header(payload) != FRAME_BATCH:
+                    raise WireError("expected BATCH frame")
+                self._count(host, len(payload), decoder.decode(payload))
+        except asyncio.IncompleteReadError:
+            # agent正常断开
+            pass
+        except (WireError, OSError) as e:
+            self.errors += 1
+            print(f"Error receiving from agent {host.name if host else address}: {e}")
+        finally:
+            self.connections -= 1
+            self._writers.discard(writer)
+            if host is not None and host.connection is writer:
+                host.connection = None
+                host.connected = False
+            writer.close()
+
+    @staticmethod
+    async def _read_frame(reader: asyncio.StreamReader) -> bytes:
+        header = await reader.readexactly(4)
+        size = int.from_bytes(header, "big")
+        if size > MAX_FRAME_SIZE:
+            raise WireError(f"frame too large: {size} bytes")
+        return await reader.readexactly(size)
+
+
+# 全局主机注册表，aggregator模式下由main.py中的应用生命周期启动
+registry = HostRegistry()
@@ -0,0 +1,329 @@
+import json
+import operator
+import re
+from collections import deque
+from fnmatch import translate
+from typing import Dict, Any, Callable, Deque, Iterable, List, Optional, Tuple
+
+from app.core.config import ALERT_RULES_FILE
+
+# 未配置MONITOR_ALERT_RULES时使用的规则
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {"name": "memory-high", "expr": "memory.memory_percent > 90", "for": 60, "severity": "warning"},
+    {"name": "disk-full", "expr": "disk.*.percent > 85", "severity": "warning"},
+    {"name": "cpu-saturated", "expr": "avg(cpu.percent, 300) > 90", "severity": "warning"},
+    {"name": "swap-thrashing", "expr": "avg(pressure.pswpin_rate, 60) > 100", "for": 60, "severity": "critical"},
+]
+
+_OPERATORS: Dict[str, Callable[[float, float], bool]] = {
+    ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le, "==": operator.eq, "!=": operator.ne,
+}
+AGGREGATES = ("last", "avg", "min", "max")
+
+# 规则表达式：聚合(指标[, 窗口秒数]) 比较符 阈值，或 指标 比较符 阈值（即last）
+_EXPR = re.compile(
+    r"^\s*(?:(?P<aggregate>[a-z]+)\(\s*(?P<inner>[^\s,()]+)\s*(?:,\s*(?P<window>\d+(?:\.\d+)?)\s*)?\)"
+    r"|(?P<metric>[^\s()]+))"
+    r"\s*(?P<op>>=|<=|==|!=|>|<)\s*(?P<threshold>[-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)\s*$"
+)
+
+# 最近状态变化（触发/恢复）的保留条数
+RECENT_SIZE = 200
+# 超过这么多秒没有新数据的序列（例如被卸载的挂载点）视为恢复
+STALE_AFTER = 300.0
+# 检查过期序列的间隔（秒）
+_SWEEP_INTERVAL = 60.0
+
+
+class AlertRule:
+    """
+    编译后的告警规则
+
+    表达式只解析一次：指标名不含通配符时按名称精确匹配，含*时编译为正则，
+    每个新出现的指标名只与规则匹配一次（结果由AlertEngine缓存）。
+    """
+
+    __slots__ = ("name", "expr", "metric", "pattern", "aggregate", "window", "op", "compare",
+                 "threshold", "duration", "severity")
+
+    def __init__(self, name: str, expr: str, duration: float = 0.0, severity: str = "warning"):
+        match = _EXPR.match(expr)
+        if match is None:
+            raise ValueError(f"invalid alert expression: {expr!r}")
+        if match.group("metric") is not None:
+            self.metric = match.group("metric")
+            self.aggregate = "last"
+            self.window = 0.0
+        else:
+            self.metric = match.group("inner")
+            self.aggregate = match.group("aggregate")
+            if self.aggregate not in AGGREGATES:
+                raise ValueError(f"unknown aggregate {self.aggregate!r}, expected one of {', '.join(AGGREGATES)}")
+            self.window = float(match.group("window") or 60)
+            if self.aggregate == "last":
+                self.window = 0.0
+        self.name = name
+        self.expr = expr.strip()
+        self.pattern = re.compile(translate(self.metric)) if "*" in self.metric else None
+        self.op = match.group("op")
+        self.compare = _OPERATORS[self.op]
+        self.threshold = float(match.group("threshold"))
+        self.duration = float(duration)
+        self.severity = severity
+
+    def matches(self, metric: str) -> bool:
+        return self.pattern.match(metric) is not None if self.pattern is not None else metric == self.metric
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "expr": self.expr,
+            "metric": self.metric,
+            "aggregate": self.aggregate,
+            "window": self.window,
+            "op": self.op,
+            "threshold": self.threshold,
+            "for": self.duration,
+            "severity": self.severity,
+        }
+
+
+def compile_rules(definitions: Iterable[Dict[str, Any]]) -> List[AlertRule]:
+    """编译规则定义，无效的规则打印后跳过"""
+    rules: List[AlertRule] = []
+    for index, definition in enumerate(definitions):
+        try:
+            rules.append(AlertRule(
+                str(definition.get("name") or f"rule-{index}"), definition["expr"],
+                definition.get("for", 0.0), str(definition.get("severity", "warning")),
+            ))
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Ignoring invalid alert rule {definition!r}: {e}")
+    return rules
+
+
+def load_rules(path: str) -> List[AlertRule]:
+    """从JSON文件（规则定义的数组）加载规则，未指定文件时使用DEFAULT_RULES"""
+    if not path:
+        return compile_rules(DEFAULT_RULES)
+    try:
+        with open(path, encoding="utf-8") as f:
+            definitions = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error loading alert rules from {path}: {e}, using default rules")
+        return compile_rules(DEFAULT_RULES)
+    return compile_rules(definitions)
+
+
+class SlidingWindow:
+    """
+    单个(指标, 聚合, 窗口)的滑动窗口，同一指标上聚合方式和窗口相同的规则共享
+
+    - avg: 窗口内样本的队列加累计和，入队和出队时增减
+    - min/max: 单调队列，新样本入队时弹出所有不可能再成为极值的样本
+    - last: 只保存最新值
+    每次push均摊O(1)，不重新扫描窗口。
+    """
+
+    __slots__ = ("aggregate", "seconds", "_samples", "_sum", "value", "updated")
+
+    def __init__(self, aggregate: str, seconds: float):
+        self.aggregate = aggregate
+        self.seconds = seconds
+        self._samples: Deque[Tuple[float, float]] = deque()
+        self._sum = 0.0
+        self.value: Optional[float] = None
+        self.updated = 0.0
+
+    def push(self, timestamp: float, value: float) -> float:
+        self.updated = timestamp
+        aggregate = self.aggregate
+        if aggregate == "last":
+            self.value = value
+            return value
+        samples = self._samples
+        cutoff = timestamp - self.seconds
+        if aggregate == "avg":
+            samples.append((timestamp, value))
+            self._sum += value
+            while samples[0][0] <= cutoff:
+                self._sum -= samples.popleft()[1]
+            if len(samples) == 1:
+                # 窗口只剩一个样本时重置累计和，避免浮点误差累积
+                self._sum = value
+            self.value = self._sum / len(samples)
+            return self.value
+        if aggregate == "max":
+            while samples and samples[-1][1] <= value:
+                samples.pop()
+        else:
+            while samples and samples[-1][1] >= value:
+                samples.pop()
+        samples.append((timestamp, value))
+        while samples[0][0] <= cutoff:
+            samples.popleft()
+        self.value = samples[0][1]
+        return self.value
+
+
+class AlertInstance:
+    """
+    一条规则在一个具体指标上的状态：pending（条件成立但未满for时长）或firing
+
+    比较函数和阈值从规则复制到实例上，求值时少一次属性查找；最新值和更新时间
+    保存在共享的窗口上，不逐实例写入。
+    """
+
+    __slots__ = ("rule", "metric", "window", "compare", "threshold", "duration", "since", "firing", "fired_at")
+
+    def __init__(self, rule: AlertRule, metric: str, window: SlidingWindow):
+        self.rule = rule
+        self.metric = metric
+        self.window = window
+        self.compare = rule.compare
+        self.threshold = rule.threshold
+        self.duration = rule.duration
+        self.since: Optional[float] = None
+        self.firing = False
+        self.fired_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        rule = self.rule
+        value = self.window.value
+        return {
+            "rule": rule.name,
+            "metric": self.metric,
+            "expr": rule.expr,
+            "severity": rule.severity,
+            "state": "firing" if self.firing else "pending",
+            "value": round(value, 3) if value is not None else None,
+            "threshold": rule.threshold,
+            "since": self.since,
+            "fired_at": self.fired_at,
+        }
+
+
+# 一个指标上的绑定：共享的滑动窗口和使用它的规则实例
+_Binding = Tuple[SlidingWindow, List[AlertInstance]]
+
+
+class AlertEngine:
+    """
+    告警规则引擎，在每次采样写入历史时增量求值
+
+    每个指标名第一次出现时与所有规则匹配一次，得到它的绑定（滑动窗口和规则实例），
+    之后每次采样只需一次字典查找：没有规则的指标直接跳过，有规则的指标更新共享窗口
+    （均摊O(1)）并比较阈值。单次采样的开销只与本次写入的指标数和命中的规则数有关，
+    与规则总数和窗口长度无关。
+    """
+
+    def __init__(self, rules: List[AlertRule]):
+        self.rules = rules
+        self._exact: Dict[str, List[AlertRule]] = {}
+        self._patterns: List[AlertRule] = []
+        for rule in rules:
+            if rule.pattern is None:
+                self._exact.setdefault(rule.metric, []).append(rule)
+            else:
+                self._patterns.append(rule)
+        self._bindings: Dict[str, Tuple[_Binding, ...]] = {}
+        self._instances: List[AlertInstance] = []
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=RECENT_SIZE)
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._last_sweep = 0.0
+        self.evaluations = 0
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """注册状态变化（firing/resolved）的接收方，参数为变化事件"""
+        self._listeners.append(listener)
+
+    def _bind(self, metric: str) -> Tuple[_Binding, ...]:
+        rules = list(self._exact.get(metric, ()))
+        rules.extend(rule for rule in self._patterns if rule.matches(metric))
+        windows: Dict[Tuple[str, float], _Binding] = {}
+        for rule in rules:
+            key = (rule.aggregate, rule.window)
+            binding = windows.get(key)
+            if binding is None:
+                binding = windows[key] = (SlidingWindow(rule.aggregate, rule.window), [])
+            instance = AlertInstance(rule, metric, binding[0])
+            binding[1].append(instance)
+            self._instances.append(instance)
+        bindings = tuple(windows.values())
+        self._bindings[metric] = bindings
+        return bindings
+
+    def observe(self, timestamp: float, points: Dict[str, Optional[float]]) -> None:
+        """用一次采样写入历史的指标更新所有相关规则"""
+        bindings_by_metric = self._bindings
+        evaluations = 0
+        for metric, value in points.items():
+            bindings = bindings_by_metric.get(metric)
+            if bindings is None:
+                bindings = self._bind(metric)
+            if not bindings or value is None or value != value:
+                continue
+            for window, instances in bindings:
+                aggregated = window.push(timestamp, value)
+                evaluations += len(instances)
+                # 绝大多数实例处于条件不成立或已触发的稳定状态，只做一次比较
+                for instance in instances:
+                    if instance.compare(aggregated, instance.threshold):
+                        if not instance.firing:
+                            if instance.since is None:
+                                instance.since = timestamp
+                            if timestamp - instance.since >= instance.duration:
+                                instance.firing = True
+                                instance.fired_at = timestamp
+                                self._notify(instance, "firing", timestamp)
+                    elif instance.since is not None:
+                        self._reset(instance, timestamp)
+        self.evaluations += evaluations
+        if timestamp - self._last_sweep >= _SWEEP_INTERVAL:
+            self._last_sweep = timestamp
+            self._sweep(timestamp)
+
+    def submit(self, name: str, timestamp: float, data: Dict[str, Any], points: Dict[str, float]) -> None:
+        """采集器的接收方接口"""
+        self.observe(timestamp, points)
+
+    def _reset(self, instance: AlertInstance, timestamp: float) -> None:
+        """条件不再成立：pending直接清除，firing变为恢复"""
+        instance.since = None
+        if instance.firing:
+            instance.firing = False
+            self._notify(instance, "resolved", timestamp)
+            instance.fired_at = None
+
+    def _sweep(self, now: float) -> None:
+        """长时间没有数据的序列不再保持触发状态"""
+        for instance in self._instances:
+            if instance.since is not None and now - instance.window.updated > STALE_AFTER:
+                self._reset(instance, now)
+
+    def _notify(self, instance: AlertInstance, state: str, timestamp: float) -> None:
+        event = {**instance.to_dict(), "state": state, "timestamp": timestamp}
+        self.recent.append(event)
+        for listener in self._listeners:
+            listener(event)
+
+    def active(self) -> List[Dict[str, Any]]:
+        """当前firing和pending的告警，firing在前，按开始时间排序"""
+        instances = [instance for instance in self._instances if instance.since is not None]
+        instances.sort(key=lambda instance: (not instance.firing, instance.since))
+        return [instance.to_dict() for instance in instances]
+
+    def firing(self) -> List[Dict[str, Any]]:
+        return [alert for alert in self.active() if alert["state"] == "firing"]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rules": len(self.rules),
+            "series": len(self._instances),
+            "windows": sum(len(bindings) for bindings in self._bindings.values()),
+            "evaluations": self.evaluations,
+        }
+
+
+# 规则只编译一次，本机和aggregator中的各远程主机共用，各自维护独立的窗口和状态
+rules = load_rules(ALERT_RULES_FILE)
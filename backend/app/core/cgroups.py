@@ -0,0 +1,482 @@
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.instrumentation import instrumentation
+
+# 每个cgroup保存的累计计数，顺序固定（时间统一换算为微秒）
+COUNTER_FIELDS = ("cpu_usec", "nr_periods", "nr_throttled", "throttled_usec", "io_read_bytes", "io_write_bytes")
+(_CPU_USEC, _NR_PERIODS, _NR_THROTTLED, _THROTTLED_USEC, _IO_READ, _IO_WRITE) = range(len(COUNTER_FIELDS))
+
+# v1的memory.limit_in_bytes未设置限制时是一个接近2^63的值
+_V1_UNLIMITED = 1 << 62
+
+# 统计文件都很小，一次read即可读完
+_READ_SIZE = 64 * 1024
+
+
+def _read(path: str) -> Optional[bytes]:
+    """读取cgroup文件，文件不存在（cgroup已删除或控制器未启用）时返回None"""
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+    except OSError:
+        return None
+    try:
+        data = os.read(fd, _READ_SIZE)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    instrumentation.count_bytes(len(data))
+    return data
+
+
+def _int(data: Optional[bytes]) -> int:
+    try:
+        return int(data) if data else 0
+    except ValueError:
+        # v2中未设置限制的文件内容为"max"
+        return 0
+
+
+def _keyed(data: Optional[bytes]) -> Dict[bytes, int]:
+    """解析"键 值"格式的文件（cpu.stat等）"""
+    values: Dict[bytes, int] = {}
+    if data:
+        for line in data.splitlines():
+            parts = line.split()
+            if len(parts) == 2:
+                values[parts[0]] = int(parts[1])
+    return values
+
+
+def _stat_value(data: Optional[bytes], key: bytes) -> int:
+    """从memory.stat中取出单个字段，不构建完整字典"""
+    if not data:
+        return 0
+    if data.startswith(key + b" "):
+        start = 0
+    else:
+        start = data.find(b"\n" + key + b" ")
+        if start < 0:
+            return 0
+        start += 1
+    end = data.find(b"\n", start)
+    return int(data[start + len(key) + 1:end if end >= 0 else len(data)])
+
+
+def _pressure(data: Optional[bytes]) -> Tuple[Optional[float], Optional[float]]:
+    """解析cpu.pressure，返回some和full的avg10（百分比），不可用时为None"""
+    some = full = None
+    if data:
+        for line in data.splitlines():
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].startswith(b"avg10="):
+                value = float(parts[1][6:])
+                if parts[0] == b"some":
+                    some = value
+                elif parts[0] == b"full":
+                    full = value
+    return some, full
+
+
+class CgroupReader:
+    """
+    单个cgroup的统计读取器
+
+    各统计文件的路径在创建时确定一次（v2都在同一目录下，v1分布在cpu、cpuacct、memory、blkio
+    各控制器的目录中），之后每次采样只做open/read/close，不再探测目录结构。
+    """
+
+    def __init__(self, name: str, version: int, directories: Dict[str, str], pressure_dir: Optional[str]):
+        self.name = name
+        self.version = version
+        self.directories = directories
+        self.pressure_dir = pressure_dir
+
+    def read(self) -> Optional[Tuple[Tuple[int, ...], Dict[str, Any]]]:
+        """
+        读取一次统计
+
+        Returns:
+            (按COUNTER_FIELDS顺序的累计计数, 瞬时值)，cgroup已不存在时返回None。瞬时值包含
+            memory_current、memory_limit（0表示不限制）、inactive_file、cpu_limit（核数，0表示不限制）
+            以及cpu.pressure的some/full avg10
+        """
+        if self.version == 2:
+            return self._read_v2()
+        return self._read_v1()
+
+    def read_cpu(self) -> Optional[Tuple[int, float]]:
+        """
+        只读取CPU累计用量和配额，供CPU采集使用
+
+        Returns:
+            (累计CPU时间（微秒）, CPU配额（核数，0表示不限制）)，cgroup已不存在时返回None
+        """
+        if self.version == 2:
+            cpu = _keyed(_read(f"{self.directories['cgroup']}/cpu.stat") or b"")
+            if b"usage_usec" not in cpu:
+                return None
+            return cpu[b"usage_usec"], self._cpu_limit()
+        usage = _read(f"{self.directories['cpuacct']}/cpuacct.usage")
+        if usage is None:
+            return None
+        return _int(usage) // 1000, self._cpu_limit()
+
+    def _cpu_limit(self) -> float:
+        """CPU配额（核数），未设置时为0"""
+        if self.version == 2:
+            cpu_max = _read(f"{self.directories['cgroup']}/cpu.max")
+            if cpu_max:
+                quota, _, period = cpu_max.partition(b" ")
+                if quota != b"max" and int(period or 0) > 0:
+                    return int(quota) / int(period)
+            return 0.0
+        quota = _int(_read(f"{self.directories['cpu']}/cpu.cfs_quota_us"))
+        period = _int(_read(f"{self.directories['cpu']}/cpu.cfs_period_us"))
+        return quota / period if quota > 0 and period > 0 else 0.0
+
+    def read_memory(self) -> Optional[Dict[str, int]]:
+        """
+        只读取内存统计（memory.current/max/stat或v1的对应文件），供内存采集使用，
+        不读取CPU、I/O和PSI文件
+
+        Returns:
+            包含memory_current、memory_limit（0表示不限制）、inactive_file的字典，cgroup已不存在时返回None
+        """
+        if self.version == 2:
+            directory = self.directories["cgroup"]
+            current = _read(f"{directory}/memory.current")
+            if current is None:
+                return None
+            return {
+                "memory_current": _int(current),
+                "memory_limit": _int(_read(f"{directory}/memory.max")),
+                "inactive_file": _stat_value(_read(f"{directory}/memory.stat"), b"inactive_file"),
+            }
+        directory = self.directories["memory"]
+        current = _read(f"{directory}/memory.usage_in_bytes")
+        if current is None:
+            return None
+        memory_limit = _int(_read(f"{directory}/memory.limit_in_bytes"))
+        return {
+            "memory_current": _int(current),
+            "memory_limit": memory_limit if memory_limit < _V1_UNLIMITED else 0,
+            "inactive_file": _stat_value(_read(f"{directory}/memory.stat"), b"total_inactive_file"),
+        }
+
+    def _read_v2(self) -> Optional[Tuple[Tuple[int, ...], Dict[str, Any]]]:
+        directory = self.directories["cgroup"]
+        stat = _read(f"{directory}/cpu.stat")
+        if stat is None:
+            return None
+        cpu = _keyed(stat)
+
+        read_bytes = write_bytes = 0
+        io_stat = _read(f"{directory}/io.stat")
+        if io_stat:
+            for field in io_stat.split():
+                if field.startswith(b"rbytes="):
+                    read_bytes += int(field[7:])
+                elif field.startswith(b"wbytes="):
+                    write_bytes += int(field[7:])
+
+        some, full = _pressure(_read(f"{directory}/cpu.pressure"))
+        return (
+            (cpu.get(b"usage_usec", 0), cpu.get(b"nr_periods", 0), cpu.get(b"nr_throttled", 0),
+             cpu.get(b"throttled_usec", 0), read_bytes, write_bytes),
+            {
+                **(self.read_memory() or dict.fromkeys(("memory_current", "memory_limit", "inactive_file"), 0)),
+                "cpu_limit": self._cpu_limit(),
+                "cpu_pressure_some": some,
+                "cpu_pressure_full": full,
+            },
+        )
+
+    def _read_v1(self) -> Optional[Tuple[Tuple[int, ...], Dict[str, Any]]]:
+        directories = self.directories
+        usage = _read(f"{directories['cpuacct']}/cpuacct.usage")
+        if usage is None:
+            return None
+        cpu = _keyed(_read(f"{directories['cpu']}/cpu.stat"))
+
+        read_bytes = write_bytes = 0
+        blkio = (_read(f"{directories['blkio']}/blkio.throttle.io_service_bytes_recursive")
+                 or _read(f"{directories['blkio']}/blkio.throttle.io_service_bytes"))
+        if blkio:
+            for line in blkio.splitlines():
+                parts = line.split()
+                if len(parts) == 3:
+                    if parts[1] == b"Read":
+                        read_bytes += int(parts[2])
+                    elif parts[1] == b"Write":
+                        write_bytes += int(parts[2])
+
+        # v1没有PSI文件，混合模式下可以从unified层级读取
+        some, full = _pressure(_read(f"{self.pressure_dir}/cpu.pressure")) if self.pressure_dir else (None, None)
+        return (
+            (_int(usage) // 1000, cpu.get(b"nr_periods", 0), cpu.get(b"nr_throttled", 0),
+             cpu.get(b"throttled_time", 0) // 1000, read_bytes, write_bytes),
+            {
+                **(self.read_memory() or dict.fromkeys(("memory_current", "memory_limit", "inactive_file"), 0)),
+                "cpu_limit": self._cpu_limit(),
+                "cpu_pressure_some": some,
+                "cpu_pressure_full": full,
+            },
+        )
+
+
+# v1中读取统计需要的控制器
+_V1_CONTROLLERS = ("cpu", "cpuacct", "memory", "blkio")
+
+
+def cgroup_version(mount: str) -> int:
+    """判断cgroup层级的版本：根目录下有cgroup.controllers即为v2（统一层级）"""
+    return 2 if os.path.exists(f"{mount}/cgroup.controllers") else 1
+
+
+def make_reader(name: str, mount: str, path: str, version: int, fallback_to_root: bool = False) -> CgroupReader:
+    """
+    为挂载点mount下的cgroup路径path创建读取器
+
+    fallback_to_root为True时，路径在当前挂载中不存在（例如容器内/sys/fs/cgroup挂载的就是
+    容器自身的cgroup，而/proc/self/cgroup中是宿主机视角的路径）则使用挂载根目录。
+    """
+    path = path.strip("/")
+
+    def resolve(base: str) -> str:
+        directory = os.path.join(base, path) if path else base
+        return base if fallback_to_root and not os.path.isdir(directory) else directory
+
+    if version == 2:
+        return CgroupReader(name, 2, {"cgroup": resolve(mount)}, None)
+    directories = {controller: resolve(f"{mount}/{controller}") for controller in _V1_CONTROLLERS}
+    unified = f"{mount}/unified"
+    pressure_dir = resolve(unified) if os.path.isdir(unified) else None
+    return CgroupReader(name, 1, directories, pressure_dir)
+
+
+def current_cgroup_path(proc_self_cgroup: str, version: int) -> str:
+    """从/proc/self/cgroup中取出当前进程所在的cgroup路径"""
+    data = _read(proc_self_cgroup) or b""
+    for line in data.decode(errors="replace").splitlines():
+        hierarchy, _, rest = line.partition(":")
+        controllers, _, path = rest.partition(":")
+        if version == 2 and hierarchy == "0":
+            return path
+        if version == 1 and "cpuacct" in controllers.split(","):
+            return path
+    return "/"
+
+
+class CgroupTree:
+    """
+    缓存的cgroup子树结构
+
+    只在首次使用、超过refresh_interval或发现cgroup被删除后才重新遍历目录，
+    遍历深度受depth限制；其余时候直接返回缓存的路径列表。
+    """
+
+    def __init__(self, base: str, depth: int, refresh_interval: float):
+        self.base = base
+        self.depth = max(int(depth), 1)
+        self.refresh_interval = refresh_interval
+        self._paths: List[str] = []
+        self._walked: Optional[float] = None
+
+    def invalidate(self) -> None:
+        self._walked = None
+
+    def paths(self) -> List[str]:
+        """返回相对于base的子cgroup路径（不含base自身）"""
+        now = time.monotonic()
+        if self._walked is None or now - self._walked > self.refresh_interval:
+            self._walked = now
+            self._paths = []
+            self._walk(self.base, "", 1)
+        return self._paths
+
+    def _walk(self, directory: str, prefix: str, level: int) -> None:
+        try:
+            entries = [entry.name for entry in os.scandir(directory) if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            return
+        for name in sorted(entries):
+            path = f"{prefix}/{name}"
+            self._paths.append(path)
+            if level < self.depth:
+                self._walk(f"{directory}/{name}", path, level + 1)
+
+
+class CgroupMonitor:
+    """
+    当前cgroup以及配置的根cgroup下所有子cgroup的资源使用
+
+    所有使用率都由相邻两次读取之间的计数差和单调时钟时间差计算。子cgroup较多时每次采样
+    最多读取budget个（轮询推进），未轮到的子cgroup沿用上一次的结果，各自的速率按其自身的
+    读取间隔计算，因此不会因为分批读取而失真。
+    """
+
+    def __init__(self, mount: str, proc_self_cgroup: str, children_mount: str, children_root: str,
+                 depth: int, budget: int, refresh_interval: float):
+        self.version = cgroup_version(mount)
+        self._current = make_reader(
+            "/", mount, current_cgroup_path(proc_self_cgroup, self.version), self.version, fallback_to_root=True
+        )
+        self.children_root = children_root
+        self._children_mount = children_mount
+        self._children_version = cgroup_version(children_mount)
+        self._tree: Optional[CgroupTree] = None
+        if children_root:
+            base = children_mount if self._children_version == 2 else f"{children_mount}/cpuacct"
+            self._tree = CgroupTree(f"{base}/{children_root.strip('/')}", depth, refresh_interval)
+        self.budget = max(int(budget), 1)
+
+        self._readers: Dict[str, CgroupReader] = {}
+        self._pending: List[str] = []
+        self._previous: Dict[str, Tuple[Tuple[int, ...], float]] = {}
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        # cpu()单独保存上一次读数，不与sample()的区间互相干扰
+        self._cpu_previous: Optional[Tuple[int, float]] = None
+        self._cpu_lock = threading.Lock()
+
+    def sample(self) -> Dict[str, Any]:
+        """
+        采样一次
+
+        Returns:
+            Dict[str, Any]: 包含以下字段：
+                - version: cgroup版本（1或2）
+                - current: 当前进程所在cgroup的资源使用（字段见_usage）
+                - root: 配置的子cgroup根路径（未配置时为空字符串）
+                - children: 各子cgroup的资源使用，name为相对于root的路径
+        """
+        with self._lock:
+            now = time.monotonic()
+            current = self._usage(self._current, now)
+            children: List[Dict[str, Any]] = []
+            if self._tree is not None:
+                paths = self._tree.paths()
+                alive = set(paths)
+                for name in [name for name in self._readers if name not in alive]:
+                    self._forget(name)
+                if not self._pending:
+                    self._pending = list(paths)
+                batch = self._pending[:self.budget]
+                del self._pending[:self.budget]
+                for name in batch:
+                    reader = self._readers.get(name)
+                    if reader is None:
+                        reader = make_reader(
+                            name, self._children_mount, f"{self.children_root.rstrip('/')}{name}",
+                            self._children_version
+                        )
+                        self._readers[name] = reader
+                    usage = self._usage(reader, now)
+                    if usage is None:
+                        # cgroup已被删除，下次采样时重新遍历目录
+                        self._forget(name)
+                        self._tree.invalidate()
+                    else:
+                        self._results[name] = usage
+                children = [self._results[name] for name in paths if name in self._results]
+            return {
+                "version": self.version,
+                "current": current,
+                "root": self.children_root,
+                "children": children,
+            }
+
+    def _forget(self, name: str) -> None:
+        self._readers.pop(name, None)
+        self._previous.pop(name, None)
+        self._results.pop(name, None)
+
+    def _usage(self, reader: CgroupReader, now: float) -> Optional[Dict[str, Any]]:
+        """
+        读取一个cgroup并计算区间使用率
+
+        Returns:
+            Optional[Dict[str, Any]]: 包含以下字段，cgroup不存在时返回None：
+                - name: cgroup路径
+                - cpu_percent: CPU使用率（百分比，单核满载为100）
+                - cpu_limit: CPU配额（核数，0表示不限制）
+                - cpu_limit_percent: 相对于配额的使用率（未限制时为0）
+                - throttled_percent: 区间内被限流的调度周期占比（百分比）
+                - throttled_time: 累计被限流的时间（秒）
+                - memory_current: 当前内存用量（字节，含页缓存）
+                - memory_working_set: 工作集（memory_current减去非活跃文件页，与OOM判断更接近）
+                - memory_limit: 内存限制（字节，0表示不限制）
+                - memory_percent: 工作集占内存限制的百分比（未限制时为0）
+                - io_read_bytes_rate/io_write_bytes_rate: 块设备读/写吞吐（字节/秒）
+                - cpu_pressure_some/cpu_pressure_full: cpu.pressure的10秒平均值（不可用时为null）
+        """
+        reading = reader.read()
+        if reading is None:
+            return None
+        counters, gauges = reading
+        previous = self._previous.get(reader.name)
+        self._previous[reader.name] = (counters, now)
+        if previous is None or now <= previous[1]:
+            delta = (0,) * len(COUNTER_FIELDS)
+            elapsed = 0.0
+        else:
+            # 计数回绕或cgroup重建时按0处理
+            delta = tuple(max(after - before, 0) for after, before in zip(counters, previous[0]))
+            elapsed = now - previous[1]
+
+        cpu_percent = delta[_CPU_USEC] / (elapsed * 1e6) * 100 if elapsed > 0 else 0.0
+        cpu_limit = gauges["cpu_limit"]
+        working_set = max(gauges["memory_current"] - gauges["inactive_file"], 0)
+        memory_limit = gauges["memory_limit"]
+        return {
+            "name": reader.name,
+            "cpu_percent": round(cpu_percent, 1),
+            "cpu_limit": round(cpu_limit, 2),
+            "cpu_limit_percent": round(cpu_percent / cpu_limit, 1) if cpu_limit > 0 else 0.0,
+            "throttled_percent": round(delta[_NR_THROTTLED] / delta[_NR_PERIODS] * 100, 1) if delta[_NR_PERIODS] else 0.0,
+            "throttled_time": round(counters[_THROTTLED_USEC] / 1e6, 3),
+            "memory_current": gauges["memory_current"],
+            "memory_working_set": working_set,
+            "memory_limit": memory_limit,
+            "memory_percent": round(working_set / memory_limit * 100, 1) if memory_limit > 0 else 0.0,
+            "io_read_bytes_rate": round(delta[_IO_READ] / elapsed, 1) if elapsed > 0 else 0.0,
+            "io_write_bytes_rate": round(delta[_IO_WRITE] / elapsed, 1) if elapsed > 0 else 0.0,
+            "cpu_pressure_some": gauges["cpu_pressure_some"],
+            "cpu_pressure_full": gauges["cpu_pressure_full"],
+        }
+
+    def memory(self) -> Optional[Tuple[int, int]]:
+        """当前cgroup的(工作集, 内存限制)，未设置内存限制或读取失败时返回None；只读取内存统计文件"""
+        gauges = self._current.read_memory()
+        if gauges is None or gauges["memory_limit"] <= 0:
+            return None
+        return max(gauges["memory_current"] - gauges["inactive_file"], 0), gauges["memory_limit"]
+
+    def cpu(self, cpu_count: int) -> Optional[float]:
+        """
+        当前cgroup在两次调用之间的CPU使用率，只读取cpu.stat和配额文件
+
+        Args:
+            cpu_count: 可用的核数；设置了CPU配额且小于该值时按配额计算
+
+        Returns:
+            相对于可用核数的使用率（百分比，全部用满为100），首次调用为0，cgroup不可读时返回None
+        """
+        reading = self._current.read_cpu()
+        if reading is None:
+            return None
+        usage, cpu_limit = reading
+        now = time.monotonic()
+        with self._cpu_lock:
+            previous, self._cpu_previous = self._cpu_previous, (usage, now)
+        if previous is None or now <= previous[1]:
+            return 0.0
+        cores = min(cpu_limit, cpu_count) if cpu_limit > 0 else cpu_count
+        if cores <= 0:
+            return None
+        percent = max(usage - previous[0], 0) / ((now - previous[1]) * 1e6) / cores * 100
+        return round(min(percent, 100.0), 1)
@@ -0,0 +1,365 @@
+import asyncio
+import time
+from typing import Dict, Any, Callable, List, Optional
+
+from app.core.alerts import AlertEngine, rules as alert_rules
+from app.core.config import (
+    COLLECTOR_INTERVALS, SAMPLING_ADAPTIVE, SAMPLING_MAX_INTERVAL, SAMPLING_TOLERANCE, SAMPLING_IDLE_AFTER,
+)
+from app.core.history import HistoryStore
+from app.core.instrumentation import instrumentation
+from app.core.openmetrics import OpenMetricsRenderer
+from app.core.sampling import AdaptiveRate, Burst
+from app.core.storage import MetricStore
+from app.core.stream import StreamHub
+from app.core.system_monitor import SystemMonitor
+
+
+class MetricsCollector:
+    """
+    后台采集器：每个子系统按各自的周期在后台采样，结果写入内存快照
+
+    接口只读取快照，不再直接调用SystemMonitor，因此无论有多少客户端轮询，
+    /proc解析和statvfs调用的次数都只取决于采样周期。
+
+    采样周期是自适应的（见AdaptiveRate）：没有客户端且指标稳定时逐步放慢，客户端访问时立即恢复；
+    burst()可以临时把某个子系统切换到高频采样并保存原始精度的数据。
+    """
+
+    def __init__(self, intervals: Optional[Dict[str, float]] = None):
+        self.intervals: Dict[str, float] = dict(COLLECTOR_INTERVALS)
+        if intervals:
+            self.intervals.update(intervals)
+
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {
+            "cpu": SystemMonitor.get_cpu_info,
+            "memory": SystemMonitor.get_memory_info,
+            "disk": SystemMonitor.get_disk_info,
+            "network": SystemMonitor.get_network_info,
+            "cgroup": SystemMonitor.get_cgroup_info,
+            "pressure": SystemMonitor.get_pressure_info,
+            "sensors": SystemMonitor.get_sensors_info,
+        }
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._timestamps: Dict[str, float] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # 是否启用自适应采样（agent模式下关闭：aggregator端是否有人查看在本机无法得知）
+        self.adaptive = SAMPLING_ADAPTIVE
+        self._rates: Dict[str, AdaptiveRate] = {
+            name: AdaptiveRate(interval, SAMPLING_MAX_INTERVAL, SAMPLING_TOLERANCE, SAMPLING_IDLE_AFTER)
+            for name, interval in self.intervals.items()
+        }
+        # 采样周期改变时唤醒对应的采样循环，使其按新的周期重新计划下一次采样
+        self._wake: Dict[str, asyncio.Event] = {}
+        # 各子系统正在进行或最近一次的高频采样
+        self._bursts: Dict[str, Burst] = {}
+        # 各子系统最近一次采样的单调时钟时间，以及进行中的按需采样（并发的请求共用一次）
+        self._sampled: Dict[str, float] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+        # 每次采样后写入的时间序列历史
+        self.history = HistoryStore()
+        # 推送流：每次采样后把变化的字段扇出给所有订阅者
+        self.stream = StreamHub()
+        # 告警规则引擎：每次采样写入历史的同时增量求值，状态变化推送到推送流
+        self.alerts = AlertEngine(alert_rules)
+        self.alerts.add_listener(self._publish_alert)
+        # /metrics的OpenMetrics文本，按子系统缓存
+        self.exposition = OpenMetricsRenderer()
+        # 每次采样后的额外接收方，参数为(子系统名, 时间戳, 快照, 历史指标)，例如agent模式的推送器
+        self._sinks: List[Callable[[str, float, Dict[str, Any], Dict[str, float]], None]] = []
+        # 历史数据的持久化存储（可选），早于本次启动的历史只能从这里读取
+        self.storage: Optional[MetricStore] = None
+        self.started_at = time.time()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """先完整采集一轮，再为每个子系统启动独立的后台任务"""
+        if self._tasks:
+            return
+        self.started_at = time.time()
+        await asyncio.gather(*(self.refresh(name) for name in self._collectors))
+        for name in self._collectors:
+            self._wake[name] = asyncio.Event()
+            self._tasks[name] = asyncio.create_task(self._run(name), name=f"collector-{name}")
+
+    async def stop(self) -> None:
+        """取消所有后台采集任务"""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        self.stream.close()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def refresh(self, name: str) -> None:
+        """立即采集一次指定子系统并更新快照（采集在线程池中执行，不阻塞事件循环）"""
+        data = await asyncio.to_thread(self._collect, name)
+        now = time.time()
+        self._sampled[name] = time.monotonic()
+        self._snapshots[name] = data
+        self._timestamps[name] = now
+        points = self._dispatch(name, "history points", self._history_points, name, data) or {}
+        self._dispatch(name, "history", self.history.record, now, points)
+        self._dispatch(name, "alerts", self.alerts.observe, now, points)
+        self._dispatch(name, "stream", self.stream.publish, name, data)
+        for sink in self._sinks:
+            self._dispatch(name, "sink", sink, name, now, data, points)
+        burst = self._bursts.get(name)
+        if burst is not None and burst.active(now):
+            self._dispatch(name, "burst", burst.record, now, points)
+        if self.adaptive:
+            # 推送流的订阅者和Prometheus抓取是持续的客户端，期间不降频
+            clients = self.stream.subscriber_count > 0 or self.exposition.active
+            self._dispatch(name, "adaptive sampling", self._rates[name].update, points, clients)
+
+    @staticmethod
+    def _dispatch(name: str, step: str, call: Callable[..., Any], *args: Any) -> Any:
+        """执行采样后的一个处理步骤；失败时计入该子系统的错误，不影响快照和其余步骤"""
+        try:
+            return call(*args)
+        except Exception as e:
+            instrumentation.record_error(name, f"Error in {step} for {name}: {e}")
+            return None
+
+    def interval(self, name: str) -> float:
+        """子系统当前的采样周期：高频采样期间为burst的周期，否则为自适应周期（未启用时为基础周期）"""
+        burst = self._bursts.get(name)
+        if burst is not None and burst.active(time.time()):
+            return burst.interval
+        if self.adaptive:
+            return self._rates[name].interval
+        return self.intervals[name]
+
+    def touch(self, name: str) -> None:
+        """记录一次客户端访问：降频中的子系统恢复基础周期，并唤醒采样循环重新计划"""
+        if self._rates[name].touch() and name in self._wake:
+            self._wake[name].set()
+
+    def burst(self, name: str, interval: float, duration: float) -> Dict[str, Any]:
+        """
+        临时以interval秒的周期采样指定子系统，持续duration秒
+
+        期间的每次采样以原始精度保存（见burst_samples），结束后恢复原来的周期；
+        同一子系统再次调用时替换正在进行的burst。
+        """
+        burst = Burst(interval, duration)
+        self._bursts[name] = burst
+        if name in self._wake:
+            self._wake[name].set()
+        return {"section": name, **burst.summary()}
+
+    def burst_samples(self, name: str, metric: str) -> Optional[Dict[str, Any]]:
+        """查询指定子系统正在进行或最近一次burst中某个指标的原始采样"""
+        burst = self._bursts.get(name)
+        if burst is None:
+            return None
+        return burst.query(metric)
+
+    def sampling(self) -> Dict[str, Any]:
+        """各子系统的基础周期、当前周期和高频采样状态"""
+        sections = {}
+        for name in self._collectors:
+            burst = self._bursts.get(name)
+            sections[name] = {
+                "base_interval": self.intervals[name],
+                "interval": self.interval(name),
+                "last_sample": self._timestamps.get(name),
+                "burst": burst.summary() if burst is not None else None,
+            }
+        return {"adaptive": self.adaptive, "sections": sections}
+
+    def _publish_alert(self, event: Dict[str, Any]) -> None:
+        """告警状态变化时推送alerts事件：本次变化以及当前所有触发中的告警"""
+        self.stream.publish_event("alerts", {"timestamp": time.time(), "change": event,
+                                             "alerts": self.alerts.firing()})
+
+    def add_sink(self, sink: Callable[[str, float, Dict[str, Any], Dict[str, float]], None]) -> None:
+        """注册采样接收方（在事件循环中调用，不应阻塞）"""
+        self._sinks.append(sink)
+
+    def attach_storage(self, storage: MetricStore) -> None:
+        """启用历史数据持久化：每次采样写入存储，历史查询超出内存范围时从存储读取"""
+        self.storage = storage
+        self.add_sink(storage.submit)
+
+    def query_history(self, metric: str, since: float, until: Optional[float] = None,
+                      step: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        查询指标历史（会读取磁盘，应在线程池中调用）
+
+        内存中的环形缓冲区只包含本次启动以来、且在保留时长内的数据；查询起点早于此时
+        从持久化存储读取，存储中没有该指标时仍回退到内存。
+        """
+        if self.storage is not None:
+            floor = max(self.started_at, time.time() - max(self.history.retention.values()))
+            if since < floor:
+                result = self.storage.query(metric, since, until, step)
+                if result is not None:
+                    return result
+        return self.history.query(metric, since, until, step)
+
+    def _collect(self, name: str) -> Dict[str, Any]:
+        """在采集线程中执行：采样（计入自身开销统计），并在/metrics近期被抓取过时顺带渲染OpenMetrics文本"""
+        with instrumentation.measure(name):
+            data = self._collectors[name]()
+        if self.exposition.active:
+            with instrumentation.measure("openmetrics"):
+                self.exposition.update(name, data)
+        return data
+
+    def _history_points(self, name: str, data: Dict[str, Any]) -> Dict[str, float]:
+        """把子系统快照展开为写入历史的指标（名称 -> 数值）"""
+        points: Dict[str, float] = {}
+        if name == "cpu":
+            points["cpu.percent"] = data.get("cpu_percent")
+            points["cpu.freq_current"] = data.get("cpu_freq_current")
+            for index, percent in enumerate(data.get("cpu_per_core", [])):
+                points[f"cpu.core.{index}"] = percent
+            for field, percent in data.get("cpu_breakdown", {}).items():
+                points[f"cpu.{field}"] = percent
+        elif name == "memory":
+            for field in ("memory_percent", "memory_used", "memory_available", "swap_percent", "swap_used"):
+                points[f"memory.{field}"] = data.get(field)
+        elif name == "disk":
+            for disk in data.get("disks", []):
+                points[f"disk.{disk['mountpoint']}.percent"] = disk.get("percent")
+                points[f"disk.{disk['mountpoint']}.used"] = disk.get("used")
+            for device in data.get("io", []):
+                for field in ("read_bytes_rate", "write_bytes_rate", "await_ms", "util_percent"):
+                    points[f"disk.io.{device['device']}.{field}"] = device[field]
+        elif name == "network":
+            # 速率已由采集端按单调时钟计算
+            for field in ("bytes_sent_rate", "bytes_recv_rate", "packets_sent_rate", "packets_recv_rate"):
+                points[f"network.{field}"] = data.get(field)
+            for interface in data.get("interfaces", []):
+                points[f"network.{interface['name']}.bytes_sent_rate"] = interface["bytes_sent_rate"]
+                points[f"network.{interface['name']}.bytes_recv_rate"] = interface["bytes_recv_rate"]
+        elif name == "pressure":
+            for resource in ("cpu", "memory", "io"):
+                for field, value in (data.get(resource) or {}).items():
+                    if field.endswith("_percent") or field.endswith("_avg10"):
+                        points[f"pressure.{resource}.{field}"] = value
+            for field in ("load1", "load5", "load15", "pgmajfault_rate", "pswpin_rate", "pswpout_rate", "oom_kill"):
+                points[f"pressure.{field}"] = data.get(field)
+        elif name == "sensors":
+            points["sensors.cpu_temperature"] = data.get("cpu_temperature")
+            points["sensors.max_temperature"] = data.get("max_temperature")
+            for sensor in data.get("temperatures", []):
+                points[f"sensors.{sensor['sensor']}.{sensor['label'].replace(' ', '_')}"] = sensor["current"]
+            throttle = data.get("throttle")
+            if throttle:
+                points["sensors.core_throttle_rate"] = throttle["core_events_rate"]
+                points["sensors.package_throttle_rate"] = throttle["package_events_rate"]
+        elif name == "cgroup":
+            groups = [data["current"]] if data.get("current") else []
+            groups.extend(data.get("children", []))
+            for group in groups:
+                for field in ("cpu_percent", "memory_working_set", "throttled_percent"):
+                    points[f"cgroup.{group['name']}.{field}"] = group[field]
+        return points
+
+    async def _run(self, name: str) -> None:
+        """
+        单个子系统的采样循环，按固定节拍运行并扣除采集本身的耗时
+
+        每次采样后按当前周期计划下一次；等待期间被唤醒（客户端访问降频中的子系统或开始burst）时
+        不采样，而是从当前时刻按新的周期重新计划。
+        """
+        loop = asyncio.get_running_loop()
+        wake = self._wake[name]
+        last_tick = self._sampled.get(name, loop.time())
+        while True:
+            next_tick = last_tick + self.interval(name)
+            timeout = next_tick - loop.time()
+            if timeout > 0:
+                try:
+                    await asyncio.wait_for(wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                else:
+                    wake.clear()
+                    # 期间可能已经按需采样过（事件循环的时钟即time.monotonic）
+                    last_tick = max(last_tick, self._sampled.get(name, last_tick))
+                    continue
+            try:
+                await self.refresh(name)
+            except Exception:
+                # 只有采集本身会抛出到这里，错误已由instrumentation.measure计数并打印；
+                # 采样后的各处理步骤由_dispatch单独记录
+                pass
+            # 采集耗时超过周期时重新对齐，避免连续追赶
+            last_tick = next_tick if loop.time() <= next_tick + self.interval(name) else loop.time()
+
+    async def get_snapshot(self, name: str) -> Dict[str, Any]:
+        """
+        读取指定子系统的最新快照
+
+        降频期间的快照可能远比基础周期旧，此时先按需采集一次再返回。
+
+        Returns:
+            Dict[str, Any]: 快照数据，附加snapshot_age字段（快照距今的秒数）和
+            sample_interval字段（当前采样周期，客户端可据此安排轮询）
+        """
+        await self._ensure_fresh(name)
+        return {**self._snapshots[name], "snapshot_age": self.snapshot_age(name),
+                "sample_interval": self.interval(name)}
+
+    async def _ensure_fresh(self, name: str) -> None:
+        """
+        尚无快照（采集器未启动）或快照旧于两个基础周期时按需采集一次，然后记录客户端访问
+
+        先采集再唤醒采样循环，循环从这次采样开始按基础周期重新计划，不会紧接着再采一次。
+        """
+        if name not in self._snapshots or time.time() - self._timestamps[name] > 2 * self.intervals[name]:
+            pending = self._pending.get(name)
+            if pending is None:
+                pending = self._pending[name] = asyncio.ensure_future(self.refresh(name))
+                pending.add_done_callback(lambda _: self._pending.pop(name, None))
+            await asyncio.shield(pending)
+        self.touch(name)
+
+    async def get_processes(self, sort: str = "cpu", limit: int = 20) -> Dict[str, Any]:
+        """
+        读取前limit个进程
+
+        进程表不在后台周期采集（大量进程时扫描成本较高，且只有查看进程列表时才需要），
+        而是在请求时按需扫描；扫描器自身限制了最短扫描间隔，请求数量不影响扫描次数。
+        """
+        data = await asyncio.to_thread(self._collect_processes, sort, limit)
+        return {"timestamp": time.time(), **data}
+
+    @staticmethod
+    def _collect_processes(sort: str, limit: int) -> Dict[str, Any]:
+        with instrumentation.measure("processes"):
+            return SystemMonitor.get_process_info(sort, limit)
+
+    def render_metrics(self) -> bytes:
+        """把已有的快照渲染为OpenMetrics文本（不触发采集，尚无快照的子系统不输出）"""
+        for name in self._collectors:
+            self.touch(name)
+        snapshots = dict(self._snapshots)
+        return self.exposition.render(snapshots, {name: self.snapshot_age(name) for name in snapshots})
+
+    def snapshot_age(self, name: str) -> float:
+        """快照距今的秒数"""
+        return round(max(0.0, time.time() - self._timestamps[name]), 3)
+
+    async def get_all(self) -> Dict[str, Any]:
+        """
+        读取所有子系统的快照，格式与SystemMonitor.get_all_info()一致
+
+        snapshot_age取各子系统中最旧快照的年龄
+        """
+        await asyncio.gather(*(self._ensure_fresh(name) for name in self._collectors))
+        result: Dict[str, Any] = {"timestamp": time.time()}
+        for name in self._collectors:
+            result[name] = self._snapshots[name]
+        result["snapshot_age"] = max(self.snapshot_age(name) for name in self._collectors)
+        return result
+
+
+# 全局采集器实例，由main.py中的应用生命周期启动和停止
+collector = MetricsCollector()
@@ -0,0 +1,176 @@
+import os
+import socket
+from typing import Dict, List, Tuple
+
+
+def _env_float(name: str, default: float) -> float:
+    """读取浮点型环境变量，未设置或格式错误时返回默认值"""
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        print(f"Invalid value for {name}: {value!r}, using default {default}")
+        return default
+
+
+# 宿主机/proc和/sys的位置：容器内挂载了/host/proc、/host/sys时读取宿主机，否则读取本机；
+# 也可以通过环境变量指向其他目录（例如基准测试生成的合成/proc和/sys）
+HOST_PROC = os.getenv("MONITOR_HOST_PROC") or ('/host/proc' if os.path.exists('/host/proc') else '/proc')
+HOST_SYS = os.getenv("MONITOR_HOST_SYS") or ('/host/sys' if os.path.exists('/host/sys') else '/sys')
+# 是否直接解析HOST_PROC（挂载了/host/proc或显式指定时）；否则CPU、内存、磁盘和网络通过psutil读取
+HOST_PROC_MOUNTED = bool(os.getenv("MONITOR_HOST_PROC")) or os.path.exists('/host/proc')
+
+# 各子系统的采样周期（秒），可通过环境变量单独调整
+COLLECTOR_INTERVALS: Dict[str, float] = {
+    "cpu": _env_float("MONITOR_CPU_INTERVAL", 2.0),
+    "memory": _env_float("MONITOR_MEMORY_INTERVAL", 3.0),
+    "disk": _env_float("MONITOR_DISK_INTERVAL", 10.0),
+    "network": _env_float("MONITOR_NETWORK_INTERVAL", 2.0),
+    "cgroup": _env_float("MONITOR_CGROUP_INTERVAL", 5.0),
+    # PSI/负载是告警使用的饱和度信号，默认亚秒级采样（单次采样只有5次pread）
+    "pressure": _env_float("MONITOR_PRESSURE_INTERVAL", 0.5),
+    # 温度和热降频计数变化较慢
+    "sensors": _env_float("MONITOR_SENSORS_INTERVAL", 5.0),
+}
+
+# 推送流（/api/system/stream）空闲时发送心跳的间隔（秒），防止代理因超时断开连接
+STREAM_KEEPALIVE = _env_float("MONITOR_STREAM_KEEPALIVE", 15.0)
+
+# 自适应采样：没有客户端且指标稳定时逐次把采样周期翻倍，有客户端访问或指标变化时恢复
+SAMPLING_ADAPTIVE = os.getenv("MONITOR_ADAPTIVE_SAMPLING", "true").lower() in ("1", "true", "yes")
+# 自适应采样的最长周期（秒）
+SAMPLING_MAX_INTERVAL = _env_float("MONITOR_ADAPTIVE_MAX_INTERVAL", 60.0)
+# 视为稳定的相对变化（绝对值小于1的指标按绝对变化计算）
+SAMPLING_TOLERANCE = _env_float("MONITOR_ADAPTIVE_TOLERANCE", 0.05)
+# 最后一次客户端访问后保持基础周期的时长（秒）
+SAMPLING_IDLE_AFTER = _env_float("MONITOR_ADAPTIVE_IDLE_AFTER", 60.0)
+
+# 历史数据各分辨率的保留时长（秒），分辨率依次为1秒、10秒、1分钟
+HISTORY_RETENTION: Dict[int, float] = {
+    1: _env_float("MONITOR_HISTORY_RETENTION_1S", 3600),
+    10: _env_float("MONITOR_HISTORY_RETENTION_10S", 86400),
+    60: _env_float("MONITOR_HISTORY_RETENTION_1M", 7 * 86400),
+}
+
+
+def history_series_bytes(retention: Dict[int, float]) -> int:
+    """单个历史序列占用的内存（字节）：各分辨率的槽位数之和 × 4字节"""
+    return sum(4 * max(1, int(seconds // step)) for step, seconds in retention.items() if seconds > 0)
+
+
+# 历史数据的内存预算（MB），序列数量上限由预算和单个序列的大小算出；
+# 默认配置下每个序列约87KB，128MB约可保存1500个序列（256核主机约560个）
+HISTORY_MEMORY_MB = _env_float("MONITOR_HISTORY_MEMORY_MB", 128)
+# 历史数据最多保存的序列数量，显式设置时优先于内存预算
+HISTORY_MAX_SERIES = int(_env_float(
+    "MONITOR_HISTORY_MAX_SERIES", HISTORY_MEMORY_MB * 1024 * 1024 // history_series_bytes(HISTORY_RETENTION)
+))
+
+
+def _env_list(name: str, default: str) -> List[str]:
+    """读取逗号分隔的列表型环境变量"""
+    value = os.getenv(name)
+    if value is None:
+        value = default
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+# 网络接口过滤规则（glob通配符，逗号分隔），先匹配include再排除exclude
+NETWORK_INCLUDE: List[str] = _env_list("MONITOR_NET_INCLUDE", "*")
+NETWORK_EXCLUDE: List[str] = _env_list("MONITOR_NET_EXCLUDE", "lo,docker*,veth*")
+
+# 磁盘I/O统计的块设备过滤规则（glob通配符，逗号分隔）
+DISK_IO_INCLUDE: List[str] = _env_list("MONITOR_DISK_IO_INCLUDE", "*")
+DISK_IO_EXCLUDE: List[str] = _env_list("MONITOR_DISK_IO_EXCLUDE", "loop*,ram*,fd*,sr*")
+# 是否统计分区（默认只统计整块磁盘和dm等设备）
+DISK_IO_PARTITIONS = os.getenv("MONITOR_DISK_IO_PARTITIONS", "false").lower() in ("1", "true", "yes")
+
+# 单个挂载点statvfs结果的最短刷新间隔（秒），间隔内直接复用缓存
+STATVFS_INTERVAL = _env_float("MONITOR_STATVFS_INTERVAL", 10.0)
+# 单个挂载点statvfs的超时时间（秒），超时的挂载点标记为stale
+STATVFS_TIMEOUT = _env_float("MONITOR_STATVFS_TIMEOUT", 2.0)
+# 执行statvfs的线程数上限，卡住的挂载点（如失联的NFS）最多占用这么多线程
+STATVFS_WORKERS = int(_env_float("MONITOR_STATVFS_WORKERS", 4))
+
+# 进程扫描的最短间隔（秒），间隔内的请求直接复用上一次扫描的进程表
+PROCESS_SCAN_INTERVAL = _env_float("MONITOR_PROCESS_INTERVAL", 2.0)
+# 每次扫描至少读取的进程数量（不含热点进程），其余进程在后续扫描中轮流读取
+PROCESS_SCAN_BUDGET = int(_env_float("MONITOR_PROCESS_SCAN_BUDGET", 256))
+# 轮询周期（秒）：每次扫描的数量按 进程数 × 距上次扫描的时间 / 轮询周期 提高，
+# 非热点进程的数据最多滞后约一个轮询周期（进程很多时不会退化为几分钟）
+PROCESS_SCAN_ROTATION = _env_float("MONITOR_PROCESS_ROTATION", 20.0)
+# CPU占用最高、保持打开并每次都重新读取的进程数量
+PROCESS_HOT_SIZE = int(_env_float("MONITOR_PROCESS_HOT_SIZE", 64))
+
+# 需要统计子cgroup的根路径（相对于cgroup层级根目录，例如/system.slice或/docker），为空时只统计当前cgroup
+CGROUP_ROOT = os.getenv("MONITOR_CGROUP_ROOT", "")
+# 子cgroup的遍历深度
+CGROUP_DEPTH = int(_env_float("MONITOR_CGROUP_DEPTH", 1))
+# 每次采样读取的子cgroup数量上限，其余的在后续采样中轮流读取
+CGROUP_BUDGET = int(_env_float("MONITOR_CGROUP_BUDGET", 200))
+# 重新遍历子cgroup目录结构的间隔（秒），发现cgroup被删除时会提前遍历
+CGROUP_TREE_REFRESH = _env_float("MONITOR_CGROUP_TREE_REFRESH", 30.0)
+
+# 告警规则文件（JSON数组，每项包含name、expr、for、severity），为空时使用内置的默认规则
+ALERT_RULES_FILE = os.getenv("MONITOR_ALERT_RULES", "")
+
+# 历史数据持久化目录，为空时不持久化（重启后历史从头开始）
+STORAGE_DIR = os.getenv("MONITOR_STORAGE_DIR", "")
+# 持久化数据的保留时长（秒），默认90天
+STORAGE_RETENTION = _env_float("MONITOR_STORAGE_RETENTION", 90 * 86400)
+# 保留原始采样精度的时长（秒），更早的数据在压缩时降采样为STORAGE_DOWNSAMPLE秒的平均值
+STORAGE_RAW_RETENTION = _env_float("MONITOR_STORAGE_RAW_RETENTION", 7 * 86400)
+# 降采样后的分辨率（秒），0表示不降采样
+STORAGE_DOWNSAMPLE = int(_env_float("MONITOR_STORAGE_DOWNSAMPLE", 10))
+# 缓冲的采样写入磁盘的间隔（秒），越长写入次数越少，异常退出时最多丢失这么长时间的数据
+STORAGE_FLUSH_INTERVAL = _env_float("MONITOR_STORAGE_FLUSH_INTERVAL", 300.0)
+# 写入失败（磁盘满、I/O错误）时内存中最多保留的待写采样点数，超出时丢弃最早的采样（每点约16字节）
+STORAGE_MAX_PENDING = int(_env_float("MONITOR_STORAGE_MAX_PENDING", 2_000_000))
+# 单个段文件覆盖的时长（秒）
+STORAGE_SEGMENT_SECONDS = int(_env_float("MONITOR_STORAGE_SEGMENT_SECONDS", 86400))
+# 检查保留时长和压缩已结束段文件的间隔（秒）
+STORAGE_COMPACT_INTERVAL = _env_float("MONITOR_STORAGE_COMPACT_INTERVAL", 3600.0)
+
+# 运行模式：standalone（默认，只监控本机）、agent（监控本机并把采样推送给aggregator）、
+# aggregator（监控本机，同时接收多个agent推送的数据，通过host参数查询）
+MONITOR_MODE = os.getenv("MONITOR_MODE", "standalone").lower()
+if MONITOR_MODE not in ("standalone", "agent", "aggregator"):
+    print(f"Invalid value for MONITOR_MODE: {MONITOR_MODE!r}, using default 'standalone'")
+    MONITOR_MODE = "standalone"
+# 本机在aggregator中显示的主机名
+HOST_NAME = os.getenv("MONITOR_HOST_NAME") or socket.gethostname()
+
+# agent：aggregator的接收地址（host:port）
+AGGREGATOR_ADDRESS = os.getenv("MONITOR_AGGREGATOR_ADDRESS", "127.0.0.1:9100")
+# agent：批量推送的间隔（秒），间隔内的所有采样合并为一帧发送
+AGENT_BATCH_INTERVAL = _env_float("MONITOR_AGENT_BATCH_INTERVAL", 1.0)
+# agent：与aggregator断开期间最多缓存的采样次数，超出时丢弃最旧的
+AGENT_MAX_PENDING = int(_env_float("MONITOR_AGENT_MAX_PENDING", 1000))
+
+# aggregator：接收agent连接的监听地址（host:port）
+INGEST_LISTEN = os.getenv("MONITOR_INGEST_LISTEN", "0.0.0.0:9100")
+# aggregator：每台主机历史数据的保留时长（秒），比本机历史短，以便容纳上百台主机
+AGGREGATOR_RETENTION: Dict[int, float] = {
+    1: _env_float("MONITOR_AGGREGATOR_RETENTION_1S", 300),
+    10: _env_float("MONITOR_AGGREGATOR_RETENTION_10S", 1800),
+    60: _env_float("MONITOR_AGGREGATOR_RETENTION_1M", 6 * 3600),
+}
+# aggregator：每台主机最多保存的历史序列数量。256核主机（10块盘、20个挂载点和网卡、hwmon温度）约产生560个序列，
+# 统计子cgroup时每个子cgroup再加3个；序列按需分配，默认保留时长下每个约3.4KB，只有实际出现的序列占用内存
+AGGREGATOR_MAX_SERIES = int(_env_float("MONITOR_AGGREGATOR_MAX_SERIES", 1024))
+# aggregator：最多接收的主机数量
+AGGREGATOR_MAX_HOSTS = int(_env_float("MONITOR_AGGREGATOR_MAX_HOSTS", 1000))
+# aggregator：超过这么多秒没有收到数据的主机视为离线
+AGGREGATOR_HOST_TIMEOUT = _env_float("MONITOR_AGGREGATOR_HOST_TIMEOUT", 30.0)
+# aggregator：离线超过这么多秒的主机连同其历史一起移除（容器中的主机名默认是容器ID，agent每次重启都是一台新主机）
+AGGREGATOR_HOST_RETENTION = _env_float("MONITOR_AGGREGATOR_HOST_RETENTION", 3600.0)
+
+
+def parse_address(value: str, default_port: int) -> Tuple[str, int]:
+    """解析host:port形式的地址，省略端口时使用默认端口"""
+    host, _, port = value.rpartition(":")
+    if not host:
+        return value, default_port
+    return host.strip("[]"), int(port)
@@ -0,0 +1,116 @@
+import threading
+from array import array
+from typing import Dict, Any, List
+
+from app.core.proc_reader import ProcFile
+
+# /proc/stat中cpu行的列顺序
+STAT_FIELDS = ("user", "nice", "system", "idle", "iowait", "irq", "softirq", "steal", "guest", "guest_nice")
+_NFIELDS = len(STAT_FIELDS)
+(_USER, _NICE, _SYSTEM, _IDLE, _IOWAIT, _IRQ, _SOFTIRQ, _STEAL, _GUEST, _GUEST_NICE) = range(_NFIELDS)
+
+# 对外报告的使用率分类
+BREAKDOWN_FIELDS = ("user", "system", "iowait", "irq", "steal", "guest")
+
+
+class CpuSampler:
+    """
+    基于/proc/stat的有状态CPU采样器
+
+    /proc/stat中的计数是开机以来的累计jiffies，直接相除得到的是开机以来的平均负载。
+    采样器把上一次读取的每核jiffies保存在一个连续的array中，每次采样只读一次文件，
+    用两次采样的差值计算这段时间内的实际使用率，并按user/system/iowait/irq/steal/guest拆分。
+    """
+
+    def __init__(self, stat_path: str):
+        self.stat_path = stat_path
+        self._file = ProcFile(stat_path)
+        # 扁平存储：第0行为总体cpu，之后每个核心一行，每行_NFIELDS个计数
+        self._previous = array("Q")
+        self._lock = threading.Lock()
+
+    def _read(self) -> array:
+        """读取一次/proc/stat，返回所有cpu行的计数（扁平数组）"""
+        current = array("Q")
+        with self._file.lock:
+            size = self._file.read()
+            buffer = self._file.buffer
+            start = 0
+            # cpu行位于文件开头，遇到第一个非cpu行即停止
+            while start < size and buffer.startswith(b"cpu", start):
+                end = buffer.find(b"\n", start, size)
+                if end < 0:
+                    end = size
+                values = buffer[start:end].split()[1:_NFIELDS + 1]
+                current.extend(map(int, values))
+                # 旧内核没有steal/guest列时补0
+                for _ in range(_NFIELDS - len(values)):
+                    current.append(0)
+                start = end + 1
+        return current
+
+    def sample(self) -> Dict[str, Any]:
+        """
+        采样一次并返回与上一次采样之间的CPU使用率
+
+        首次采样没有历史数据，返回开机以来的平均值。
+
+        Returns:
+            Dict[str, Any]: 包含以下字段：
+                - cpu_percent: 总体使用率（百分比）
+                - cpu_per_core: 每个核心的使用率列表
+                - cpu_breakdown: 总体使用率按类别拆分（百分比）
+                - cpu_per_core_breakdown: 每个类别对应的每核使用率列表
+                - cpu_count: 核心数量
+        """
+        current = self._read()
+        with self._lock:
+            previous = self._previous
+            self._previous = current
+        if len(previous) != len(current):
+            # 首次采样或CPU热插拔，重新建立基线
+            previous = array("Q", bytes(len(current) * current.itemsize))
+
+        rows = len(current) // _NFIELDS
+        per_core: List[float] = []
+        per_core_breakdown: Dict[str, List[float]] = {name: [] for name in BREAKDOWN_FIELDS}
+        total_percent = 0.0
+        total_breakdown: Dict[str, float] = {}
+
+        for row in range(rows):
+            base = row * _NFIELDS
+            # iowait允许倒退，CPU热插拔后计数从0重新开始，负的增量按0处理
+            d = [max(0, current[base + i] - previous[base + i]) for i in range(_NFIELDS)]
+            # guest/guest_nice已计入user/nice，总时间中不能重复计算
+            total = sum(d[:_GUEST])
+            busy = total - d[_IDLE] - d[_IOWAIT]
+            if total <= 0:
+                percent = 0.0
+                breakdown = dict.fromkeys(BREAKDOWN_FIELDS, 0.0)
+            else:
+                scale = 100.0 / total
+                percent = min(100.0, max(0.0, round(busy * scale, 1)))
+                breakdown = {
+                    "user": round(max(0, d[_USER] + d[_NICE] - d[_GUEST] - d[_GUEST_NICE]) * scale, 1),
+                    "system": round(d[_SYSTEM] * scale, 1),
+                    "iowait": round(d[_IOWAIT] * scale, 1),
+                    "irq": round((d[_IRQ] + d[_SOFTIRQ]) * scale, 1),
+                    "steal": round(d[_STEAL] * scale, 1),
+                    "guest": round((d[_GUEST] + d[_GUEST_NICE]) * scale, 1),
+                }
+
+            if row == 0:
+                total_percent = percent
+                total_breakdown = breakdown
+            else:
+                per_core.append(percent)
+                for name in BREAKDOWN_FIELDS:
+                    per_core_breakdown[name].append(breakdown[name])
+
+        return {
+            "cpu_percent": total_percent,
+            "cpu_per_core": per_core,
+            "cpu_breakdown": total_breakdown,
+            "cpu_per_core_breakdown": per_core_breakdown,
+            "cpu_count": len(per_core),
+        }
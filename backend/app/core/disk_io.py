@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from typing import Dict, Any, Callable, Iterable, List, Optional, Set, Tuple
+
+from app.core.proc_reader import ProcFile
+
+# 每个设备保存的计数，顺序固定（字节数已由扇区换算）
+COUNTER_FIELDS = (
+    "reads", "read_bytes", "read_ms",
+    "writes", "write_bytes", "write_ms",
+    "busy_ms", "weighted_ms",
+)
+(_READS, _READ_BYTES, _READ_MS, _WRITES, _WRITE_BYTES, _WRITE_MS, _BUSY_MS, _WEIGHTED_MS) = range(len(COUNTER_FIELDS))
+
+# /proc/diskstats中的扇区固定为512字节，与设备实际扇区大小无关
+SECTOR_SIZE = 512
+
+# /sys/block的刷新间隔（秒），只在出现未知设备时才会刷新
+_BLOCK_REFRESH_INTERVAL = 60.0
+
+
+class WholeDiskSet:
+    """
+    整块磁盘（非分区）的名称集合
+
+    /sys/block下只列出整块磁盘以及dm、md等设备，不包含分区。集合只在启动时和
+    出现未知设备时（最多每分钟一次）通过一次listdir刷新，不需要逐个设备打开文件。
+    /sys不可用时认为所有设备都是整块磁盘。
+    """
+
+    def __init__(self, sys_block_dir: str):
+        self.sys_block_dir = sys_block_dir
+        self._names: Optional[Set[str]] = None
+        self._refreshed = 0.0
+
+    def _refresh(self) -> None:
+        self._refreshed = time.monotonic()
+        try:
+            self._names = set(os.listdir(self.sys_block_dir))
+        except OSError:
+            self._names = None
+
+    def __contains__(self, name: str) -> bool:
+        if self._refreshed == 0.0:
+            self._refresh()
+        if self._names is None:
+            return True
+        if name in self._names:
+            return True
+        if time.monotonic() - self._refreshed > _BLOCK_REFRESH_INTERVAL:
+            self._refresh()
+            return self._names is None or name in self._names
+        return False
+
+
+def parse_diskstats(file: ProcFile, accept: Callable[[str], bool]) -> List[Tuple[str, Tuple[int, ...]]]:
+    """
+    解析/proc/diskstats，返回(设备名, 按COUNTER_FIELDS顺序的计数)列表
+
+    每行先只切出设备名，被过滤掉的设备（如数千个分区、loop设备）不再做完整切分和数值转换。
+    """
+    devices: List[Tuple[str, Tuple[int, ...]]] = []
+    with file.lock:
+        for line in file.lines():
+            parts = line.split(None, 3)
+            if len(parts) < 4:
+                continue
+            name = parts[2].decode()
+            if not accept(name):
+                continue
+            values = parts[3].split()
+            if len(values) < 11:
+                continue
+            devices.append((name, (
+                int(values[0]), int(values[2]) * SECTOR_SIZE, int(values[3]),
+                int(values[4]), int(values[6]) * SECTOR_SIZE, int(values[7]),
+                int(values[9]), int(values[10]),
+            )))
+    return devices
+
+
+class DiskIOSampler:
+    """
+    按设备计算磁盘吞吐、IOPS、平均等待时间和繁忙度
+
+    与NetworkSampler相同，所有指标都由相邻两次采样的计数差和单调时钟时间差得到。
+    """
+
+    def __init__(self):
+        self._previous: Dict[str, Tuple[int, ...]] = {}
+        self._previous_time: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def update(self, devices: Iterable[Tuple[str, Tuple[int, ...]]]) -> List[Dict[str, Any]]:
+        """
+        用一次采样的设备计数更新状态
+
+        Returns:
+            List[Dict[str, Any]]: 每个设备包含：
+                - device: 设备名
+                - read_bytes_rate/write_bytes_rate: 读/写吞吐（字节/秒）
+                - read_iops/write_iops: 每秒完成的读/写请求数
+                - await_ms: 请求的平均等待时间（毫秒，含排队）
+                - util_percent: 设备繁忙时间占比（百分比）
+                - queue_depth: 平均队列深度
+        """
+        now = time.monotonic()
+        with self._lock:
+            previous = self._previous
+            elapsed = now - self._previous_time if self._previous_time is not None else 0.0
+            current: Dict[str, Tuple[int, ...]] = {}
+            result: List[Dict[str, Any]] = []
+
+            for name, counters in devices:
+                current[name] = counters
+                before = previous.get(name)
+                if before is None or elapsed <= 0:
+                    delta = (0,) * len(COUNTER_FIELDS)
+                else:
+                    # 计数回绕或设备重建时按0处理
+                    delta = tuple(max(after - prior, 0) for after, prior in zip(counters, before))
+
+                operations = delta[_READS] + delta[_WRITES]
+                elapsed_ms = elapsed * 1000
+                result.append({
+                    "device": name,
+                    "read_bytes_rate": round(delta[_READ_BYTES] / elapsed, 1) if elapsed > 0 else 0.0,
+                    "write_bytes_rate": round(delta[_WRITE_BYTES] / elapsed, 1) if elapsed > 0 else 0.0,
+                    "read_iops": round(delta[_READS] / elapsed, 1) if elapsed > 0 else 0.0,
+                    "write_iops": round(delta[_WRITES] / elapsed, 1) if elapsed > 0 else 0.0,
+                    "await_ms": round((delta[_READ_MS] + delta[_WRITE_MS]) / operations, 2) if operations else 0.0,
+                    "util_percent": round(min(delta[_BUSY_MS] / elapsed_ms * 100, 100.0), 1) if elapsed > 0 else 0.0,
+                    "queue_depth": round(delta[_WEIGHTED_MS] / elapsed_ms, 2) if elapsed > 0 else 0.0,
+                })
+
+            self._previous = current
+            self._previous_time = now
+        return result
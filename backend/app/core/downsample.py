@@ -0,0 +1,132 @@
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+
+def lttb(timestamps: Sequence[float], values: Sequence[float], threshold: int) -> Tuple[List[float], List[float]]:
+    """
+    Largest-Triangle-Three-Buckets降采样：保留threshold个点，尽量保持曲线的视觉形状
+
+    首尾两点保留，其余点均分为threshold-2个桶，每个桶中选出与上一个选中点、下一个桶的平均点
+    构成的三角形面积最大的点。与按步长取平均不同，尖峰和谷底会被保留下来。
+    values中不能有None（缺失数据由downsample按连续段分别处理）。
+    """
+    length = len(values)
+    if threshold >= length or threshold < 3:
+        return list(timestamps), list(values)
+
+    out_t = [timestamps[0]]
+    out_v = [values[0]]
+    every = (length - 2) / (threshold - 2)
+    selected = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+        # 下一个桶的平均点（最后一个桶使用末尾的点）
+        next_start = end
+        next_end = min(int((bucket + 2) * every) + 1, length)
+        span = next_end - next_start
+        avg_t = sum(timestamps[next_start:next_end]) / span
+        avg_v = sum(values[next_start:next_end]) / span
+
+        point_t = timestamps[selected]
+        point_v = values[selected]
+        # 三角形面积的两倍：|(A - C) x (B - A)|，对桶内各点只有B变化，展开后是B的线性函数
+        dt = point_t - avg_t
+        dv = avg_v - point_v
+        best = start
+        best_area = -1.0
+        for index in range(start, end):
+            area = abs(dt * (values[index] - point_v) - (point_t - timestamps[index]) * dv)
+            if area > best_area:
+                best_area = area
+                best = index
+        out_t.append(timestamps[best])
+        out_v.append(values[best])
+        selected = best
+    out_t.append(timestamps[-1])
+    out_v.append(values[-1])
+    return out_t, out_v
+
+
+def _minmax(timestamps: List[float], values: List[Optional[float]], points: int) -> Tuple[List[float], List[Optional[float]]]:
+    """
+    按下标把序列均分为points/2个桶，每个桶保留最小值和最大值（按时间顺序），全为缺失的桶保留一个None，
+    相邻的None合并为一个。输出不超过points个点，用于缺失很多、分段过碎而无法按段做LTTB的序列。
+    """
+    buckets = max(points // 2, 1)
+    length = len(values)
+    out_t: List[float] = []
+    out_v: List[Optional[float]] = []
+    for bucket in range(buckets):
+        start = bucket * length // buckets
+        end = (bucket + 1) * length // buckets
+        low = high = None
+        for index in range(start, end):
+            value = values[index]
+            if value is None:
+                continue
+            if low is None or value < values[low]:
+                low = index
+            if high is None or value > values[high]:
+                high = index
+        if low is None:
+            if end > start and (not out_v or out_v[-1] is not None):
+                out_t.append(timestamps[start])
+                out_v.append(None)
+            continue
+        for index in sorted({low, high}):
+            out_t.append(timestamps[index])
+            out_v.append(values[index])
+    return out_t, out_v
+
+
+def downsample(result: Dict[str, Any], points: int) -> Dict[str, Any]:
+    """
+    用LTTB把历史查询结果降到最多points个点（通常取图表的像素宽度）
+
+    缺失数据（None）把序列分成若干连续段，各段按点数比例分配配额分别降采样，
+    段之间保留一个None，图表上的断点不会被连起来。缺失频繁、每段至少3个点加上分隔的None
+    就会超过points时，改为按桶保留最小值和最大值（_minmax）。结果中附加points字段（实际点数）。
+    """
+    timestamps: List[float] = result["timestamps"]
+    values: List[Optional[float]] = result["values"]
+    if len(values) <= points:
+        return {**result, "points": len(values)}
+
+    # 连续段：[start, end)
+    runs: List[Tuple[int, int]] = []
+    start = None
+    for index, value in enumerate(values):
+        if value is None:
+            if start is not None:
+                runs.append((start, index))
+                start = None
+        elif start is None:
+            start = index
+    if start is not None:
+        runs.append((start, len(values)))
+
+    present = sum(end - start for start, end in runs)
+    if not present:
+        return {**result, "timestamps": timestamps[:1], "values": [None], "points": 1}
+    # 每段前后的缺失各占一个点
+    separators = len(runs) - 1 + (runs[0][0] > 0) + (runs[-1][1] < len(values))
+    available = points - separators
+    budgets = [min(end - start, max(3, round(available * (end - start) / present))) for start, end in runs]
+    if available < 3 or sum(budgets) > available:
+        out_t, out_v = _minmax(timestamps, values, points)
+        return {**result, "timestamps": out_t, "values": out_v, "points": len(out_v)}
+
+    out_t: List[float] = []
+    out_v: List[Optional[float]] = []
+    for (start, end), budget in zip(runs, budgets):
+        if start > 0:
+            # 段前的缺失点
+            out_t.append(timestamps[start - 1])
+            out_v.append(None)
+        run_t, run_v = lttb(timestamps[start:end], values[start:end], budget)
+        out_t.extend(run_t)
+        out_v.extend(run_v)
+    if runs[-1][1] < len(values):
+        out_t.append(timestamps[runs[-1][1]])
+        out_v.append(None)
+    return {**result, "timestamps": out_t, "values": out_v, "points": len(out_v)}
@@ -0,0 +1,37 @@
+import fnmatch
+import re
+from typing import Dict, Iterable, Optional
+
+# 过滤结果缓存的上限，防止大量短生命周期的名称（如veth接口）导致缓存无限增长
+_MAX_CACHED_DECISIONS = 8192
+
+
+class NameFilter:
+    """
+    基于glob模式的名称过滤器（网络接口、块设备等）
+
+    include/exclude的glob模式在构造时编译为一个正则表达式，每个名称的判断结果再缓存下来，
+    采样时每个名称只需一次字典查找。include为空表示全部包含。
+    """
+
+    def __init__(self, include: Iterable[str], exclude: Iterable[str]):
+        self._include = self._compile(include)
+        self._exclude = self._compile(exclude)
+        self._decisions: Dict[str, bool] = {}
+
+    @staticmethod
+    def _compile(patterns: Iterable[str]) -> Optional["re.Pattern[str]"]:
+        patterns = list(patterns)
+        if not patterns:
+            return None
+        return re.compile("|".join(f"(?:{fnmatch.translate(pattern)})" for pattern in patterns))
+
+    def __call__(self, name: str) -> bool:
+        decision = self._decisions.get(name)
+        if decision is None:
+            included = self._include is None or self._include.match(name) is not None
+            decision = included and (self._exclude is None or self._exclude.match(name) is None)
+            if len(self._decisions) >= _MAX_CACHED_DECISIONS:
+                self._decisions.clear()
+            self._decisions[name] = decision
+        return decision
@@ -0,0 +1,206 @@
+import math
+import threading
+import time
+from array import array
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.config import HISTORY_RETENTION, HISTORY_MAX_SERIES
+
+_NAN = float("nan")
+
+
+class RingSeries:
+    """
+    固定容量的环形时间序列（单一分辨率）
+
+    每个槽位对应一个长度为step秒的时间桶，槽位下标由桶编号对容量取模得到，
+    因此时间戳是隐式的，每个数据点只占一个float32（4字节）。
+    同一个桶内的多次写入取平均值，缺失的桶为NaN。
+    """
+
+    __slots__ = ("step", "capacity", "values", "head", "first", "_sum", "_count")
+
+    def __init__(self, step: int, capacity: int):
+        self.step = step
+        self.capacity = capacity
+        self.values = array("f", [_NAN]) * capacity
+        self.head = -1  # 最新桶的编号，-1表示尚无数据
+        self.first = -1  # 第一次写入的桶编号
+        self._sum = 0.0
+        self._count = 0
+
+    def append(self, timestamp: float, value: float) -> None:
+        bucket = int(timestamp // self.step)
+        if bucket < self.head:
+            # 乱序的旧数据直接丢弃
+            return
+        if bucket > self.head:
+            if self.first < 0:
+                self.first = bucket
+            # 清空跳过的桶，最多清空一整圈
+            if self.head >= 0:
+                for skipped in range(self.head + 1, min(bucket, self.head + 1 + self.capacity)):
+                    self.values[skipped % self.capacity] = _NAN
+            self.head = bucket
+            self._sum = 0.0
+            self._count = 0
+        self._sum += value
+        self._count += 1
+        self.values[bucket % self.capacity] = self._sum / self._count
+
+    @property
+    def retention(self) -> float:
+        return self.step * self.capacity
+
+    def read(self, start_bucket: int, end_bucket: int) -> Tuple[int, List[float]]:
+        """
+        读取[start_bucket, end_bucket]范围内的数据（会裁剪到保留范围内）
+
+        Returns:
+            Tuple[int, List[float]]: 实际起始桶编号和对应的值列表
+        """
+        if self.head < 0:
+            return start_bucket, []
+        start_bucket = max(start_bucket, self.first, self.head - self.capacity + 1)
+        end_bucket = min(end_bucket, self.head)
+        if end_bucket < start_bucket:
+            return start_bucket, []
+        start_slot = start_bucket % self.capacity
+        length = end_bucket - start_bucket + 1
+        if start_slot + length <= self.capacity:
+            values = self.values[start_slot:start_slot + length].tolist()
+        else:
+            values = (self.values[start_slot:] + self.values[:start_slot + length - self.capacity]).tolist()
+        return start_bucket, values
+
+    def nbytes(self) -> int:
+        return self.capacity * self.values.itemsize
+
+
+class MetricHistory:
+    """单个指标的多分辨率历史（例如1秒/10秒/1分钟），每次写入同时更新所有分辨率"""
+
+    __slots__ = ("levels",)
+
+    def __init__(self, retention: Dict[int, float]):
+        self.levels = [
+            RingSeries(step, max(1, int(seconds // step)))
+            for step, seconds in sorted(retention.items())
+            if seconds > 0
+        ]
+
+    def append(self, timestamp: float, value: float) -> None:
+        for level in self.levels:
+            level.append(timestamp, value)
+
+    def select_level(self, since: float, now: float, step: Optional[float]) -> RingSeries:
+        """
+        选择查询使用的分辨率：在保留时长覆盖查询范围的分辨率中，
+        选取不超过请求步长的最粗分辨率；都不满足时使用覆盖范围内最细的分辨率
+        """
+        covering = [level for level in self.levels if now - level.retention <= since]
+        if not covering:
+            covering = [self.levels[-1]]
+        if step is None:
+            return covering[0]
+        fitting = [level for level in covering if level.step <= step]
+        return fitting[-1] if fitting else covering[0]
+
+    def nbytes(self) -> int:
+        return sum(level.nbytes() for level in self.levels)
+
+
+class HistoryStore:
+    """
+    所有指标历史的集合，由采集器在每次采样后写入
+
+    每个序列占用的内存固定为 4字节 × 各分辨率槽位数之和，序列数量有上限，
+    因此总内存可预测。例如默认配置（1秒×1小时、10秒×1天、1分钟×7天）下
+    每个序列约87KB，128核主机的约160个序列共约14MB；序列数量上限默认由MONITOR_HISTORY_MEMORY_MB的预算算出。
+    """
+
+    def __init__(self, retention: Optional[Dict[int, float]] = None, max_series: int = HISTORY_MAX_SERIES):
+        self.retention = dict(retention or HISTORY_RETENTION)
+        self.max_series = max_series
+        self._series: Dict[str, MetricHistory] = {}
+        self._lock = threading.Lock()
+        self._dropped: set = set()
+
+    def record(self, timestamp: float, metrics: Dict[str, float]) -> None:
+        """写入一次采样的所有指标"""
+        with self._lock:
+            for name, value in metrics.items():
+                if value is None:
+                    continue
+                series = self._series.get(name)
+                if series is None:
+                    if len(self._series) >= self.max_series:
+                        if name not in self._dropped:
+                            self._dropped.add(name)
+                            print(f"History series limit reached, dropping metric: {name}")
+                        continue
+                    series = self._series[name] = MetricHistory(self.retention)
+                series.append(timestamp, float(value))
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return sorted(self._series)
+
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(series.nbytes() for series in self._series.values())
+
+    def query(self, metric: str, since: float, until: Optional[float] = None,
+              step: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        查询指标在[since, until]内的历史数据，并按step秒降采样（桶内取平均）
+
+        Returns:
+            Optional[Dict[str, Any]]: 指标不存在时返回None，否则包含：
+                - metric: 指标名称
+                - resolution: 实际使用的存储分辨率（秒）
+                - step: 返回数据的步长（秒）
+                - timestamps: 每个数据点所在时间桶的起始时间戳
+                - values: 对应的值，缺失数据为None
+        """
+        now = time.time()
+        until = now if until is None else until
+        with self._lock:
+            series = self._series.get(metric)
+            if series is None:
+                return None
+            level = series.select_level(since, now, step)
+            start_bucket, raw = level.read(int(since // level.step), int(until // level.step))
+
+        resolution = level.step
+        factor = max(1, int(round(step / resolution))) if step else 1
+        out_step = resolution * factor
+
+        timestamps: List[float] = []
+        values: List[Optional[float]] = []
+        # 按输出步长对齐分组，保证不同请求得到一致的时间桶
+        group_start = (start_bucket // factor) * factor
+        total = 0.0
+        count = 0
+        for offset, value in enumerate(raw):
+            bucket = start_bucket + offset
+            if bucket >= group_start + factor:
+                timestamps.append(group_start * resolution)
+                values.append(round(total / count, 3) if count else None)
+                group_start = (bucket // factor) * factor
+                total = 0.0
+                count = 0
+            if not math.isnan(value):
+                total += value
+                count += 1
+        if raw:
+            timestamps.append(group_start * resolution)
+            values.append(round(total / count, 3) if count else None)
+
+        return {
+            "metric": metric,
+            "resolution": resolution,
+            "step": out_step,
+            "timestamps": timestamps,
+            "values": values,
+        }
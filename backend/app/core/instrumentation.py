@@ -0,0 +1,224 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional
+
+import psutil
+
+# 采集耗时直方图各桶的上界（秒），最后还有一个+Inf桶
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class CollectorStats:
+    """单个采集函数的累计统计"""
+
+    __slots__ = ("calls", "errors", "fallbacks", "bytes_read", "seconds", "cpu_seconds",
+                 "last_seconds", "max_seconds", "buckets", "last_error", "last_error_at")
+
+    def __init__(self):
+        self.calls = 0
+        # errors：未能恢复或只能返回空结果的错误；fallbacks：宿主机读取失败后改用psutil的次数
+        self.errors = 0
+        self.fallbacks = 0
+        self.bytes_read = 0
+        self.seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.last_seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets: List[int] = [0] * (len(DURATION_BUCKETS) + 1)
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[float] = None
+
+    def observe(self, seconds: float, cpu_seconds: float, bytes_read: int) -> None:
+        self.calls += 1
+        self.seconds += seconds
+        self.cpu_seconds += cpu_seconds
+        self.bytes_read += bytes_read
+        self.last_seconds = seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+        self.buckets[bisect_left(DURATION_BUCKETS, seconds)] += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """由直方图估计分位数（返回所在桶的上界，不超过观测到的最大值）"""
+        if not self.calls:
+            return None
+        rank = q * self.calls
+        count = 0
+        for index, bucket in enumerate(self.buckets):
+            count += bucket
+            if count >= rank:
+                if index < len(DURATION_BUCKETS):
+                    return min(DURATION_BUCKETS[index], self.max_seconds)
+                break
+        return self.max_seconds
+
+    def summary(self) -> Dict[str, Any]:
+        cumulative: List[int] = []
+        count = 0
+        for bucket in self.buckets:
+            count += bucket
+            cumulative.append(count)
+        p50 = self.quantile(0.5)
+        p99 = self.quantile(0.99)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "fallbacks": self.fallbacks,
+            "bytes_read": self.bytes_read,
+            "total_seconds": round(self.seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "mean_ms": round(self.seconds / self.calls * 1000, 3) if self.calls else None,
+            "p50_ms": round(p50 * 1000, 3) if p50 is not None else None,
+            "p99_ms": round(p99 * 1000, 3) if p99 is not None else None,
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "last_ms": round(self.last_seconds * 1000, 3),
+            "histogram": {"le": list(DURATION_BUCKETS) + ["+Inf"], "counts": cumulative},
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at,
+        }
+
+
+class Instrumentation:
+    """
+    监控程序自身的开销统计
+
+    - measure(name)包裹一次采集调用，记录墙钟耗时、采集线程的CPU时间和本次读取的字节数
+    - 读取/proc、/sys的代码调用count_bytes()，字节数记到当前线程正在执行的采集上
+      （每个采集调用都在独立的线程中执行，用线程局部变量区分，读取路径上不需要加锁）
+    - 各get_*_info的回退分支调用record_error()代替直接print：同一采集的错误信息与上一次
+      相同时不再重复打印，避免每秒刷屏
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, CollectorStats] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._process = psutil.Process(os.getpid())
+        self._started = time.time()
+        # 上一次读取进程CPU时间的(单调时钟, CPU秒数)，用于计算区间CPU使用率
+        self._last_cpu: Optional[tuple] = None
+
+    def _get(self, name: str) -> CollectorStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(name, CollectorStats())
+        return stats
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """统计一次采集调用；调用抛出的异常会计入errors后继续抛出"""
+        local = self._local
+        previous = getattr(local, "bytes", None)
+        local.bytes = 0
+        started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            yield
+        except Exception as e:
+            self.record_error(name, f"Error collecting {name} info: {e}")
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            cpu = time.thread_time() - cpu_started
+            bytes_read = local.bytes
+            local.bytes = previous
+            if previous is not None:
+                # 嵌套的统计，读取的字节同时计入外层
+                local.bytes += bytes_read
+            stats = self._get(name)
+            with self._lock:
+                stats.observe(elapsed, cpu, bytes_read)
+
+    def count_bytes(self, size: int) -> None:
+        """记录从/proc或/sys读取的字节数（不在measure内的读取不计）"""
+        local = self._local
+        current = getattr(local, "bytes", None)
+        if current is not None:
+            local.bytes = current + size
+
+    def record_error(self, name: str, message: str, fallback: bool = False) -> None:
+        """
+        记录采集错误
+
+        Args:
+            name: 采集名称，例如cpu、memory
+            message: 错误信息，与上一次不同时打印
+            fallback: 是否已回退到psutil（计入fallbacks而不是errors）
+        """
+        stats = self._get(name)
+        with self._lock:
+            if fallback:
+                stats.fallbacks += 1
+            else:
+                stats.errors += 1
+            repeated = stats.last_error == message
+            stats.last_error = message
+            stats.last_error_at = time.time()
+        if not repeated:
+            print(message)
+
+    def process_info(self) -> Dict[str, Any]:
+        """
+        后端进程自身的资源占用
+
+        cpu_percent为距上一次调用的平均值（首次调用时为进程启动以来的平均值），单核满载为100%
+        """
+        process = self._process
+        with process.oneshot():
+            cpu_times = process.cpu_times()
+            memory = process.memory_info()
+            threads = process.num_threads()
+            try:
+                fds = process.num_fds()
+            except (AttributeError, psutil.Error):
+                fds = None
+            created = process.create_time()
+        cpu_total = cpu_times.user + cpu_times.system
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_cpu
+            self._last_cpu = (now, cpu_total)
+        if last is not None and now > last[0]:
+            cpu_percent = (cpu_total - last[1]) / (now - last[0]) * 100
+        else:
+            cpu_percent = cpu_total / max(time.time() - created, 1e-6) * 100
+        return {
+            "pid": process.pid,
+            "uptime": round(time.time() - created, 1),
+            "cpu_percent": round(cpu_percent, 2),
+            "cpu_user_seconds": round(cpu_times.user, 3),
+            "cpu_system_seconds": round(cpu_times.system, 3),
+            "memory_rss": memory.rss,
+            "memory_vms": memory.vms,
+            "num_threads": threads,
+            "num_fds": fds,
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        所有采集的统计和后端进程的资源占用
+
+        collector_cpu_percent是各采集线程累计的CPU时间占统计时长的比例，
+        即采集本身（不含接口请求和事件循环）平均占用的单核百分比
+        """
+        with self._lock:
+            collectors = {name: stats.summary() for name, stats in sorted(self._stats.items())}
+        elapsed = max(time.time() - self._started, 1e-6)
+        cpu_seconds = sum(stats["cpu_seconds"] for stats in collectors.values())
+        return {
+            "timestamp": time.time(),
+            "process": self.process_info(),
+            "collector_cpu_percent": round(cpu_seconds / elapsed * 100, 3),
+            "bytes_read": sum(stats["bytes_read"] for stats in collectors.values()),
+            "errors": sum(stats["errors"] for stats in collectors.values()),
+            "fallbacks": sum(stats["fallbacks"] for stats in collectors.values()),
+            "collectors": collectors,
+        }
+
+
+# 全局统计实例，采集函数和/proc读取器直接引用
+instrumentation = Instrumentation()
@@ -0,0 +1,150 @@
+import select
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.instrumentation import instrumentation
+from app.core.proc_reader import ProcFile, parse_mounts
+
+
+class MountTable:
+    """
+    缓存的挂载表，只在内容变化时重新解析
+
+    /proc/<pid>/mounts支持poll：挂载表自上次检查后发生变化时返回POLLPRI|POLLERR。
+    每次采样只做一次非阻塞poll，未变化时直接返回缓存的解析结果。
+    文件不支持poll时退化为比较原始内容，内容相同也不会重新解析。
+    """
+
+    def __init__(self, path: str):
+        self.file = ProcFile(path)
+        self._mounts: Optional[List[Tuple[str, str, str]]] = None
+        self._poller: Optional[select.poll] = None
+        self._raw: Optional[bytes] = None
+        self._lock = threading.Lock()
+
+    def _changed(self) -> bool:
+        if self._poller is None:
+            try:
+                self._poller = select.poll()
+                self._poller.register(self.file.fileno(), select.POLLPRI | select.POLLERR)
+            except (OSError, AttributeError):
+                self._poller = None
+                return self._content_changed()
+            # 注册后的首次poll只用于建立基线
+            self._poller.poll(0)
+            return True
+        events = self._poller.poll(0)
+        return any(mask & (select.POLLPRI | select.POLLERR) for _, mask in events)
+
+    def _content_changed(self) -> bool:
+        with self.file.lock:
+            size = self.file.read()
+            raw = bytes(self.file.buffer[:size])
+        changed = raw != self._raw
+        self._raw = raw
+        return changed
+
+    def get(self) -> List[Tuple[str, str, str]]:
+        """返回(设备, 挂载点, 文件系统类型)列表"""
+        with self._lock:
+            if self._mounts is None or self._changed():
+                self._mounts = parse_mounts(self.file)
+            return self._mounts
+
+
+class MountStatCache:
+    """
+    挂载点容量查询（statvfs）的缓存与超时控制
+
+    - 查询在有界线程池中执行，单次采样最多等待timeout秒，超时的挂载点返回上一次的结果并标记为stale
+    - 仍在执行中的查询不会重复提交也不会再次等待，失联的挂载点最多占用一个线程
+    - 每个挂载点的结果在min_interval秒内直接复用，限制statvfs的调用频率；结果按提交时间记录，
+      间隔为min_interval的采样不会因为查询本身的耗时而隔一次才刷新
+    """
+
+    def __init__(self, func: Callable[[str], Any], max_workers: int, timeout: float, min_interval: float):
+        self.func = func
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="statvfs")
+        # 挂载点 -> (执行中的查询, 提交时间)
+        self._pending: Dict[str, Tuple[Future, float]] = {}
+        self._results: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def query(self, mountpoints: Iterable[str]) -> Dict[str, Tuple[Optional[Any], bool]]:
+        """
+        查询一批挂载点
+
+        Returns:
+            Dict[str, Tuple[Optional[Any], bool]]: 挂载点 -> (查询结果, 是否过期)；
+                从未成功查询过的挂载点结果为None
+        """
+        mountpoints = list(mountpoints)
+        now = time.monotonic()
+        with self._lock:
+            waiting: Dict[str, Future] = {}
+            submitted: List[Future] = []
+            for mountpoint in mountpoints:
+                pending = self._pending.get(mountpoint)
+                if pending is None:
+                    cached = self._results.get(mountpoint)
+                    # 留10%余量：采样时刻有抖动，间隔恰为min_interval的采样也应刷新
+                    if cached is not None and now - cached[0] < self.min_interval * 0.9:
+                        continue
+                    future = self._executor.submit(self.func, mountpoint)
+                    self._pending[mountpoint] = (future, now)
+                    submitted.append(future)
+                else:
+                    future = pending[0]
+                waiting[mountpoint] = future
+
+        # 只等待本次新提交的查询；之前已超时的查询不再等待，完成了就顺带收取结果
+        if submitted:
+            wait(submitted, timeout=self.timeout)
+
+        result: Dict[str, Tuple[Optional[Any], bool]] = {}
+        with self._lock:
+            for mountpoint, future in waiting.items():
+                if not future.done():
+                    continue
+                submitted_at = self._pending.pop(mountpoint)[1]
+                try:
+                    self._results[mountpoint] = (submitted_at, future.result())
+                except Exception as e:
+                    instrumentation.record_error("disk", f"Error getting disk stats for {mountpoint}: {e}")
+                    self._results.pop(mountpoint, None)
+
+            for mountpoint in mountpoints:
+                cached = self._results.get(mountpoint)
+                stale = mountpoint in self._pending
+                if cached is None and not stale:
+                    continue
+                result[mountpoint] = (cached[1] if cached else None, stale)
+
+            # 清理已经卸载的挂载点
+            active = set(mountpoints)
+            for mountpoint in [mp for mp in self._results if mp not in active]:
+                del self._results[mountpoint]
+        return result
+
+
+def collapse_devices(mounts: Iterable[Tuple[str, str, str]]) -> List[Tuple[str, str, str]]:
+    """
+    合并同一块设备的多个挂载（bind mount等），保留挂载点路径最短的一个
+
+    只合并/dev/下的块设备；overlay、nfs等设备名可能被多个不同文件系统共用，保持原样。
+    """
+    chosen: Dict[str, str] = {}
+    mounts = list(mounts)
+    for device, mountpoint, _ in mounts:
+        if device.startswith("/dev/"):
+            existing = chosen.get(device)
+            if existing is None or len(mountpoint) < len(existing):
+                chosen[device] = mountpoint
+    return [
+        mount for mount in mounts
+        if not mount[0].startswith("/dev/") or chosen[mount[0]] == mount[1]
+    ]
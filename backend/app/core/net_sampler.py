@@ -0,0 +1,83 @@
+import threading
+import time
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+# 每个接口保存的计数，顺序固定
+COUNTER_FIELDS = (
+    "bytes_recv", "packets_recv", "errin", "dropin",
+    "bytes_sent", "packets_sent", "errout", "dropout",
+)
+# 需要计算速率的计数
+RATE_FIELDS = ("bytes_recv", "packets_recv", "bytes_sent", "packets_sent")
+_RATE_INDEXES = tuple(COUNTER_FIELDS.index(field) for field in RATE_FIELDS)
+
+# /proc/net/dev中各计数所在的列
+NET_DEV_COLUMNS = (0, 1, 2, 3, 8, 9, 10, 11)
+
+class NetworkSampler:
+    """
+    按接口统计网络计数，并在服务端用单调时钟计算速率
+
+    速率由两次采样之间的计数差除以time.monotonic()的时间差得到，不受客户端轮询抖动影响。
+    计数回绕或接口重建导致计数变小时，该接口本次的速率记为0。
+    """
+
+    def __init__(self):
+        self._previous: Dict[str, Tuple[int, ...]] = {}
+        self._previous_time: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def update(self, interfaces: Iterable[Tuple[str, Tuple[int, ...]]]) -> Dict[str, Any]:
+        """
+        用一次采样的接口计数更新状态并计算速率
+
+        Args:
+            interfaces: (接口名, 按COUNTER_FIELDS顺序的计数)序列，应已完成过滤
+
+        Returns:
+            Dict[str, Any]: 包含以下字段：
+                - bytes_sent/bytes_recv/packets_sent/packets_recv: 所有接口的累计计数之和
+                - bytes_sent_rate/bytes_recv_rate/packets_sent_rate/packets_recv_rate: 总速率（每秒）
+                - interfaces: 每个接口的计数、错误/丢包数和速率
+        """
+        now = time.monotonic()
+        with self._lock:
+            previous = self._previous
+            elapsed = now - self._previous_time if self._previous_time is not None else 0.0
+            current: Dict[str, Tuple[int, ...]] = {}
+
+            totals = dict.fromkeys(COUNTER_FIELDS, 0)
+            rate_totals = dict.fromkeys(RATE_FIELDS, 0.0)
+            result_interfaces: List[Dict[str, Any]] = []
+
+            for name, counters in interfaces:
+                current[name] = counters
+                entry: Dict[str, Any] = {"name": name}
+                for field, value in zip(COUNTER_FIELDS, counters):
+                    entry[field] = value
+                    totals[field] += value
+
+                before = previous.get(name)
+                for field, index in zip(RATE_FIELDS, _RATE_INDEXES):
+                    rate = 0.0
+                    if before is not None and elapsed > 0:
+                        delta = counters[index] - before[index]
+                        if delta > 0:
+                            rate = delta / elapsed
+                    entry[f"{field}_rate"] = round(rate, 1)
+                    rate_totals[field] += rate
+                result_interfaces.append(entry)
+
+            self._previous = current
+            self._previous_time = now
+
+        result: Dict[str, Any] = {
+            "bytes_sent": totals["bytes_sent"],
+            "bytes_recv": totals["bytes_recv"],
+            "packets_sent": totals["packets_sent"],
+            "packets_recv": totals["packets_recv"],
+        }
+        for field in RATE_FIELDS:
+            result[f"{field}_rate"] = round(rate_totals[field], 1)
+        result["interfaces"] = result_interfaces
+        return result
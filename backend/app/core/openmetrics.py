@@ -0,0 +1,342 @@
+import math
+import threading
+import time
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# 最近一次抓取后的这段时间（秒）内，采集器在每次采样后立即渲染，抓取时只需拼接
+ACTIVE_WINDOW = 300.0
+
+# 指标族：名称 -> (类型, 说明)。counter类型的样本名带_total后缀
+FAMILIES: Dict[str, Tuple[str, str]] = {
+    "system_snapshot_age_seconds": ("gauge", "Age of the collector snapshot for each section"),
+    "system_cpu_usage_percent": ("gauge", "Overall CPU utilization over the last sample interval"),
+    "system_cpu_core_usage_percent": ("gauge", "Per-core CPU utilization over the last sample interval"),
+    "system_cpu_mode_percent": ("gauge", "Overall CPU utilization by mode"),
+    "system_cpu_core_mode_percent": ("gauge", "Per-core CPU utilization by mode"),
+    "system_cpu_frequency_mhz": ("gauge", "Current CPU frequency"),
+    "system_cpu_core_frequency_mhz": ("gauge", "Per-core current CPU frequency"),
+    "system_cpu_count": ("gauge", "Number of logical CPUs"),
+    "system_memory_total_bytes": ("gauge", "Total memory"),
+    "system_memory_available_bytes": ("gauge", "Available memory"),
+    "system_memory_used_bytes": ("gauge", "Used memory"),
+    "system_memory_usage_percent": ("gauge", "Memory utilization"),
+    "system_swap_total_bytes": ("gauge", "Total swap"),
+    "system_swap_used_bytes": ("gauge", "Used swap"),
+    "system_swap_usage_percent": ("gauge", "Swap utilization"),
+    "system_filesystem_size_bytes": ("gauge", "Filesystem size"),
+    "system_filesystem_used_bytes": ("gauge", "Filesystem used space"),
+    "system_filesystem_free_bytes": ("gauge", "Filesystem free space"),
+    "system_filesystem_usage_percent": ("gauge", "Filesystem utilization"),
+    "system_filesystem_stale": ("gauge", "1 if the last statvfs call timed out and the values are stale"),
+    "system_disk_read_bytes_per_second": ("gauge", "Block device read throughput"),
+    "system_disk_write_bytes_per_second": ("gauge", "Block device write throughput"),
+    "system_disk_read_iops": ("gauge", "Completed reads per second"),
+    "system_disk_write_iops": ("gauge", "Completed writes per second"),
+    "system_disk_await_milliseconds": ("gauge", "Average request latency including queueing"),
+    "system_disk_utilization_percent": ("gauge", "Share of time the device was busy"),
+    "system_disk_queue_depth": ("gauge", "Average number of in-flight requests"),
+    "system_network_receive_bytes": ("counter", "Bytes received"),
+    "system_network_transmit_bytes": ("counter", "Bytes transmitted"),
+    "system_network_receive_packets": ("counter", "Packets received"),
+    "system_network_transmit_packets": ("counter", "Packets transmitted"),
+    "system_network_receive_errors": ("counter", "Receive errors"),
+    "system_network_transmit_errors": ("counter", "Transmit errors"),
+    "system_network_receive_drops": ("counter", "Dropped received packets"),
+    "system_network_transmit_drops": ("counter", "Dropped transmitted packets"),
+    "system_network_receive_bytes_per_second": ("gauge", "Receive throughput"),
+    "system_network_transmit_bytes_per_second": ("gauge", "Transmit throughput"),
+    "system_cgroup_cpu_usage_percent": ("gauge", "Cgroup CPU usage, 100 per fully used core"),
+    "system_cgroup_cpu_limit_cores": ("gauge", "Cgroup CPU quota in cores, 0 if unlimited"),
+    "system_cgroup_cpu_throttled_percent": ("gauge", "Share of scheduler periods in which the cgroup was throttled"),
+    "system_cgroup_memory_working_set_bytes": ("gauge", "Cgroup memory usage minus inactive file pages"),
+    "system_cgroup_memory_limit_bytes": ("gauge", "Cgroup memory limit, 0 if unlimited"),
+    "system_cgroup_io_read_bytes_per_second": ("gauge", "Cgroup block I/O read throughput"),
+    "system_cgroup_io_write_bytes_per_second": ("gauge", "Cgroup block I/O write throughput"),
+    "system_cgroup_cpu_pressure_percent": ("gauge", "Cgroup cpu.pressure avg10"),
+    "system_pressure_percent": ("gauge", "Pressure stall information"),
+    "system_load_average": ("gauge", "System load average"),
+    "system_procs_running": ("gauge", "Runnable scheduling entities"),
+    "system_major_page_faults_per_second": ("gauge", "Major page faults per second"),
+    "system_swap_in_pages_per_second": ("gauge", "Pages swapped in per second"),
+    "system_swap_out_pages_per_second": ("gauge", "Pages swapped out per second"),
+    "system_oom_kills": ("counter", "OOM kills since boot"),
+    "system_temperature_celsius": ("gauge", "Hardware monitoring temperature sensor"),
+    "system_temperature_critical_celsius": ("gauge", "Critical temperature threshold of the sensor"),
+    "system_thermal_zone_temperature_celsius": ("gauge", "Thermal zone temperature"),
+    "system_cpu_throttle_events": ("counter", "CPU thermal throttling events since boot"),
+}
+
+# 预先格式化的指标族头部（# TYPE / # HELP）
+HEADERS: Dict[str, str] = {
+    name: f"# TYPE {name} {kind}\n# HELP {name} {help_text}\n" for name, (kind, help_text) in FAMILIES.items()
+}
+
+# 标签缓存的上限，超过时整体清空（接口、挂载点、cgroup的数量通常远小于此）
+_LABEL_CACHE_SIZE = 65536
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+_INF = float("inf")
+
+
+def _format_value(value: Any) -> Optional[str]:
+    # 绝大多数样本是有限的float，优先处理
+    if type(value) is float and value == value and value != _INF and value != -_INF:
+        return repr(value)
+    if value is None:
+        return None
+    if value is True or value is False:
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+class OpenMetricsRenderer:
+    """
+    把采集器快照渲染为OpenMetrics文本
+
+    - 每个子系统的文本单独缓存，以快照对象本身为键：快照未变化时直接复用，
+      一次抓取只是拼接各子系统已渲染好的bytes
+    - 样本行的前缀（指标名 + 格式化并转义后的标签）按(指标名, 标签值)缓存，
+      渲染时每行只需格式化数值
+    - 最近被抓取过时（ACTIVE_WINDOW内），采集器在每次采样后立即渲染（在采集线程中），
+      抓取请求本身不做渲染，也不会触发采集
+    """
+
+    def __init__(self):
+        self._prefixes: Dict[Tuple, str] = {}
+        self._chunks: Dict[str, Tuple[Dict[str, Any], bytes]] = {}
+        self._last_scrape: Optional[float] = None
+        self._lock = threading.Lock()
+        self._renderers: Dict[str, Callable[[Dict[str, Any], List[str]], None]] = {
+            "cpu": self._render_cpu,
+            "memory": self._render_memory,
+            "disk": self._render_disk,
+            "network": self._render_network,
+            "cgroup": self._render_cgroup,
+            "pressure": self._render_pressure,
+            "sensors": self._render_sensors,
+        }
+
+    @property
+    def active(self) -> bool:
+        """最近是否被抓取过（决定采集器是否在采样后立即渲染）"""
+        return self._last_scrape is not None and time.monotonic() - self._last_scrape < ACTIVE_WINDOW
+
+    def _prefix(self, family: str, labels: Tuple[Tuple[str, str], ...] = ()) -> str:
+        key = (family, labels)
+        prefix = self._prefixes.get(key)
+        if prefix is None:
+            if len(self._prefixes) >= _LABEL_CACHE_SIZE:
+                self._prefixes.clear()
+            suffix = "_total" if FAMILIES[family][0] == "counter" else ""
+            label_text = ",".join(f"{name}=\"{_escape(str(value))}\"" for name, value in labels)
+            prefix = f"{family}{suffix}{{{label_text}}} " if labels else f"{family}{suffix} "
+            self._prefixes[key] = prefix
+        return prefix
+
+    def _sample(self, out: List[str], family: str, value: Any,
+                labels: Tuple[Tuple[str, str], ...] = ()) -> None:
+        text = _format_value(value)
+        if text is not None:
+            out.append(self._prefix(family, labels) + text + "\n")
+
+    def update(self, name: str, data: Dict[str, Any]) -> None:
+        """渲染一个子系统的快照并缓存"""
+        renderer = self._renderers.get(name)
+        if renderer is None:
+            return
+        out: List[str] = []
+        renderer(data, out)
+        chunk = "".join(out).encode()
+        with self._lock:
+            self._chunks[name] = (data, chunk)
+
+    def render(self, snapshots: Dict[str, Dict[str, Any]], ages: Dict[str, float]) -> bytes:
+        """
+        拼接所有子系统的指标
+
+        Args:
+            snapshots: 子系统名称 -> 当前快照（只包含已有的快照，不会触发采集）
+            ages: 子系统名称 -> 快照年龄（秒）
+        """
+        self._last_scrape = time.monotonic()
+        parts: List[bytes] = []
+        for name, data in snapshots.items():
+            cached = self._chunks.get(name)
+            if cached is None or cached[0] is not data:
+                self.update(name, data)
+                cached = self._chunks.get(name)
+            if cached is not None:
+                parts.append(cached[1])
+        out = [HEADERS["system_snapshot_age_seconds"]]
+        for name, age in ages.items():
+            self._sample(out, "system_snapshot_age_seconds", age, (("section", name),))
+        out.append("# EOF\n")
+        parts.append("".join(out).encode())
+        return b"".join(parts)
+
+    def _render_cpu(self, data: Dict[str, Any], out: List[str]) -> None:
+        out.append(HEADERS["system_cpu_usage_percent"])
+        self._sample(out, "system_cpu_usage_percent", data.get("cpu_percent"))
+
+        out.append(HEADERS["system_cpu_core_usage_percent"])
+        for index, percent in enumerate(data.get("cpu_per_core", [])):
+            self._sample(out, "system_cpu_core_usage_percent", percent, (("cpu", str(index)),))
+
+        breakdown = data.get("cpu_breakdown")
+        if breakdown:
+            out.append(HEADERS["system_cpu_mode_percent"])
+            for mode, percent in breakdown.items():
+                self._sample(out, "system_cpu_mode_percent", percent, (("mode", mode),))
+        per_core_breakdown = data.get("cpu_per_core_breakdown")
+        if per_core_breakdown:
+            out.append(HEADERS["system_cpu_core_mode_percent"])
+            for mode, values in per_core_breakdown.items():
+                for index, percent in enumerate(values):
+                    self._sample(out, "system_cpu_core_mode_percent", percent, (("cpu", str(index)), ("mode", mode)))
+
+        out.append(HEADERS["system_cpu_frequency_mhz"])
+        self._sample(out, "system_cpu_frequency_mhz", data.get("cpu_freq_current"))
+        per_core_freq = data.get("cpu_freq_per_core")
+        if per_core_freq:
+            out.append(HEADERS["system_cpu_core_frequency_mhz"])
+            for index, mhz in enumerate(per_core_freq):
+                self._sample(out, "system_cpu_core_frequency_mhz", mhz, (("cpu", str(index)),))
+        out.append(HEADERS["system_cpu_count"])
+        self._sample(out, "system_cpu_count", data.get("cpu_count"))
+
+    def _render_memory(self, data: Dict[str, Any], out: List[str]) -> None:
+        for family, field in (
+            ("system_memory_total_bytes", "memory_total"),
+            ("system_memory_available_bytes", "memory_available"),
+            ("system_memory_used_bytes", "memory_used"),
+            ("system_memory_usage_percent", "memory_percent"),
+            ("system_swap_total_bytes", "swap_total"),
+            ("system_swap_used_bytes", "swap_used"),
+            ("system_swap_usage_percent", "swap_percent"),
+        ):
+            out.append(HEADERS[family])
+            self._sample(out, family, data.get(field))
+
+    def _render_disk(self, data: Dict[str, Any], out: List[str]) -> None:
+        disks = data.get("disks", [])
+        for family, field in (
+            ("system_filesystem_size_bytes", "total"),
+            ("system_filesystem_used_bytes", "used"),
+            ("system_filesystem_free_bytes", "free"),
+            ("system_filesystem_usage_percent", "percent"),
+            ("system_filesystem_stale", "stale"),
+        ):
+            out.append(HEADERS[family])
+            for disk in disks:
+                labels = (("device", disk["device"]), ("mountpoint", disk["mountpoint"]), ("fstype", disk["fstype"]))
+                self._sample(out, family, disk.get(field), labels)
+
+        devices = data.get("io", [])
+        for family, field in (
+            ("system_disk_read_bytes_per_second", "read_bytes_rate"),
+            ("system_disk_write_bytes_per_second", "write_bytes_rate"),
+            ("system_disk_read_iops", "read_iops"),
+            ("system_disk_write_iops", "write_iops"),
+            ("system_disk_await_milliseconds", "await_ms"),
+            ("system_disk_utilization_percent", "util_percent"),
+            ("system_disk_queue_depth", "queue_depth"),
+        ):
+            out.append(HEADERS[family])
+            for device in devices:
+                self._sample(out, family, device.get(field), (("device", device["device"]),))
+
+    def _render_network(self, data: Dict[str, Any], out: List[str]) -> None:
+        interfaces = data.get("interfaces", [])
+        for family, field in (
+            ("system_network_receive_bytes", "bytes_recv"),
+            ("system_network_transmit_bytes", "bytes_sent"),
+            ("system_network_receive_packets", "packets_recv"),
+            ("system_network_transmit_packets", "packets_sent"),
+            ("system_network_receive_errors", "errin"),
+            ("system_network_transmit_errors", "errout"),
+            ("system_network_receive_drops", "dropin"),
+            ("system_network_transmit_drops", "dropout"),
+            ("system_network_receive_bytes_per_second", "bytes_recv_rate"),
+            ("system_network_transmit_bytes_per_second", "bytes_sent_rate"),
+        ):
+            out.append(HEADERS[family])
+            for interface in interfaces:
+                self._sample(out, family, interface.get(field), (("interface", interface["name"]),))
+
+    def _render_cgroup(self, data: Dict[str, Any], out: List[str]) -> None:
+        groups = [data["current"]] if data.get("current") else []
+        groups.extend(data.get("children", []))
+        for family, field in (
+            ("system_cgroup_cpu_usage_percent", "cpu_percent"),
+            ("system_cgroup_cpu_limit_cores", "cpu_limit"),
+            ("system_cgroup_cpu_throttled_percent", "throttled_percent"),
+            ("system_cgroup_memory_working_set_bytes", "memory_working_set"),
+            ("system_cgroup_memory_limit_bytes", "memory_limit"),
+            ("system_cgroup_io_read_bytes_per_second", "io_read_bytes_rate"),
+            ("system_cgroup_io_write_bytes_per_second", "io_write_bytes_rate"),
+        ):
+            out.append(HEADERS[family])
+            for group in groups:
+                self._sample(out, family, group.get(field), (("cgroup", group["name"]),))
+        out.append(HEADERS["system_cgroup_cpu_pressure_percent"])
+        for group in groups:
+            for kind in ("some", "full"):
+                self._sample(out, "system_cgroup_cpu_pressure_percent", group.get(f"cpu_pressure_{kind}"),
+                             (("cgroup", group["name"]), ("kind", kind)))
+
+    def _render_pressure(self, data: Dict[str, Any], out: List[str]) -> None:
+        out.append(HEADERS["system_pressure_percent"])
+        for resource in ("cpu", "memory", "io"):
+            psi = data.get(resource)
+            if not psi:
+                continue
+            for kind in ("some", "full"):
+                for window, field in (("10s", "avg10"), ("60s", "avg60"), ("300s", "avg300"), ("interval", "percent")):
+                    self._sample(out, "system_pressure_percent", psi.get(f"{kind}_{field}"),
+                                 (("resource", resource), ("kind", kind), ("window", window)))
+
+        out.append(HEADERS["system_load_average"])
+        for window in ("1", "5", "15"):
+            self._sample(out, "system_load_average", data.get(f"load{window}"), (("window", f"{window}m"),))
+        for family, field in (
+            ("system_procs_running", "procs_running"),
+            ("system_major_page_faults_per_second", "pgmajfault_rate"),
+            ("system_swap_in_pages_per_second", "pswpin_rate"),
+            ("system_swap_out_pages_per_second", "pswpout_rate"),
+            ("system_oom_kills", "oom_kill"),
+        ):
+            out.append(HEADERS[family])
+            self._sample(out, family, data.get(field))
+
+    def _render_sensors(self, data: Dict[str, Any], out: List[str]) -> None:
+        temperatures = data.get("temperatures") or []
+        out.append(HEADERS["system_temperature_celsius"])
+        for sensor in temperatures:
+            self._sample(out, "system_temperature_celsius", sensor.get("current"),
+                         (("sensor", sensor["sensor"]), ("label", sensor["label"])))
+        out.append(HEADERS["system_temperature_critical_celsius"])
+        for sensor in temperatures:
+            self._sample(out, "system_temperature_critical_celsius", sensor.get("critical"),
+                         (("sensor", sensor["sensor"]), ("label", sensor["label"])))
+        out.append(HEADERS["system_thermal_zone_temperature_celsius"])
+        for zone in data.get("thermal_zones") or []:
+            self._sample(out, "system_thermal_zone_temperature_celsius", zone.get("current"),
+                         (("zone", zone["zone"]), ("type", zone.get("type", ""))))
+        throttle = data.get("throttle")
+        if throttle:
+            out.append(HEADERS["system_cpu_throttle_events"])
+            self._sample(out, "system_cpu_throttle_events", throttle.get("core_events"), (("scope", "core"),))
+            self._sample(out, "system_cpu_throttle_events", throttle.get("package_events"), (("scope", "package"),))
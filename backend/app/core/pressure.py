@@ -0,0 +1,139 @@
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from app.core.proc_reader import ProcFile
+
+# PSI的三类资源
+PSI_RESOURCES = ("cpu", "memory", "io")
+
+# 需要的/proc/vmstat计数
+VMSTAT_FIELDS = ("pgmajfault", "pswpin", "pswpout", "oom_kill")
+
+
+def _parse_psi(buffer: bytearray, size: int) -> Dict[str, Tuple[float, float, float, int]]:
+    """
+    解析/proc/pressure/<resource>
+
+    Returns:
+        {"some"/"full": (avg10, avg60, avg300, total)}，total为累计停顿时间（微秒）
+    """
+    result: Dict[str, Tuple[float, float, float, int]] = {}
+    for line in buffer[:size].splitlines():
+        parts = line.split()
+        if len(parts) == 5:
+            result[parts[0].decode()] = (
+                float(parts[1][6:]), float(parts[2][6:]), float(parts[3][7:]), int(parts[4][6:])
+            )
+    return result
+
+
+class PressureSampler:
+    """
+    PSI、负载和vmstat计数的采样器
+
+    所有文件都通过常驻的ProcFile读取，单次采样只有5次pread，可以按亚秒级周期运行。
+    除了内核提供的avg10/avg60/avg300（指数平均），还用相邻两次采样的total差值计算
+    本采样区间内的停顿占比，反映的是区间内的真实情况而不是10秒平均；
+    vmstat计数同样按差值换算为每秒速率。内核未启用PSI时对应字段为null。
+    """
+
+    def __init__(self, proc_root: str):
+        self._psi = {resource: ProcFile(f"{proc_root}/pressure/{resource}", 256) for resource in PSI_RESOURCES}
+        self._loadavg = ProcFile(f"{proc_root}/loadavg", 256)
+        self._vmstat = ProcFile(f"{proc_root}/vmstat", 16 * 1024)
+        self._vmstat_keys = [(field, f"\n{field} ".encode()) for field in VMSTAT_FIELDS]
+        self._previous_totals: Dict[str, int] = {}
+        self._previous_vmstat: Optional[Dict[str, int]] = None
+        self._previous_time: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _read_psi(self, resource: str) -> Optional[Dict[str, Tuple[float, float, float, int]]]:
+        file = self._psi[resource]
+        with file.lock:
+            try:
+                size = file.read()
+            except OSError:
+                # 内核未启用PSI（CONFIG_PSI或psi=0）
+                return None
+            return _parse_psi(file.buffer, size)
+
+    def _read_vmstat(self) -> Dict[str, int]:
+        values: Dict[str, int] = {}
+        with self._vmstat.lock:
+            size = self._vmstat.read()
+            buffer = self._vmstat.buffer
+            for field, key in self._vmstat_keys:
+                start = buffer.find(key, 0, size)
+                if start < 0:
+                    values[field] = 0
+                    continue
+                start += len(key)
+                end = buffer.find(b"\n", start, size)
+                values[field] = int(buffer[start:end if end >= 0 else size])
+        return values
+
+    def sample(self) -> Dict[str, Any]:
+        """
+        采样一次
+
+        Returns:
+            Dict[str, Any]: 包含以下字段：
+                - cpu/memory/io: 各资源的PSI，包含some_avg10/some_avg60/some_avg300/some_percent
+                  以及full_*（cpu的full在旧内核上不存在）；*_percent为本采样区间内的停顿占比，
+                  未启用PSI时为null
+                - load1/load5/load15: 系统负载
+                - procs_running/procs_total: 可运行的调度实体数/总数
+                - pgmajfault_rate/pswpin_rate/pswpout_rate: 主缺页、换入、换出的每秒次数
+                - oom_kill: 累计OOM kill次数，oom_kill_delta为本采样区间内新增的次数
+        """
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._previous_time if self._previous_time is not None else 0.0
+            result: Dict[str, Any] = {}
+
+            for resource in PSI_RESOURCES:
+                psi = self._read_psi(resource)
+                if psi is None:
+                    result[resource] = None
+                    continue
+                entry: Dict[str, Any] = {}
+                for kind, (avg10, avg60, avg300, total) in psi.items():
+                    key = f"{resource}.{kind}"
+                    previous = self._previous_totals.get(key)
+                    self._previous_totals[key] = total
+                    entry[f"{kind}_avg10"] = avg10
+                    entry[f"{kind}_avg60"] = avg60
+                    entry[f"{kind}_avg300"] = avg300
+                    if previous is None or elapsed <= 0:
+                        entry[f"{kind}_percent"] = avg10
+                    else:
+                        stalled = max(total - previous, 0) / (elapsed * 1e6) * 100
+                        entry[f"{kind}_percent"] = round(min(stalled, 100.0), 2)
+                result[resource] = entry
+
+            with self._loadavg.lock:
+                size = self._loadavg.read()
+                fields = self._loadavg.buffer[:size].split()
+            running, _, total = fields[3].partition(b"/")
+            result["load1"] = float(fields[0])
+            result["load5"] = float(fields[1])
+            result["load15"] = float(fields[2])
+            result["procs_running"] = int(running)
+            result["procs_total"] = int(total)
+
+            vmstat = self._read_vmstat()
+            previous_vmstat = self._previous_vmstat
+            for field in ("pgmajfault", "pswpin", "pswpout"):
+                if previous_vmstat is None or elapsed <= 0:
+                    result[f"{field}_rate"] = 0.0
+                else:
+                    result[f"{field}_rate"] = round(max(vmstat[field] - previous_vmstat[field], 0) / elapsed, 1)
+            result["oom_kill"] = vmstat["oom_kill"]
+            result["oom_kill_delta"] = (
+                max(vmstat["oom_kill"] - previous_vmstat["oom_kill"], 0) if previous_vmstat is not None else 0
+            )
+
+            self._previous_vmstat = vmstat
+            self._previous_time = now
+        return result
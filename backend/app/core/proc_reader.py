@@ -0,0 +1,146 @@
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.instrumentation import instrumentation
+
+# 默认缓冲区大小，足够容纳常见的/proc/stat、meminfo、net/dev、mounts
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class ProcFile:
+    """
+    保持打开的/proc文件
+
+    文件描述符在首次读取时打开并一直保留，之后每次用os.preadv从偏移0重新读取到
+    预分配的缓冲区中，省去每次采样的open/close和缓冲区分配。内容超过缓冲区时自动扩容。
+    调用方在解析期间应持有lock，避免缓冲区被并发读取覆盖。
+    """
+
+    def __init__(self, path: str, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.path = path
+        self.buffer = bytearray(buffer_size)
+        self.lock = threading.Lock()
+        self._fd: Optional[int] = None
+
+    def fileno(self) -> int:
+        """返回文件描述符（必要时打开文件），可用于poll等待内容变化"""
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+        return self._fd
+
+    def read(self) -> int:
+        """重新读取文件内容到self.buffer，返回有效字节数"""
+        self.fileno()
+        try:
+            size = os.preadv(self._fd, [self.buffer], 0)
+        except OSError:
+            # 描述符失效（例如被挂载的/proc重新挂载）时重新打开一次
+            self.close()
+            self._fd = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+            size = os.preadv(self._fd, [self.buffer], 0)
+        while size == len(self.buffer):
+            # 缓冲区被填满，内容可能被截断，扩容后重读
+            self.buffer = bytearray(len(self.buffer) * 2)
+            size = os.preadv(self._fd, [self.buffer], 0)
+        instrumentation.count_bytes(size)
+        return size
+
+    def lines(self) -> List[bytearray]:
+        """重新读取并按行切分（最后的空行已去除）"""
+        size = self.read()
+        return self.buffer[:size].splitlines()
+
+    def close(self) -> None:
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+    def __del__(self):
+        self.close()
+
+
+class MemInfoReader:
+    """
+    /proc/meminfo解析器：只提取需要的字段
+
+    meminfo中字段的顺序是固定的，按该顺序依次向后查找，一次扫描即可取出所有字段，
+    不再为约50个键构建字典。
+    """
+
+    def __init__(self, path: str, fields: Iterable[str]):
+        self.file = ProcFile(path, 8 * 1024)
+        self.fields = list(fields)
+        self._keys = [f"{field}:".encode() for field in self.fields]
+
+    def read(self) -> Dict[str, int]:
+        """返回各字段的值（字节），缺失的字段为0"""
+        result: Dict[str, int] = {}
+        with self.file.lock:
+            size = self.file.read()
+            buffer = self.file.buffer
+            position = 0
+            for field, key in zip(self.fields, self._keys):
+                start = buffer.find(key, position, size)
+                if start < 0:
+                    # 顺序与预期不同时从头查找
+                    start = buffer.find(key, 0, size)
+                    if start < 0:
+                        result[field] = 0
+                        continue
+                value_start = start + len(key)
+                end = buffer.find(b"\n", value_start, size)
+                if end < 0:
+                    end = size
+                value = buffer[value_start:end].split()
+                number = int(value[0]) if value else 0
+                # 带kB单位的字段转换为字节
+                result[field] = number * 1024 if len(value) > 1 else number
+                position = end
+        return result
+
+
+def parse_net_dev(file: ProcFile, accept: Optional[Callable[[str], bool]] = None) -> List[Tuple[str, List[int]]]:
+    """
+    解析/proc/net/dev，返回(接口名, 16个计数)列表
+
+    计数顺序：接收bytes/packets/errs/drop/fifo/frame/compressed/multicast，
+    发送bytes/packets/errs/drop/fifo/colls/carrier/compressed
+
+    Args:
+        file: /proc/net/dev对应的ProcFile
+        accept: 可选的接口过滤函数，被过滤掉的接口不做数值转换
+    """
+    interfaces: List[Tuple[str, List[int]]] = []
+    with file.lock:
+        # 跳过前两行（标题行）
+        for line in file.lines()[2:]:
+            name, sep, values = line.partition(b":")
+            if not sep:
+                continue
+            interface = name.strip().decode()
+            if accept is not None and not accept(interface):
+                continue
+            interfaces.append((interface, [int(value) for value in values.split()]))
+    return interfaces
+
+
+def parse_mounts(file: ProcFile) -> List[Tuple[str, str, str]]:
+    """解析/proc/mounts，返回(设备, 挂载点, 文件系统类型)列表"""
+    mounts: List[Tuple[str, str, str]] = []
+    with file.lock:
+        for line in file.lines():
+            parts = line.split(None, 3)
+            if len(parts) >= 3:
+                mounts.append((parts[0].decode(), _unescape_mount(parts[1].decode()), parts[2].decode()))
+    return mounts
+
+
+def _unescape_mount(path: str) -> str:
+    """还原/proc/mounts中八进制转义的空格、制表符等字符（例如\\040）"""
+    if "\\" not in path:
+        return path
+    return path.encode().decode("unicode_escape").encode("latin-1").decode("utf-8", "replace")
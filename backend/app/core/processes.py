@@ -0,0 +1,300 @@
+import heapq
+import math
+import os
+import threading
+import time
+from array import array
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.instrumentation import instrumentation
+from app.core.proc_reader import ProcFile
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+# 支持的排序字段
+SORT_KEYS = ("cpu", "memory")
+
+# /proc/<pid>/stat单行通常不超过400字节（comm最长16字节）
+_STAT_READ_SIZE = 1024
+
+
+def parse_pid_stat(data: bytes) -> Optional[Tuple[str, str, int, int, int, int]]:
+    """
+    解析/proc/<pid>/stat
+
+    进程名位于括号内且可能包含空格和括号，因此以最后一个')'为界切分其余字段。
+
+    Returns:
+        (进程名, 状态, utime+stime的jiffies, 线程数, 启动时间(jiffies), RSS页数)，格式异常时返回None
+    """
+    open_paren = data.find(b"(")
+    close_paren = data.rfind(b")")
+    if open_paren < 0 or close_paren < open_paren:
+        return None
+    # 第0个字段为state，对应stat中的第3列
+    fields = data[close_paren + 2:].split(None, 22)
+    if len(fields) < 22:
+        return None
+    return (
+        data[open_paren + 1:close_paren].decode(errors="replace"),
+        fields[0].decode(),
+        int(fields[11]) + int(fields[12]),
+        int(fields[17]),
+        int(fields[19]),
+        int(fields[21]),
+    )
+
+
+class ProcessScanner:
+    """
+    增量扫描/proc/<pid>/stat的进程表
+
+    - 每个进程的上一次jiffies、采样时间、CPU使用率等保存在按槽位索引的并行array中，
+      pid到槽位的映射是唯一的字典，退出进程的槽位会被复用
+    - 每次扫描只读取一批进程（轮询推进），数量不少于budget，并按 进程数 × 距上次扫描的时间 / rotation
+      提高，使每个进程至少每rotation秒左右被读取一次；每次扫描都重新listdir，与上一次的列表比较，
+      新出现的进程排在本轮剩余进程之前读取，新启动的高负载进程在下一次扫描就能出现在前N中；
+      CPU占用最高的hot_size个进程保持打开的描述符，每次扫描都用pread重新读取，
+      因此排在前面的进程始终是最新数据，其余进程的使用率是其最近一个扫描窗口内的平均值
+    - 首次看到的进程没有上一次采样，使用率按启动以来的平均值计算
+    - 前N个进程由堆选出，不对整张表排序
+    """
+
+    def __init__(self, proc_root: str, budget: int, hot_size: int, min_interval: float, rotation: float = 20.0):
+        self.proc_root = proc_root
+        self.budget = max(int(budget), 1)
+        self.hot_size = max(int(hot_size), 0)
+        self.min_interval = min_interval
+        self.rotation = max(float(rotation), 0.001)
+        self._uptime = ProcFile(f"{proc_root}/uptime", 256)
+        self._lock = threading.Lock()
+        self._last_scan: Optional[float] = None
+
+        self._slots: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._pids = array("i")
+        self._starttimes = array("Q")
+        self._jiffies = array("Q")
+        self._sampled = array("d")
+        self._cpu = array("f")
+        self._rss = array("Q")
+        self._threads = array("I")
+        self._names: List[str] = []
+        self._states: List[str] = []
+
+        # 本轮尚未扫描的pid（从末尾取出），上一次listdir看到的目录名，以及热点进程常驻的描述符（pid -> fd）
+        self._pending: List[int] = []
+        self._listed: set = set()
+        self._hot: Dict[int, int] = {}
+        # 上一轮和本轮开始的时间：尚未在本轮读取的进程最晚是在上一轮读取的
+        self._rounds: Tuple[Optional[float], Optional[float]] = (None, None)
+        # 两次扫描之间进程表不变，前N个进程的结果可以复用
+        self._top_cache: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def scan(self) -> None:
+        """扫描一批进程；距上一次扫描不足min_interval时直接返回"""
+        with self._lock:
+            now = time.monotonic()
+            last_scan = self._last_scan
+            if last_scan is not None and now - last_scan < self.min_interval:
+                return
+            self._last_scan = now
+            self._top_cache.clear()
+            with self._uptime.lock:
+                uptime = float(self._uptime.lines()[0].split()[0])
+
+            bytes_read = 0
+            for pid, fd in list(self._hot.items()):
+                try:
+                    data = os.pread(fd, _STAT_READ_SIZE, 0)
+                except OSError:
+                    data = b""
+                bytes_read += len(data)
+                if not self._store(pid, data, now, uptime):
+                    self._close_hot(pid)
+                    self._remove(pid)
+
+            self._discover(now)
+            # 进程表为空（首次扫描）时读取全部进程，保证第一次返回的结果完整；
+            # 否则按距上次扫描的时间折算，保证一轮不超过rotation秒
+            if not self._slots or last_scan is None:
+                budget = len(self._pending)
+            else:
+                budget = max(self.budget, math.ceil(len(self._slots) * (now - last_scan) / self.rotation))
+            batch = self._pending[-budget:]
+            del self._pending[-budget:]
+            path = f"{self.proc_root}/%d/stat"
+            scanned: List[int] = []
+            for pid in batch:
+                if pid in self._hot:
+                    continue
+                try:
+                    fd = os.open(path % pid, os.O_RDONLY | os.O_CLOEXEC)
+                except OSError:
+                    self._remove(pid)
+                    continue
+                try:
+                    data = os.read(fd, _STAT_READ_SIZE)
+                except OSError:
+                    data = b""
+                finally:
+                    os.close(fd)
+                bytes_read += len(data)
+                if self._store(pid, data, now, uptime):
+                    scanned.append(pid)
+                else:
+                    self._remove(pid)
+
+            instrumentation.count_bytes(bytes_read)
+            self._refresh_hot(scanned)
+
+    def _discover(self, now: float) -> None:
+        """
+        列出当前所有进程：清理已退出进程的槽位，把新出现的进程放到待扫描列表末尾（最先读取），
+        本轮扫描完成时开始新一轮
+
+        与上一次listdir的结果按目录名（字符串）比较，只有变化的部分需要转换为pid，
+        两万个进程时每次扫描的额外开销主要是listdir本身。
+        """
+        names = os.listdir(self.proc_root)
+        alive = set(names)
+        listed = self._listed
+        self._listed = alive
+        for name in listed - alive:
+            if name.isdigit():
+                pid = int(name)
+                self._close_hot(pid)
+                self._remove(pid)
+        new = alive - listed
+        if not self._pending:
+            self._pending = [int(name) for name in names if name.isdigit() and name not in new]
+            self._rounds = (self._rounds[1], now)
+        self._pending.extend(int(name) for name in new if name.isdigit())
+
+    def max_age(self) -> float:
+        """
+        非热点进程数据的最长滞后（秒）：本轮尚未读取的进程最晚在上一轮开始后读取过，
+        因此不超过距上一轮开始的时间（约一个rotation加上扫描间隔）；热点进程每次扫描都会重新读取
+        """
+        with self._lock:
+            previous, current = self._rounds
+            started = previous if previous is not None else current
+            return time.monotonic() - started if started is not None else 0.0
+
+    def _store(self, pid: int, data: bytes, now: float, uptime: float) -> bool:
+        """写入一次读取结果，进程已退出或内容无法解析时返回False"""
+        parsed = parse_pid_stat(data) if data else None
+        if parsed is None:
+            return False
+        name, state, jiffies, threads, starttime, rss = parsed
+
+        slot = self._slots.get(pid)
+        if slot is not None and self._starttimes[slot] == starttime:
+            elapsed = now - self._sampled[slot]
+            if elapsed > 0:
+                delta = max(jiffies - self._jiffies[slot], 0)
+                self._cpu[slot] = delta / CLOCK_TICKS / elapsed * 100
+        else:
+            if slot is None:
+                slot = self._allocate(pid)
+            # 新进程（或pid被复用）：按启动以来的平均值计算
+            lifetime = uptime - starttime / CLOCK_TICKS
+            self._cpu[slot] = jiffies / CLOCK_TICKS / lifetime * 100 if lifetime > 0 else 0.0
+            self._starttimes[slot] = starttime
+
+        self._jiffies[slot] = jiffies
+        self._sampled[slot] = now
+        self._rss[slot] = max(rss, 0)
+        self._threads[slot] = threads
+        self._names[slot] = name
+        self._states[slot] = state
+        return True
+
+    def _allocate(self, pid: int) -> int:
+        if self._free:
+            slot = self._free.pop()
+            self._pids[slot] = pid
+        else:
+            slot = len(self._pids)
+            self._pids.append(pid)
+            self._starttimes.append(0)
+            self._jiffies.append(0)
+            self._sampled.append(0.0)
+            self._cpu.append(0.0)
+            self._rss.append(0)
+            self._threads.append(0)
+            self._names.append("")
+            self._states.append("")
+        self._slots[pid] = slot
+        return slot
+
+    def _remove(self, pid: int) -> None:
+        slot = self._slots.pop(pid, None)
+        if slot is not None:
+            self._pids[slot] = 0
+            self._names[slot] = ""
+            self._free.append(slot)
+
+    def _refresh_hot(self, scanned: List[int]) -> None:
+        """
+        更新常驻描述符的热点进程集合
+
+        只有热点进程和本批扫描的进程的使用率发生了变化，候选集合限定在这两部分，
+        不必每次扫描都遍历整张表。
+        """
+        cpu = self._cpu
+        slots = self._slots
+        candidates = [slots[pid] for pid in self._hot]
+        candidates.extend(slots[pid] for pid in scanned)
+        top = heapq.nlargest(self.hot_size, candidates, key=cpu.__getitem__)
+        hot = {self._pids[slot] for slot in top if cpu[slot] > 0}
+        for pid in [pid for pid in self._hot if pid not in hot]:
+            self._close_hot(pid)
+        for pid in hot:
+            if pid not in self._hot:
+                try:
+                    self._hot[pid] = os.open(f"{self.proc_root}/{pid}/stat", os.O_RDONLY | os.O_CLOEXEC)
+                except OSError:
+                    pass
+
+    def _close_hot(self, pid: int) -> None:
+        fd = self._hot.pop(pid, None)
+        if fd is not None:
+            os.close(fd)
+
+    def top(self, sort: str = "cpu", limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        返回按指定字段排序的前limit个进程
+
+        Returns:
+            List[Dict[str, Any]]: 每个进程包含pid、name、state、cpu_percent、memory_rss（字节）、num_threads
+        """
+        with self._lock:
+            cached = self._top_cache.get((sort, limit))
+            if cached is not None:
+                return cached
+            values = self._rss if sort == "memory" else self._cpu
+            slots = heapq.nlargest(limit, self._slots.values(), key=values.__getitem__)
+            result = [
+                {
+                    "pid": self._pids[slot],
+                    "name": self._names[slot],
+                    "state": self._states[slot],
+                    "cpu_percent": round(self._cpu[slot], 1),
+                    "memory_rss": self._rss[slot] * PAGE_SIZE,
+                    "num_threads": self._threads[slot],
+                }
+                for slot in slots
+            ]
+            self._top_cache[(sort, limit)] = result
+            return result
+
+    def close(self) -> None:
+        with self._lock:
+            for pid in list(self._hot):
+                self._close_hot(pid)
+        self._uptime.close()
@@ -0,0 +1,120 @@
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+# 临时高频采样的最短间隔和最长持续时间（秒）
+BURST_MIN_INTERVAL = 0.05
+BURST_MAX_DURATION = 600.0
+
+
+class AdaptiveRate:
+    """
+    单个子系统的自适应采样周期
+
+    没有客户端（推送流订阅者、近期的轮询或/metrics抓取）且指标保持稳定时，每次采样后把周期
+    翻倍，直到max_interval；有客户端访问或任一指标的变化超过容差时立即恢复到基础周期。
+    空闲时的采集开销因此按指数下降，而历史、告警和持久化仍能以较低频率持续获得数据。
+    """
+
+    __slots__ = ("base", "max_interval", "tolerance", "idle_after", "interval", "last_access", "_previous")
+
+    def __init__(self, base: float, max_interval: float, tolerance: float, idle_after: float):
+        self.base = base
+        self.max_interval = max(max_interval, base)
+        self.tolerance = tolerance
+        self.idle_after = idle_after
+        self.interval = base
+        # 启动后的idle_after秒内保持基础周期
+        self.last_access = time.monotonic()
+        self._previous: Optional[Dict[str, float]] = None
+
+    @property
+    def slowed(self) -> bool:
+        return self.interval > self.base
+
+    def touch(self) -> bool:
+        """记录一次客户端访问并恢复基础周期，返回此前是否处于降频状态"""
+        self.last_access = time.monotonic()
+        slowed = self.slowed
+        self.interval = self.base
+        return slowed
+
+    def _steady(self, points: Dict[str, float]) -> bool:
+        """与上一次采样相比，所有指标的变化都在容差内（相对变化，绝对值小于1时按1计算）"""
+        previous = self._previous
+        if previous is None or len(previous) != len(points):
+            return False
+        tolerance = self.tolerance
+        for name, value in points.items():
+            before = previous.get(name)
+            if value is None or before is None:
+                if value is not before:
+                    return False
+                continue
+            if abs(value - before) > tolerance * max(abs(before), 1.0):
+                return False
+        return True
+
+    def update(self, points: Dict[str, float], clients: bool) -> float:
+        """
+        用一次采样的指标更新周期
+
+        Args:
+            points: 本次采样写入历史的指标
+            clients: 当前是否有持续的客户端（推送流订阅者或近期的/metrics抓取）
+        """
+        steady = self._steady(points)
+        self._previous = points
+        idle = time.monotonic() - self.last_access >= self.idle_after
+        if clients or not steady or not idle:
+            self.interval = self.base
+        else:
+            self.interval = min(self.interval * 2, self.max_interval)
+        return self.interval
+
+
+class Burst:
+    """
+    一次临时的高频采样：在持续时间内按interval采样，并以原始精度保存每次采样的指标
+
+    历史环形缓冲区的最小分辨率是1秒，高频采样的原始数据只保存在这里，结束后保留到下一次burst。
+    """
+
+    def __init__(self, interval: float, duration: float):
+        self.interval = max(interval, BURST_MIN_INTERVAL)
+        self.duration = min(duration, BURST_MAX_DURATION)
+        self.started = time.time()
+        self.until = self.started + self.duration
+        self.samples: List[Tuple[float, Dict[str, float]]] = []
+        # 采样次数上限，防止采集耗时低于间隔时无限增长
+        self.max_samples = int(self.duration / self.interval) + 1
+
+    def active(self, now: float) -> bool:
+        return now < self.until
+
+    def record(self, timestamp: float, points: Dict[str, float]) -> None:
+        if len(self.samples) < self.max_samples:
+            self.samples.append((timestamp, points))
+
+    def summary(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "interval": self.interval,
+            "started": self.started,
+            "until": self.until,
+            "active": self.active(now),
+            "samples": len(self.samples),
+        }
+
+    def query(self, metric: str) -> Optional[Dict[str, Any]]:
+        """返回指标在本次burst中的原始采样，没有该指标时返回None"""
+        timestamps: List[float] = []
+        values: List[Optional[float]] = []
+        found = False
+        for timestamp, points in self.samples:
+            if metric in points:
+                found = True
+            timestamps.append(round(timestamp, 3))
+            values.append(points.get(metric))
+        if not found:
+            return None
+        return {"metric": metric, **self.summary(), "timestamps": timestamps, "values": values}
@@ -0,0 +1,317 @@
+import os
+import re
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.instrumentation import instrumentation
+
+# 属性文件都只有一行数字（温度为毫摄氏度、频率为kHz），一次pread读取这么多字节即可
+_ATTRIBUTE_SIZE = 32
+
+_CPU_DIR = re.compile(r"cpu(\d+)$")
+_TEMP_INPUT = re.compile(r"temp(\d+)_input$")
+_THERMAL_ZONE = re.compile(r"thermal_zone(\d+)$")
+
+# 视为CPU温度的hwmon驱动和thermal zone类型
+CPU_SENSORS = frozenset(("coretemp", "k10temp", "zenpower", "cpu_thermal", "cpu-thermal", "soc_thermal"))
+CPU_ZONES = frozenset(("x86_pkg_temp", "cpu-thermal", "cpu_thermal", "soc-thermal"))
+
+
+def _read_text(path: str) -> Optional[str]:
+    """读取一次性的属性（名称、标签、阈值），不存在或不可读时返回None"""
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _read_milli(path: str) -> Optional[float]:
+    """读取以千分之一为单位的一次性属性（温度阈值为毫摄氏度）"""
+    text = _read_text(path)
+    try:
+        return round(int(text) / 1000, 1) if text else None
+    except ValueError:
+        return None
+
+
+def _open_attribute(path: str) -> Optional[int]:
+    """打开需要每次采样读取的属性文件，返回保持打开的文件描述符"""
+    try:
+        return os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+    except OSError:
+        return None
+
+
+class _Attributes:
+    """
+    一组保持打开的单值属性文件
+
+    与ProcFile相同，文件只打开一次、每次用pread从偏移0重新读取；但这些文件只有一行数字，
+    直接用os.pread读取，不需要预分配缓冲区和扩容检查，读取的字节数在一次采样结束后合计记入instrumentation。
+    256核主机上每次采样有数百个这样的文件，单次读取的开销直接决定采样耗时。
+    """
+
+    def __init__(self):
+        self.bytes_read = 0
+
+    def read(self, fd: Optional[int]) -> Optional[int]:
+        """读取一个整数；文件不存在或传感器暂时不可用（读取返回EIO、ENODATA等）时返回None"""
+        if fd is None:
+            return None
+        try:
+            data = os.pread(fd, _ATTRIBUTE_SIZE, 0)
+            self.bytes_read += len(data)
+            return int(data)
+        except (OSError, ValueError):
+            return None
+
+    def flush(self) -> None:
+        instrumentation.count_bytes(self.bytes_read)
+        self.bytes_read = 0
+
+
+def _cpu_indexes(cpu_root: str) -> List[int]:
+    try:
+        names = os.listdir(cpu_root)
+    except OSError:
+        return []
+    return sorted(int(match.group(1)) for match in map(_CPU_DIR.match, names) if match)
+
+
+class CpuFreqReader:
+    """
+    各核心的当前频率（/sys/devices/system/cpu/cpu*/cpufreq）
+
+    目录只在首次读取时发现一次：cpuN/cpufreq通常是指向cpufreq/policyM的符号链接，共享同一个policy的核心
+    （例如ARM的一个cluster）只读取一次scaling_cur_freq；最低、最高频率在发现时读取并缓存。
+    之后每次采样每个policy只有一次pread，不再有listdir和open/close（Intel的每个逻辑CPU各有一个policy）。
+    """
+
+    def __init__(self, sys_root: str):
+        self.cpu_root = f"{sys_root}/devices/system/cpu"
+        self._policies: Optional[List[Tuple[Optional[int], List[int]]]] = None
+        self._attributes = _Attributes()
+        self._count = 0
+        self.min = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def _discover(self) -> None:
+        cpus = _cpu_indexes(self.cpu_root)
+        groups: Dict[str, List[int]] = {}
+        for cpu in cpus:
+            directory = f"{self.cpu_root}/cpu{cpu}/cpufreq"
+            if os.path.exists(f"{directory}/scaling_cur_freq"):
+                groups.setdefault(os.path.realpath(directory), []).append(cpu)
+        # scaling_*_freq的单位是kHz，_read_milli换算后即为MHz
+        minimums = [_read_milli(f"{path}/scaling_min_freq") for path in groups]
+        maximums = [_read_milli(f"{path}/scaling_max_freq") for path in groups]
+        self.min = min((value for value in minimums if value is not None), default=0.0)
+        self.max = max((value for value in maximums if value is not None), default=0.0)
+        self._policies = [
+            (_open_attribute(f"{path}/scaling_cur_freq"), members) for path, members in groups.items()
+        ]
+        self._count = cpus[-1] + 1 if cpus else 0
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """
+        Returns:
+            Optional[Dict[str, Any]]: 没有cpufreq（虚拟机、未加载驱动）时为None，否则包含
+                current（各核心平均，MHz）、min、max和per_core（离线核心为None）
+        """
+        with self._lock:
+            if self._policies is None:
+                self._discover()
+            if not self._policies:
+                return None
+            per_core: List[Optional[float]] = [None] * self._count
+            total = 0.0
+            count = 0
+            read = self._attributes.read
+            for fd, members in self._policies:
+                value = read(fd)
+                if value is None:
+                    continue
+                mhz = round(value / 1000, 1)
+                for cpu in members:
+                    per_core[cpu] = mhz
+                total += mhz * len(members)
+                count += len(members)
+            self._attributes.flush()
+            return {
+                "current": round(total / count, 2) if count else 0,
+                "min": self.min,
+                "max": self.max,
+                "per_core": per_core,
+            }
+
+
+class SensorSampler:
+    """
+    温度传感器（/sys/class/hwmon、/sys/class/thermal）和CPU热降频计数（thermal_throttle）
+
+    与CpuFreqReader相同，所有属性文件在首次采样时发现一次（名称、标签和阈值同时读取并缓存），
+    之后保持打开，每次采样每个温度输入或计数只有一次pread。降频计数按物理核心（core_throttle_count
+    由同一核心的超线程共享）和CPU封装（package_throttle_count）去重，并按相邻两次采样的差值换算为每秒次数。
+    """
+
+    def __init__(self, sys_root: str):
+        self.sys_root = sys_root
+        # (文件描述符, sensor, label, high, critical, 是否为CPU温度)
+        self._temperatures: Optional[List[Tuple[Optional[int], str, str, Optional[float], Optional[float], bool]]] = None
+        # (文件描述符, thermal_zoneN, 类型)
+        self._zones: List[Tuple[Optional[int], str, str]] = []
+        self._core_throttle: List[Tuple[Optional[int], List[int]]] = []
+        self._package_throttle: List[Optional[int]] = []
+        self._attributes = _Attributes()
+        self._previous: Optional[Tuple[float, List[Optional[int]], List[Optional[int]]]] = None
+        self._lock = threading.Lock()
+
+    def _discover(self) -> None:
+        self._temperatures = []
+        hwmon_root = f"{self.sys_root}/class/hwmon"
+        try:
+            devices = sorted(os.listdir(hwmon_root), key=lambda name: int(re.sub(r"\D", "", name) or 0))
+        except OSError:
+            devices = []
+        seen: Dict[str, int] = {}
+        for device in devices:
+            directory = f"{hwmon_root}/{device}"
+            name = _read_text(f"{directory}/name") or device
+            sensor = name
+            # 同名的驱动（例如每个CPU封装一个coretemp、每块盘一个nvme）依次加后缀，使sensor和label的组合唯一
+            seen[name] = seen.get(name, 0) + 1
+            if seen[name] > 1:
+                sensor = f"{name}_{seen[name] - 1}"
+            try:
+                inputs = sorted(int(match.group(1)) for match in map(_TEMP_INPUT.match, os.listdir(directory)) if match)
+            except OSError:
+                continue
+            for index in inputs:
+                prefix = f"{directory}/temp{index}"
+                self._temperatures.append((
+                    _open_attribute(f"{prefix}_input"), sensor,
+                    _read_text(f"{prefix}_label") or f"temp{index}",
+                    _read_milli(f"{prefix}_max"), _read_milli(f"{prefix}_crit"), name in CPU_SENSORS,
+                ))
+
+        self._zones = []
+        thermal_root = f"{self.sys_root}/class/thermal"
+        try:
+            zones = sorted(int(match.group(1)) for match in map(_THERMAL_ZONE.match, os.listdir(thermal_root)) if match)
+        except OSError:
+            zones = []
+        for index in zones:
+            # 同一类型可能有多个zone（例如两个acpitz），以目录名作为标识，类型单独保存
+            zone = f"thermal_zone{index}"
+            directory = f"{thermal_root}/{zone}"
+            self._zones.append((_open_attribute(f"{directory}/temp"), zone, _read_text(f"{directory}/type") or zone))
+
+        cores: Dict[Tuple[str, str], Tuple[Optional[int], List[int]]] = {}
+        packages: Dict[str, Optional[int]] = {}
+        cpu_root = f"{self.sys_root}/devices/system/cpu"
+        for cpu in _cpu_indexes(cpu_root):
+            throttle = f"{cpu_root}/cpu{cpu}/thermal_throttle"
+            if not os.path.exists(f"{throttle}/core_throttle_count"):
+                continue
+            package = _read_text(f"{cpu_root}/cpu{cpu}/topology/physical_package_id") or "0"
+            core = _read_text(f"{cpu_root}/cpu{cpu}/topology/core_id") or str(cpu)
+            if (package, core) in cores:
+                cores[(package, core)][1].append(cpu)
+            else:
+                cores[(package, core)] = (_open_attribute(f"{throttle}/core_throttle_count"), [cpu])
+            if package not in packages and os.path.exists(f"{throttle}/package_throttle_count"):
+                packages[package] = _open_attribute(f"{throttle}/package_throttle_count")
+        self._core_throttle = list(cores.values())
+        self._package_throttle = list(packages.values())
+
+    def sample(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: 包含以下字段：
+                - temperatures: hwmon温度传感器（sensor驱动名、label、current/high/critical，摄氏度）
+                - thermal_zones: thermal zone（zone为目录名thermal_zoneN、type为类型、current）
+                - cpu_temperature: CPU温度传感器中的最高值，没有时为None
+                - max_temperature: 所有传感器中的最高值，没有时为None
+                - throttle: CPU热降频计数，不支持时为None：
+                    - core_events/package_events: 累计次数
+                    - core_events_rate/package_events_rate: 采样区间内的每秒次数
+                    - throttled_cpus: 采样区间内发生降频的逻辑CPU
+        """
+        with self._lock:
+            if self._temperatures is None:
+                self._discover()
+            read = self._attributes.read
+            temperatures = []
+            cpu_temperature = None
+            max_temperature = None
+            for fd, sensor, label, high, critical, is_cpu in self._temperatures:
+                value = read(fd)
+                current = round(value / 1000, 1) if value is not None else None
+                temperatures.append({"sensor": sensor, "label": label, "current": current,
+                                     "high": high, "critical": critical})
+                if current is None:
+                    continue
+                if max_temperature is None or current > max_temperature:
+                    max_temperature = current
+                if is_cpu and (cpu_temperature is None or current > cpu_temperature):
+                    cpu_temperature = current
+
+            zones = []
+            zone_cpu_temperature = None
+            for fd, zone, kind in self._zones:
+                value = read(fd)
+                current = round(value / 1000, 1) if value is not None else None
+                zones.append({"zone": zone, "type": kind, "current": current})
+                if current is None:
+                    continue
+                if max_temperature is None or current > max_temperature:
+                    max_temperature = current
+                if kind in CPU_ZONES and (zone_cpu_temperature is None or current > zone_cpu_temperature):
+                    zone_cpu_temperature = current
+            if cpu_temperature is None:
+                # 没有CPU的hwmon驱动（例如ARM板卡）时使用thermal zone
+                cpu_temperature = zone_cpu_temperature
+
+            throttle = self._sample_throttle()
+            self._attributes.flush()
+            return {
+                "temperatures": temperatures,
+                "thermal_zones": zones,
+                "cpu_temperature": cpu_temperature,
+                "max_temperature": max_temperature,
+                "throttle": throttle,
+            }
+
+    def _sample_throttle(self) -> Optional[Dict[str, Any]]:
+        if not self._core_throttle:
+            return None
+        now = time.monotonic()
+        read = self._attributes.read
+        cores = [read(fd) for fd, _ in self._core_throttle]
+        packages = [read(fd) for fd in self._package_throttle]
+        previous = self._previous
+        self._previous = (now, cores, packages)
+
+        core_rate = package_rate = 0.0
+        throttled: List[int] = []
+        if previous is not None and now > previous[0]:
+            elapsed = now - previous[0]
+            core_delta = 0
+            for (_, members), before, after in zip(self._core_throttle, previous[1], cores):
+                if before is not None and after is not None and after > before:
+                    core_delta += after - before
+                    throttled.extend(members)
+            package_delta = sum(after - before for before, after in zip(previous[2], packages)
+                                if before is not None and after is not None and after > before)
+            core_rate = round(core_delta / elapsed, 2)
+            package_rate = round(package_delta / elapsed, 2)
+        return {
+            "core_events": sum(value for value in cores if value is not None),
+            "package_events": sum(value for value in packages if value is not None),
+            "core_events_rate": core_rate,
+            "package_events_rate": package_rate,
+            "throttled_cpus": sorted(throttled),
+        }
@@ -0,0 +1,129 @@
+import gzip
+import json
+import math
+from typing import Dict, Any, Optional, Tuple
+
+# 以下都是可选依赖：缺少orjson时使用标准库json，缺少msgpack/brotli时不提供对应格式
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON_TYPE = "application/json"
+MSGPACK_TYPE = "application/msgpack"
+# 客户端可能使用的MessagePack媒体类型
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+# 小于该字节数的响应不压缩（压缩收益抵不过开销）
+COMPRESS_MIN_SIZE = 1024
+# 压缩级别：监控数据每秒都在变化，无法缓存压缩结果，取压缩率和耗时的折中
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def _finite(data: Any) -> Any:
+    """把NaN/Infinity替换为None（与orjson的输出一致）"""
+    if isinstance(data, float):
+        return data if math.isfinite(data) else None
+    if isinstance(data, dict):
+        return {key: _finite(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_finite(value) for value in data]
+    return data
+
+
+def dumps_json(data: Any) -> bytes:
+    """编码为紧凑的JSON（优先使用orjson），两种实现都把NaN/Infinity编码为null"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    try:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False, allow_nan=False).encode()
+    except ValueError:
+        # 标准库会输出浏览器JSON.parse无法解析的NaN/Infinity，只在出现时才遍历替换
+        return json.dumps(_finite(data), separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def dumps_msgpack(data: Any) -> bytes:
+    return msgpack.packb(data, use_bin_type=True)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def _parse_quality(header: str) -> Dict[str, float]:
+    """解析Accept/Accept-Encoding请求头，返回{取值: q值}"""
+    result: Dict[str, float] = {}
+    for part in header.split(","):
+        token, _, params = part.partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        result[token] = quality
+    return result
+
+
+def negotiate(accept: str, accept_encoding: str) -> Tuple[str, Optional[str]]:
+    """
+    根据请求头选择响应格式和压缩方式
+
+    Returns:
+        Tuple[str, Optional[str]]: 媒体类型（JSON_TYPE或MSGPACK_TYPE）和内容编码（br、gzip或None）
+    """
+    media_type = JSON_TYPE
+    if msgpack is not None and accept:
+        types = _parse_quality(accept)
+        msgpack_quality = max(types.get(name, 0.0) for name in MSGPACK_TYPES)
+        # 只有客户端显式列出msgpack时才使用，*/*仍返回JSON
+        json_quality = max(types.get(JSON_TYPE, 0.0), types.get("application/*", 0.0), types.get("*/*", 0.0))
+        if msgpack_quality > 0 and msgpack_quality >= json_quality:
+            media_type = MSGPACK_TYPE
+
+    encoding = None
+    if accept_encoding:
+        encodings = _parse_quality(accept_encoding)
+        best = 0.0
+        for name in ("br", "gzip"):
+            if name == "br" and brotli is None:
+                continue
+            quality = encodings.get(name, encodings.get("*", 0.0))
+            if quality > best:
+                best = quality
+                encoding = name
+    return media_type, encoding
+
+
+def encode_response(data: Any, accept: str = "", accept_encoding: str = "") -> Tuple[bytes, str, Dict[str, str]]:
+    """
+    按内容协商的结果编码响应数据
+
+    直接从快照字典编码，不经过Pydantic模型的校验和转换。
+
+    Returns:
+        Tuple[bytes, str, Dict[str, str]]: 响应体、媒体类型和需要附加的响应头
+    """
+    media_type, encoding = negotiate(accept, accept_encoding)
+    body = dumps_msgpack(data) if media_type == MSGPACK_TYPE else dumps_json(data)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if encoding is not None and len(body) >= COMPRESS_MIN_SIZE:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return body, media_type, headers
@@ -0,0 +1,660 @@
+import asyncio
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.config import (
+    STORAGE_DIR, STORAGE_RETENTION, STORAGE_RAW_RETENTION, STORAGE_DOWNSAMPLE, STORAGE_FLUSH_INTERVAL,
+    STORAGE_SEGMENT_SECONDS, STORAGE_COMPACT_INTERVAL, STORAGE_MAX_PENDING,
+)
+from app.core.instrumentation import instrumentation
+
+# 段文件格式
+#
+# 每个段文件覆盖固定的时间范围（默认一天），文件名为段起始的Unix时间戳。文件由段头和一系列数据块组成，
+# 只追加写入：每次刷盘追加一个数据块，包含这段时间内所有指标的数据，按指标分列存放：
+#   段头:     magic、版本、标志（是否已压缩）、分辨率（秒，0为原始采样）、段起始时间
+#   块头:     块类型、起止时间（毫秒）、条目数、负载长度
+#   名称块:   本段新出现的指标（编号 + 名称），编号在段内有效
+#   数据块:   按指标编号排序的目录（编号、点数、首末时间、列偏移、数值之和），之后是各指标的列
+#   列:       首个数值，之后每个点依次为时间戳的二阶差分和数值的差分，都是zigzag varint；
+#             数值以定点数存储（乘以VALUE_SCALE后取整）
+# 定期采样的时间戳二阶差分接近0，变化缓慢的数值差分也很小，每个点通常只占2-4字节。
+# 目录中的数值之和使查询在步长大于数据块跨度时不需要解码列，只读取目录。
+#
+# 所有指标写入同一个文件而不是每个指标一个文件：每次刷盘只追加一段连续数据，
+# 不会为每个指标分别弄脏一个文件系统页，SSD上的实际写入量接近数据本身的大小。
+
+SEGMENT_MAGIC = b"SMTS"
+SEGMENT_VERSION = 1
+FLAG_COMPACTED = 1
+
+BLOCK_NAMES = 1
+BLOCK_DATA = 2
+
+_SEGMENT_HEADER = struct.Struct("<4sBBHq")
+_BLOCK_HEADER = struct.Struct("<BqqII")
+_DIR_ENTRY = struct.Struct("<IIqqId")
+_DIR_ID = struct.Struct("<I")
+_NAME_ENTRY = struct.Struct("<IH")
+
+# 数值以定点数存储的倍数（保留3位小数，与历史接口输出的精度一致）
+VALUE_SCALE = 1000
+# 压缩后每个数据块覆盖的时长（秒）
+COMPACT_BLOCK_SECONDS = 600
+# 未指定step时最多返回的点数
+MAX_POINTS = 1000
+# 自动选择的步长（秒），超过最后一项时取COMPACT_BLOCK_SECONDS的整数倍
+NICE_STEPS = (1, 2, 5, 10, 15, 30, 60, 120, 300, 600)
+
+
+def _encode_column(timestamps: List[int], values: List[int]) -> bytearray:
+    """把一个指标的数据点编码为列（第一个时间戳记录在目录中）"""
+    out = bytearray()
+    append = out.append
+    value = values[0]
+    value = value << 1 if value >= 0 else (-value << 1) - 1
+    while value >= 0x80:
+        append((value & 0x7F) | 0x80)
+        value >>= 7
+    append(value)
+    previous_ts = timestamps[0]
+    previous_delta = 0
+    previous_value = values[0]
+    for index in range(1, len(timestamps)):
+        ts = timestamps[index]
+        delta = ts - previous_ts
+        item = delta - previous_delta
+        previous_ts = ts
+        previous_delta = delta
+        item = item << 1 if item >= 0 else (-item << 1) - 1
+        while item >= 0x80:
+            append((item & 0x7F) | 0x80)
+            item >>= 7
+        append(item)
+        value = values[index]
+        item = value - previous_value
+        previous_value = value
+        item = item << 1 if item >= 0 else (-item << 1) - 1
+        while item >= 0x80:
+            append((item & 0x7F) | 0x80)
+            item >>= 7
+        append(item)
+    return out
+
+
+def _decode_column(buffer, offset: int, count: int, first_ts: int) -> Tuple[List[int], List[int]]:
+    """解码一列，返回毫秒时间戳和定点数值"""
+    timestamps = [first_ts]
+    values = []
+    shift = 0
+    item = 0
+    while True:
+        byte = buffer[offset]
+        offset += 1
+        item |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    value = (item >> 1) ^ -(item & 1)
+    values.append(value)
+    ts = first_ts
+    delta = 0
+    for _ in range(count - 1):
+        shift = 0
+        item = 0
+        while True:
+            byte = buffer[offset]
+            offset += 1
+            item |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        delta += (item >> 1) ^ -(item & 1)
+        ts += delta
+        timestamps.append(ts)
+        shift = 0
+        item = 0
+        while True:
+            byte = buffer[offset]
+            offset += 1
+            item |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        value += (item >> 1) ^ -(item & 1)
+        values.append(value)
+    return timestamps, values
+
+
+def _auto_step(span: float) -> int:
+    """按最多MAX_POINTS个点选择步长，取整到NICE_STEPS或COMPACT_BLOCK_SECONDS的整数倍"""
+    step = max(1, math.ceil(span / MAX_POINTS))
+    for nice in NICE_STEPS:
+        if step <= nice:
+            return nice
+    return math.ceil(step / COMPACT_BLOCK_SECONDS) * COMPACT_BLOCK_SECONDS
+
+
+def _names_block(names: List[Tuple[int, str]]) -> bytes:
+    payload = bytearray()
+    for metric_id, name in names:
+        encoded = name.encode()
+        payload += _NAME_ENTRY.pack(metric_id, len(encoded))
+        payload += encoded
+    return _BLOCK_HEADER.pack(BLOCK_NAMES, 0, 0, len(names), len(payload)) + payload
+
+
+def _data_block(columns: Dict[int, Tuple[List[int], List[int]]]) -> bytes:
+    """把{指标编号: (毫秒时间戳, 定点数值)}编码为一个数据块"""
+    directory = bytearray()
+    chunks = bytearray()
+    base = len(columns) * _DIR_ENTRY.size
+    start_ms = min(column[0][0] for column in columns.values())
+    end_ms = max(column[0][-1] for column in columns.values())
+    for metric_id in sorted(columns):
+        timestamps, values = columns[metric_id]
+        directory += _DIR_ENTRY.pack(
+            metric_id, len(timestamps), timestamps[0], timestamps[-1], base + len(chunks), sum(values) / VALUE_SCALE
+        )
+        chunks += _encode_column(timestamps, values)
+    return _BLOCK_HEADER.pack(BLOCK_DATA, start_ms, end_ms, len(columns), len(directory) + len(chunks)) \
+        + directory + chunks
+
+
+def _find_entry(buffer, payload: int, count: int, metric_id: int) -> Optional[Tuple[int, int, int, int, int, float]]:
+    """在数据块目录中二分查找指标"""
+    low, high = 0, count
+    while low < high:
+        middle = (low + high) // 2
+        (entry_id,) = _DIR_ID.unpack_from(buffer, payload + middle * _DIR_ENTRY.size)
+        if entry_id < metric_id:
+            low = middle + 1
+        elif entry_id > metric_id:
+            high = middle
+        else:
+            return _DIR_ENTRY.unpack_from(buffer, payload + middle * _DIR_ENTRY.size)
+    return None
+
+
+class _SegmentIndex:
+    """段文件的索引：指标名称表和各数据块的位置，文件增长时只扫描新追加的部分"""
+
+    __slots__ = ("inode", "size", "scanned", "flags", "resolution", "start", "names", "blocks")
+
+    def __init__(self, inode: int):
+        self.inode = inode
+        self.size = 0
+        self.scanned = 0
+        self.flags = 0
+        self.resolution = 0
+        self.start = 0
+        self.names: Dict[str, int] = {}
+        # (起始毫秒, 结束毫秒, 负载偏移, 条目数)
+        self.blocks: List[Tuple[int, int, int, int]] = []
+
+    def scan(self, buffer, size: int) -> bool:
+        """扫描新追加的数据块，段头无效时返回False"""
+        if self.scanned == 0:
+            if size < _SEGMENT_HEADER.size:
+                return False
+            magic, version, self.flags, self.resolution, self.start = _SEGMENT_HEADER.unpack_from(buffer)
+            if magic != SEGMENT_MAGIC or version != SEGMENT_VERSION:
+                return False
+            self.scanned = _SEGMENT_HEADER.size
+        offset = self.scanned
+        while offset + _BLOCK_HEADER.size <= size:
+            kind, start_ms, end_ms, count, length = _BLOCK_HEADER.unpack_from(buffer, offset)
+            payload = offset + _BLOCK_HEADER.size
+            if payload + length > size:
+                # 写入中或异常退出留下的不完整数据块
+                break
+            if kind == BLOCK_NAMES:
+                position = payload
+                for _ in range(count):
+                    metric_id, name_length = _NAME_ENTRY.unpack_from(buffer, position)
+                    position += _NAME_ENTRY.size
+                    self.names[bytes(buffer[position:position + name_length]).decode()] = metric_id
+                    position += name_length
+            elif kind == BLOCK_DATA:
+                self.blocks.append((start_ms, end_ms, payload, count))
+            offset = payload + length
+        self.scanned = offset
+        self.size = size
+        return True
+
+
+class MetricStore:
+    """
+    历史数据的持久化存储
+
+    作为采集器的sink注册，submit()只把采样追加到内存缓冲区；后台任务每STORAGE_FLUSH_INTERVAL秒
+    把缓冲区编码为一个数据块追加到当前段文件，每STORAGE_COMPACT_INTERVAL秒删除超过保留时长的段，
+    并压缩已结束的段：按COMPACT_BLOCK_SECONDS重新分块（减少目录开销、加快范围查询），
+    早于STORAGE_RAW_RETENTION的段同时降采样为STORAGE_DOWNSAMPLE秒的平均值。
+    查询通过mmap只读取与时间范围重叠的数据块，且只解码所查指标的列。
+    """
+
+    def __init__(self, directory: str, retention: float = STORAGE_RETENTION,
+                 raw_retention: float = STORAGE_RAW_RETENTION, downsample: int = STORAGE_DOWNSAMPLE,
+                 flush_interval: float = STORAGE_FLUSH_INTERVAL, segment_seconds: int = STORAGE_SEGMENT_SECONDS,
+                 compact_interval: float = STORAGE_COMPACT_INTERVAL, max_pending: int = STORAGE_MAX_PENDING):
+        self.directory = directory
+        self.retention = retention
+        self.raw_retention = raw_retention
+        self.downsample = downsample
+        self.flush_interval = flush_interval
+        self.segment_seconds = segment_seconds
+        self.compact_interval = compact_interval
+        self.max_pending = max_pending
+        self._pending: Dict[str, Tuple[array, array]] = {}
+        self._pending_lock = threading.Lock()
+        # 刷盘与压缩互斥；索引缓存单独加锁，查询不会等待压缩
+        self._io_lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._indexes: Dict[str, _SegmentIndex] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.bytes_written = 0
+        self.compactions = 0
+
+    # ---- 写入 ----
+
+    def submit(self, name: str, timestamp: float, data: Dict[str, Any], points: Dict[str, float]) -> None:
+        """采集器sink：在事件循环中调用，只写入内存缓冲区"""
+        with self._pending_lock:
+            pending = self._pending
+            for metric, value in points.items():
+                if value is None:
+                    continue
+                value = float(value)
+                if not math.isfinite(value):
+                    continue
+                column = pending.get(metric)
+                if column is None:
+                    column = pending[metric] = (array("d"), array("d"))
+                column[0].append(timestamp)
+                column[1].append(value)
+
+    def flush(self) -> int:
+        """把缓冲区写入段文件，返回写入的字节数"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        # 按(段, 时间窗口)分组：数据块不跨越COMPACT_BLOCK_SECONDS窗口，步长为窗口整数倍的查询只需读取目录
+        window_ms = COMPACT_BLOCK_SECONDS * 1000
+        groups: Dict[Tuple[int, int], Dict[str, Tuple[List[int], List[int]]]] = {}
+        for metric, (timestamps, values) in pending.items():
+            for timestamp, value in zip(timestamps, values):
+                ts = int(timestamp * 1000)
+                key = (int(timestamp // self.segment_seconds) * self.segment_seconds, ts // window_ms)
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = {}
+                column = group.get(metric)
+                if column is None:
+                    column = group[metric] = ([], [])
+                column[0].append(ts)
+                column[1].append(round(value * VALUE_SCALE))
+        written = 0
+        keys = sorted(groups)
+        with self._io_lock:
+            for position, key in enumerate(keys):
+                try:
+                    written += self._append(key[0], groups[key])
+                except OSError as e:
+                    # 磁盘满或I/O错误：未写入的数据块放回缓冲区，下次刷盘重试（写了一半的块会在下次追加时截掉）
+                    self._restore([groups[k] for k in keys[position:]])
+                    instrumentation.record_error("storage", f"Error writing metric storage: {e}")
+                    break
+        self.bytes_written += written
+        return written
+
+    def _restore(self, unwritten: List[Dict[str, Tuple[List[int], List[int]]]]) -> None:
+        """把写入失败的数据块放回缓冲区，排在刷盘期间新提交的采样之前，总点数不超过max_pending"""
+        restored: Dict[str, Tuple[array, array]] = {}
+        for group in unwritten:
+            for metric, (timestamps, values) in group.items():
+                column = restored.get(metric)
+                if column is None:
+                    column = restored[metric] = (array("d"), array("d"))
+                column[0].extend(ts / 1000 for ts in timestamps)
+                column[1].extend(value / VALUE_SCALE for value in values)
+        with self._pending_lock:
+            for metric, (timestamps, values) in self._pending.items():
+                column = restored.get(metric)
+                if column is None:
+                    restored[metric] = (timestamps, values)
+                else:
+                    column[0].extend(timestamps)
+                    column[1].extend(values)
+            total = sum(len(timestamps) for timestamps, _ in restored.values())
+            if total > self.max_pending:
+                # 按比例丢弃每个指标最早的采样
+                ratio = self.max_pending / total
+                for metric, (timestamps, values) in restored.items():
+                    drop = len(timestamps) - int(len(timestamps) * ratio)
+                    del timestamps[:drop]
+                    del values[:drop]
+            self._pending = restored
+
+    def _append(self, start: int, columns: Dict[str, Tuple[List[int], List[int]]]) -> int:
+        path = self._segment_path(start)
+        index = self._index(path)
+        if index is None:
+            with open(path, "wb") as file:
+                file.write(_SEGMENT_HEADER.pack(SEGMENT_MAGIC, SEGMENT_VERSION, 0, 0, start))
+            names: Dict[str, int] = {}
+        else:
+            if index.size > index.scanned:
+                # 丢弃上次异常退出时写了一半的数据块
+                os.truncate(path, index.scanned)
+            names = dict(index.names)
+        defined = []
+        for metric in columns:
+            if metric not in names:
+                names[metric] = len(names)
+                defined.append((names[metric], metric))
+        data = _data_block({names[metric]: column for metric, column in columns.items()})
+        if defined:
+            data = _names_block(defined) + data
+        with open(path, "ab") as file:
+            file.write(data)
+        return len(data)
+
+    # ---- 段文件与索引 ----
+
+    def _segment_path(self, start: int) -> str:
+        return os.path.join(self.directory, f"{start:012d}.seg")
+
+    def _segments(self) -> List[Tuple[int, str]]:
+        """所有段文件（起始时间, 路径），按时间排序"""
+        try:
+            entries = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        segments = []
+        for entry in entries:
+            if entry.endswith(".seg") and entry[:-4].isdigit():
+                segments.append((int(entry[:-4]), os.path.join(self.directory, entry)))
+        segments.sort()
+        return segments
+
+    def _index(self, path: str) -> Optional[_SegmentIndex]:
+        """读取（必要时增量更新）段文件的索引，文件不存在或无效时返回None"""
+        with self._index_lock:
+            try:
+                file = open(path, "rb")
+            except FileNotFoundError:
+                self._indexes.pop(path, None)
+                return None
+            with file:
+                # 对已打开的文件取inode和大小，扫描的内容与记录的inode一定属于同一个文件
+                stat = os.fstat(file.fileno())
+                index = self._indexes.get(path)
+                if index is None or index.inode != stat.st_ino or stat.st_size < index.size:
+                    # 新文件，或者已被压缩替换
+                    index = self._indexes[path] = _SegmentIndex(stat.st_ino)
+                if stat.st_size > index.size:
+                    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                        if not index.scan(buffer, stat.st_size):
+                            print(f"Ignoring invalid storage segment: {path}")
+                            del self._indexes[path]
+                            return None
+            return index
+
+    def _open_segment(self, path: str, attempts: int = 3):
+        """
+        打开段文件并返回(文件, 与之对应的索引)，文件不存在或无效时返回None
+
+        索引中的偏移只对建立索引时的那个文件有效：压缩会用os.replace替换段文件，
+        因此先打开文件，再确认索引的inode与打开的文件一致，不一致（两步之间刚好被替换）时重试。
+        """
+        for _ in range(attempts):
+            try:
+                file = open(path, "rb")
+            except FileNotFoundError:
+                # 刚好被删除
+                return None
+            index = self._index(path)
+            if index is not None and index.inode == os.fstat(file.fileno()).st_ino:
+                return file, index
+            file.close()
+            if index is None:
+                return None
+        return None
+
+    # ---- 查询 ----
+
+    def query(self, metric: str, since: float, until: Optional[float] = None,
+              step: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        查询指标在[since, until]内的数据，并按step秒分桶取平均，返回格式与HistoryStore.query()一致
+
+        未指定step时按最多MAX_POINTS个点自动选择步长。完全落在一个桶内的列直接使用目录中的数值之和，
+        不需要解码。指标不存在时返回None。
+        """
+        now = time.time()
+        until = now if until is None else until
+        if not step or step <= 0:
+            step = _auto_step(until - since)
+        step_ms = max(1, int(step * 1000))
+        since_ms = int(since * 1000)
+        until_ms = int(until * 1000)
+        sums: Dict[int, float] = {}
+        counts: Dict[int, int] = {}
+        found = False
+        resolution = 1
+
+        def add(timestamps: List[int], values: List[int]) -> None:
+            for ts, value in zip(timestamps, values):
+                if since_ms <= ts <= until_ms:
+                    bucket = ts // step_ms
+                    sums[bucket] = sums.get(bucket, 0.0) + value / VALUE_SCALE
+                    counts[bucket] = counts.get(bucket, 0) + 1
+
+        for start, path in self._segments():
+            if start * 1000 > until_ms or (start + self.segment_seconds) * 1000 < since_ms:
+                continue
+            opened = self._open_segment(path)
+            if opened is None:
+                continue
+            file, index = opened
+            metric_id = index.names.get(metric)
+            blocks = [block for block in index.blocks if block[1] >= since_ms and block[0] <= until_ms]
+            if metric_id is None or not blocks:
+                file.close()
+                if metric_id is not None:
+                    found = True
+                    resolution = max(resolution, index.resolution)
+                continue
+            found = True
+            resolution = max(resolution, index.resolution)
+            with file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                for _, _, payload, count in blocks:
+                    entry = _find_entry(buffer, payload, count, metric_id)
+                    if entry is None:
+                        continue
+                    _, points, first_ts, last_ts, offset, total = entry
+                    if first_ts >= since_ms and last_ts <= until_ms and first_ts // step_ms == last_ts // step_ms:
+                        bucket = first_ts // step_ms
+                        sums[bucket] = sums.get(bucket, 0.0) + total
+                        counts[bucket] = counts.get(bucket, 0) + points
+                    else:
+                        add(*_decode_column(buffer, payload + offset, points, first_ts))
+
+        # 尚未刷盘的采样
+        with self._pending_lock:
+            column = self._pending.get(metric)
+            if column is not None:
+                found = True
+                timestamps = [int(ts * 1000) for ts in column[0]]
+                values = [round(value * VALUE_SCALE) for value in column[1]]
+        if column is not None:
+            add(timestamps, values)
+
+        if not found:
+            return None
+        result_timestamps: List[float] = []
+        result_values: List[Optional[float]] = []
+        if counts:
+            for bucket in range(min(counts), max(counts) + 1):
+                count = counts.get(bucket)
+                result_timestamps.append(bucket * step_ms / 1000)
+                result_values.append(round(sums[bucket] / count, 3) if count else None)
+        return {
+            "metric": metric,
+            "resolution": resolution,
+            "step": step_ms / 1000,
+            "timestamps": result_timestamps,
+            "values": result_values,
+        }
+
+    def names(self) -> List[str]:
+        """所有段文件中出现过的指标名称"""
+        names = set()
+        for _, path in self._segments():
+            index = self._index(path)
+            if index is not None:
+                names.update(index.names)
+        return sorted(names)
+
+    def nbytes(self) -> int:
+        """段文件占用的磁盘空间（字节）"""
+        total = 0
+        for _, path in self._segments():
+            try:
+                total += os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+        return total
+
+    # ---- 保留与压缩 ----
+
+    def maintain(self) -> None:
+        """删除超过保留时长的段，压缩（必要时降采样）已结束的段"""
+        now = time.time()
+        for start, path in self._segments():
+            end = start + self.segment_seconds
+            if end < now - self.retention:
+                with self._io_lock:
+                    os.remove(path)
+                self._index(path)
+                continue
+            # 刷盘可能仍会写入刚结束的段
+            if end + 2 * self.flush_interval > now:
+                continue
+            index = self._index(path)
+            if index is None:
+                continue
+            resolution = self.downsample if self.downsample > 0 and end < now - self.raw_retention else 0
+            if index.flags & FLAG_COMPACTED and index.resolution >= resolution:
+                continue
+            with self._io_lock:
+                before = os.path.getsize(path)
+                self._compact(path, index, resolution)
+                after = os.path.getsize(path)
+            self.compactions += 1
+            print(f"Compacted storage segment {os.path.basename(path)}: {before} -> {after} bytes")
+
+    def _compact(self, path: str, index: _SegmentIndex, resolution: int) -> None:
+        """按时间窗口重写段文件，resolution大于0时同时降采样"""
+        window_ms = COMPACT_BLOCK_SECONDS * 1000
+        resolution = max(resolution, index.resolution)
+        temporary = path + ".tmp"
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer, \
+                open(temporary, "wb") as out:
+            out.write(_SEGMENT_HEADER.pack(SEGMENT_MAGIC, SEGMENT_VERSION, FLAG_COMPACTED, resolution, index.start))
+            if index.names:
+                out.write(_names_block(sorted((metric_id, name) for name, metric_id in index.names.items())))
+            windows: Dict[int, Dict[int, Tuple[List[int], List[int]]]] = {}
+            for _, block_end, payload, count in index.blocks:
+                for position in range(count):
+                    metric_id, points, first_ts, _, offset, _ = _DIR_ENTRY.unpack_from(
+                        buffer, payload + position * _DIR_ENTRY.size
+                    )
+                    timestamps, values = _decode_column(buffer, payload + offset, points, first_ts)
+                    for ts, value in zip(timestamps, values):
+                        column = windows.setdefault(ts // window_ms, {}).get(metric_id)
+                        if column is None:
+                            column = windows[ts // window_ms][metric_id] = ([], [])
+                        column[0].append(ts)
+                        column[1].append(value)
+                # 数据块按时间顺序追加，结束于block_end之前的窗口不会再有新数据
+                for window in sorted(windows):
+                    if (window + 1) * window_ms > block_end:
+                        break
+                    out.write(self._window_block(windows.pop(window), resolution))
+            for window in sorted(windows):
+                out.write(self._window_block(windows[window], resolution))
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(temporary, path)
+
+    @staticmethod
+    def _window_block(columns: Dict[int, Tuple[List[int], List[int]]], resolution: int) -> bytes:
+        result: Dict[int, Tuple[List[int], List[int]]] = {}
+        for metric_id, (timestamps, values) in columns.items():
+            points = sorted(zip(timestamps, values))
+            if resolution > 0:
+                bucket_ms = resolution * 1000
+                buckets: Dict[int, List[int]] = {}
+                for ts, value in points:
+                    buckets.setdefault(ts // bucket_ms, []).append(value)
+                points = [(bucket * bucket_ms, round(sum(items) / len(items))) for bucket, items in sorted(buckets.items())]
+            result[metric_id] = ([ts for ts, _ in points], [value for _, value in points])
+        return _data_block(result)
+
+    # ---- 生命周期 ----
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        for entry in os.listdir(self.directory):
+            if entry.endswith(".tmp"):
+                # 压缩中途退出留下的临时文件
+                os.remove(os.path.join(self.directory, entry))
+        self._task = asyncio.create_task(self._run(), name="metric-store")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await asyncio.to_thread(self.flush)
+
+    async def _run(self) -> None:
+        """定期刷盘，并按STORAGE_COMPACT_INTERVAL执行保留和压缩（都在线程池中执行）"""
+        loop = asyncio.get_running_loop()
+        next_maintain = loop.time()
+        while True:
+            if loop.time() >= next_maintain:
+                next_maintain = loop.time() + self.compact_interval
+                try:
+                    await asyncio.to_thread(self.maintain)
+                except Exception as e:
+                    print(f"Error maintaining metric storage: {e}")
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                print(f"Error flushing metric storage: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": self.directory,
+            "segments": len(self._segments()),
+            "disk_bytes": self.nbytes(),
+            "bytes_written": self.bytes_written,
+            "compactions": self.compactions,
+        }
+
+
+# 全局存储实例，设置MONITOR_STORAGE_DIR时由main.py中的应用生命周期启动
+storage: Optional[MetricStore] = MetricStore(STORAGE_DIR) if STORAGE_DIR else None
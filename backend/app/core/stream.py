@@ -0,0 +1,97 @@
+import asyncio
+import time
+from typing import Dict, Any, Optional, Set
+
+from app.core.serialization import dumps_json
+
+# 每个订阅者最多积压的消息数，超过后断开该订阅者，由客户端重连并重新获取完整快照
+SUBSCRIBER_QUEUE_SIZE = 32
+
+
+def encode_event(event: str, data: Dict[str, Any], event_id: int) -> bytes:
+    """编码为一条Server-Sent Events消息"""
+    return f"id: {event_id}\nevent: {event}\ndata: ".encode() + dumps_json(data) + b"\n\n"
+
+
+class StreamHub:
+    """
+    推送流的扇出中心
+
+    采集器每完成一次采样调用publish()，只把与上一次推送相比发生变化的字段编码一次，
+    再把同一份字节放入所有订阅者的队列。没有订阅者时不做任何编码工作。
+    """
+
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+        # 各子系统最近一次推送的数据，用于计算增量
+        self._published: Dict[str, Dict[str, Any]] = {}
+        self._event_id = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def snapshot_event(self, snapshot: Dict[str, Any]) -> bytes:
+        """编码订阅建立时发送的完整快照"""
+        return encode_event("snapshot", snapshot, self._event_id)
+
+    def publish(self, name: str, data: Dict[str, Any]) -> None:
+        """推送子系统的新采样结果（只包含变化的字段）"""
+        previous = self._published.get(name)
+        self._published[name] = data
+        if not self._subscribers:
+            return
+
+        if previous is None:
+            changed = data
+        else:
+            changed = {key: value for key, value in data.items() if previous.get(key) != value}
+            if not changed:
+                return
+
+        self._event_id += 1
+        message = encode_event("delta", {"timestamp": time.time(), name: changed}, self._event_id)
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # 消费过慢的订阅者：通知其断开，客户端重连后会收到新的完整快照
+                self._subscribers.discard(queue)
+                self._drop(queue)
+
+    def publish_event(self, event: str, data: Dict[str, Any]) -> None:
+        """推送一条完整的事件（不计算增量），例如告警状态变化"""
+        if not self._subscribers:
+            return
+        self._event_id += 1
+        message = encode_event(event, data, self._event_id)
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._subscribers.discard(queue)
+                self._drop(queue)
+
+    def encode(self, event: str, data: Dict[str, Any]) -> bytes:
+        """编码只发送给单个订阅者的事件（例如订阅建立时的当前告警）"""
+        return encode_event(event, data, self._event_id)
+
+    def close(self) -> None:
+        """通知所有订阅者结束推送"""
+        for queue in list(self._subscribers):
+            self._drop(queue)
+        self._subscribers.clear()
+
+    @staticmethod
+    def _drop(queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
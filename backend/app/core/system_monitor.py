@@ -1,12 +1,82 @@
+import heapq
 import psutil
 import time
 import os
 import re
-from typing import Dict, Any, List
+import threading
+from typing import Dict, Any, List, Optional
+from app.core.config import (
+    NETWORK_INCLUDE, NETWORK_EXCLUDE, DISK_IO_INCLUDE, DISK_IO_EXCLUDE, DISK_IO_PARTITIONS,
+    STATVFS_INTERVAL, STATVFS_TIMEOUT, STATVFS_WORKERS,
+    PROCESS_SCAN_INTERVAL, PROCESS_SCAN_BUDGET, PROCESS_SCAN_ROTATION, PROCESS_HOT_SIZE,
+    CGROUP_ROOT, CGROUP_DEPTH, CGROUP_BUDGET, CGROUP_TREE_REFRESH,
+    HOST_PROC, HOST_SYS, HOST_PROC_MOUNTED
+)
+from app.core.cgroups import CgroupMonitor
+from app.core.cpu_sampler import CpuSampler
+from app.core.disk_io import DiskIOSampler, WholeDiskSet, parse_diskstats
+from app.core.filters import NameFilter
+from app.core.instrumentation import instrumentation
+from app.core.mounts import MountTable, MountStatCache, collapse_devices
+from app.core.net_sampler import NetworkSampler, NET_DEV_COLUMNS
+from app.core.pressure import PressureSampler, PSI_RESOURCES
+from app.core.processes import ProcessScanner
+from app.core.proc_reader import ProcFile, MemInfoReader, parse_net_dev
+from app.core.sensors import CPU_SENSORS, CpuFreqReader, SensorSampler
 
-# 检查是否在容器内运行
-HOST_PROC = '/host/proc' if os.path.exists('/host/proc') else '/proc'
-HOST_SYS = '/host/sys' if os.path.exists('/host/sys') else '/sys'
+# 宿主机CPU采样器，保存上一次的jiffies以计算区间使用率
+_host_cpu_sampler = CpuSampler(f"{HOST_PROC}/stat")
+
+# 宿主机/proc文件的常驻读取器，首次读取时打开，之后复用文件描述符和缓冲区
+_host_meminfo = MemInfoReader(
+    f"{HOST_PROC}/meminfo",
+    ("MemTotal", "MemFree", "Buffers", "Cached", "SwapTotal", "SwapFree")
+)
+_host_net_dev = ProcFile(f"{HOST_PROC}/net/dev")
+
+# 挂载表只在变化时重新解析；容量查询在有界线程池中执行并带超时，避免失联的挂载点阻塞采集
+_host_mount_table = MountTable(f"{HOST_PROC}/mounts")
+_host_statvfs = MountStatCache(os.statvfs, STATVFS_WORKERS, STATVFS_TIMEOUT, STATVFS_INTERVAL)
+_container_disk_usage = MountStatCache(psutil.disk_usage, STATVFS_WORKERS, STATVFS_TIMEOUT, STATVFS_INTERVAL)
+
+# 网络接口过滤规则（编译一次）以及宿主机/容器两种模式各自的速率状态
+_interface_filter = NameFilter(NETWORK_INCLUDE, NETWORK_EXCLUDE)
+_host_network_sampler = NetworkSampler()
+_container_network_sampler = NetworkSampler()
+
+# 磁盘I/O：设备过滤规则、整块磁盘集合以及两种模式各自的速率状态
+_disk_filter = NameFilter(DISK_IO_INCLUDE, DISK_IO_EXCLUDE)
+_whole_disks = WholeDiskSet(f"{HOST_SYS}/block")
+_host_diskstats = ProcFile(f"{HOST_PROC}/diskstats")
+_host_disk_io_sampler = DiskIOSampler()
+_container_disk_io_sampler = DiskIOSampler()
+
+
+# 进程表：增量扫描/proc/<pid>/stat，保存每个进程上一次的jiffies
+_process_scanner = ProcessScanner(
+    HOST_PROC, PROCESS_SCAN_BUDGET, PROCESS_HOT_SIZE, PROCESS_SCAN_INTERVAL, PROCESS_SCAN_ROTATION
+)
+
+# PSI、负载和vmstat计数
+_host_pressure_sampler = PressureSampler(HOST_PROC)
+
+# 各核心频率、温度传感器和热降频计数：/sys下的属性文件发现一次后保持打开
+_host_cpu_freq = CpuFreqReader(HOST_SYS)
+_host_sensors = SensorSampler(HOST_SYS)
+
+# cgroup：当前cgroup读取自身的/sys/fs/cgroup，子cgroup读取宿主机的cgroup层级（挂载/host/sys时）
+_cgroup_monitor = CgroupMonitor(
+    "/sys/fs/cgroup", "/proc/self/cgroup", f"{HOST_SYS}/fs/cgroup",
+    CGROUP_ROOT, CGROUP_DEPTH, CGROUP_BUDGET, CGROUP_TREE_REFRESH
+)
+
+
+def _accept_disk(name: str) -> bool:
+    """判断块设备是否参与I/O统计"""
+    return _disk_filter(name) and (DISK_IO_PARTITIONS or name in _whole_disks)
+
+# 磁盘统计时跳过的虚拟文件系统
+VIRTUAL_FSTYPES = frozenset(('proc', 'sysfs', 'devtmpfs', 'devpts', 'tmpfs', 'cgroup', 'cgroup2'))
 
 class SystemMonitor:
     """
@@ -14,15 +84,19 @@ class SystemMonitor:
     包括：CPU使用率、内存使用情况、磁盘使用状况和网络流量等
     """
     
+    # 容器模式下上一次的每核CPU时间采样，用于计算两次采样之间的使用率增量
+    _last_cpu_times: Optional[List[Any]] = None
+    _cpu_times_lock = threading.Lock()
+    
     @staticmethod
     def get_cpu_info() -> Dict[str, Any]:
         """获取CPU相关信息"""
         # 检查是否在容器中且有宿主机挂载
-        if os.path.exists('/host/proc'):
+        if HOST_PROC_MOUNTED:
             try:
                 return SystemMonitor._get_host_cpu_info()
             except Exception as e:
-                print(f"Error reading host CPU info: {e}")
+                instrumentation.record_error("cpu", f"Error reading host CPU info: {e}", fallback=True)
                 # 失败时回退到容器内监控
                 return SystemMonitor._get_container_cpu_info()
         else:
@@ -30,82 +104,100 @@ class SystemMonitor:
     
     @staticmethod
     def _get_host_cpu_info() -> Dict[str, Any]:
-        """从宿主机/proc目录获取CPU信息"""
-        # 读取CPU使用率
-        cpu_percent = []
+        """从宿主机/proc目录获取CPU信息（基于两次采样之间的增量）"""
+        cpu_stats = _host_cpu_sampler.sample()
         
-        # 读取/proc/stat获取CPU使用情况
-        with open(f"{HOST_PROC}/stat", "r") as f:
-            cpu_lines = [line for line in f if line.startswith('cpu')]
-        
-        # 第一行是总体CPU，后面的是每个核心
-        per_cpu_lines = cpu_lines[1:]
-        
-        # 计算每个核心的使用率
-        for line in per_cpu_lines:
-            values = line.split()[1:8]
-            values = [int(val) for val in values]
-            user, nice, system, idle, iowait, irq, softirq = values
-            
-            # 简单计算使用率 (非空闲时间/总时间)
-            non_idle = user + nice + system + irq + softirq
-            total = non_idle + idle + iowait
-            percent = (non_idle / total) * 100 if total > 0 else 0
-            cpu_percent.append(round(percent, 1))
-        
-        # 获取CPU频率
-        cpu_freq = {"current": 0, "min": 0, "max": 0}
+        # 获取各核心频率（没有cpufreq时为0）
+        cpu_freq = {"current": 0, "min": 0, "max": 0, "per_core": []}
         try:
-            # 尝试读取当前频率
-            freq_files = os.listdir(f"{HOST_SYS}/devices/system/cpu/cpu0/cpufreq/")
-            if "scaling_cur_freq" in freq_files:
-                with open(f"{HOST_SYS}/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq", "r") as f:
-                    cpu_freq["current"] = round(int(f.read().strip()) / 1000, 2)  # 转换为MHz
-            
-            if "scaling_min_freq" in freq_files:
-                with open(f"{HOST_SYS}/devices/system/cpu/cpu0/cpufreq/scaling_min_freq", "r") as f:
-                    cpu_freq["min"] = round(int(f.read().strip()) / 1000, 2)
-            
-            if "scaling_max_freq" in freq_files:
-                with open(f"{HOST_SYS}/devices/system/cpu/cpu0/cpufreq/scaling_max_freq", "r") as f:
-                    cpu_freq["max"] = round(int(f.read().strip()) / 1000, 2)
+            cpu_freq = _host_cpu_freq.read() or cpu_freq
         except Exception as e:
-            print(f"Error reading CPU frequency: {e}")
-        
-        # 获取CPU核心数
-        cpu_count = len(per_cpu_lines)
+            instrumentation.record_error("cpu", f"Error reading CPU frequency: {e}")
         
         return {
-            "cpu_per_core": cpu_percent,
+            "cpu_percent": cpu_stats["cpu_percent"],
+            "cpu_per_core": cpu_stats["cpu_per_core"],
+            "cpu_breakdown": cpu_stats["cpu_breakdown"],
+            "cpu_per_core_breakdown": cpu_stats["cpu_per_core_breakdown"],
             "cpu_freq_current": cpu_freq["current"],
             "cpu_freq_min": cpu_freq["min"],
             "cpu_freq_max": cpu_freq["max"],
-            "cpu_count": cpu_count
+            "cpu_freq_per_core": cpu_freq["per_core"],
+            "cpu_count": cpu_stats["cpu_count"]
         }
     
     @staticmethod
     def _get_container_cpu_info() -> Dict[str, Any]:
-        """获取容器内CPU信息（原方法）"""
-        cpu_percent = psutil.cpu_percent(interval=1, percpu=True)
+        """
+        获取容器内CPU信息
+
+        psutil.cpu_times读取的是宿主机的/proc/stat，总使用率改由当前cgroup的累计CPU时间计算，
+        相对于CPU配额（未设置时为可调度的核数）；没有cgroup时才使用各核心使用率的平均值。
+        各核心使用率仍来自psutil（cgroup v2不提供按核心的用量）。
+        """
+        cpu_per_core = SystemMonitor._cpu_percent_since_last()
         cpu_freq = psutil.cpu_freq()
         cpu_count = psutil.cpu_count()
-        
+
+        try:
+            schedulable = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else cpu_count
+            cpu_percent = _cgroup_monitor.cpu(schedulable or cpu_count or 1)
+        except Exception as e:
+            instrumentation.record_error("cpu", f"Error reading cgroup CPU usage: {e}")
+            cpu_percent = None
+        if cpu_percent is None:
+            cpu_percent = round(sum(cpu_per_core) / len(cpu_per_core), 1) if cpu_per_core else 0
+
         return {
-            "cpu_per_core": cpu_percent,
+            "cpu_percent": cpu_percent,
+            "cpu_per_core": cpu_per_core,
             "cpu_freq_current": round(cpu_freq.current, 2) if cpu_freq else 0,
             "cpu_freq_min": round(cpu_freq.min, 2) if cpu_freq and cpu_freq.min else 0,
             "cpu_freq_max": round(cpu_freq.max, 2) if cpu_freq and cpu_freq.max else 0,
+            "cpu_freq_per_core": [],
             "cpu_count": cpu_count
         }
 
+    @staticmethod
+    def _cpu_percent_since_last() -> List[float]:
+        """
+        非阻塞地计算每个核心的CPU使用率
+        
+        与上一次调用时保存的psutil.cpu_times采样做差，得到两次采样之间的使用率，
+        避免psutil.cpu_percent(interval=1)在请求或事件循环中阻塞1秒。
+        首次调用没有上一次采样，返回的是开机以来的平均值。
+        """
+        current = psutil.cpu_times(percpu=True)
+        with SystemMonitor._cpu_times_lock:
+            previous = SystemMonitor._last_cpu_times
+            SystemMonitor._last_cpu_times = current
+        
+        if previous is None or len(previous) != len(current):
+            previous = [None] * len(current)
+        
+        cpu_percent = []
+        for before, after in zip(previous, current):
+            # guest/guest_nice已包含在user/nice中，不能重复计算
+            fields = after._fields
+            deltas = {
+                name: getattr(after, name) - (getattr(before, name) if before else 0)
+                for name in fields
+            }
+            total = sum(deltas.values()) - deltas.get("guest", 0) - deltas.get("guest_nice", 0)
+            idle = deltas.get("idle", 0) + deltas.get("iowait", 0)
+            percent = ((total - idle) / total) * 100 if total > 0 else 0
+            cpu_percent.append(round(min(max(percent, 0.0), 100.0), 1))
+        
+        return cpu_percent
+
     @staticmethod
     def get_memory_info() -> Dict[str, Any]:
         """获取系统内存和交换空间使用情况"""
-        if os.path.exists('/host/proc'):
+        if HOST_PROC_MOUNTED:
             try:
                 return SystemMonitor._get_host_memory_info()
             except Exception as e:
-                print(f"Error reading host memory info: {e}")
+                instrumentation.record_error("memory", f"Error reading host memory info: {e}", fallback=True)
                 return SystemMonitor._get_container_memory_info()
         else:
             return SystemMonitor._get_container_memory_info()
@@ -113,30 +205,22 @@ class SystemMonitor:
     @staticmethod
     def _get_host_memory_info() -> Dict[str, Any]:
         """从宿主机/proc目录获取内存信息"""
-        # 读取/proc/meminfo获取内存信息
-        mem_info = {}
-        with open(f"{HOST_PROC}/meminfo", "r") as f:
-            for line in f:
-                if ":" in line:
-                    key, value = line.split(":", 1)
-                    value = value.strip()
-                    if value.endswith("kB"):
-                        value = int(value.split()[0]) * 1024  # 转换为字节
-                    mem_info[key.strip()] = value
+        # 读取/proc/meminfo中需要的字段（已转换为字节）
+        mem_info = _host_meminfo.read()
         
         # 计算内存使用情况
-        total = int(mem_info.get("MemTotal", 0))
-        free = int(mem_info.get("MemFree", 0))
-        buffers = int(mem_info.get("Buffers", 0))
-        cached = int(mem_info.get("Cached", 0))
+        total = mem_info["MemTotal"]
+        free = mem_info["MemFree"]
+        buffers = mem_info["Buffers"]
+        cached = mem_info["Cached"]
         
         available = free + buffers + cached
         used = total - available
         percent = (used / total) * 100 if total > 0 else 0
         
         # 计算交换空间使用情况
-        swap_total = int(mem_info.get("SwapTotal", 0))
-        swap_free = int(mem_info.get("SwapFree", 0))
+        swap_total = mem_info["SwapTotal"]
+        swap_free = mem_info["SwapFree"]
         swap_used = swap_total - swap_free
         swap_percent = (swap_used / swap_total) * 100 if swap_total > 0 else 0
         
@@ -153,10 +237,33 @@ class SystemMonitor:
     
     @staticmethod
     def _get_container_memory_info() -> Dict[str, Any]:
-        """获取容器内存信息（原方法）"""
+        """
+        获取容器内存信息
+        
+        psutil读取的是宿主机的/proc/meminfo；容器设置了内存限制时改用cgroup的限制作为总量，
+        已用内存取cgroup工作集（与OOM判断一致）。
+        """
         memory = psutil.virtual_memory()
         swap = psutil.swap_memory()
 
+        try:
+            cgroup_memory = _cgroup_monitor.memory()
+        except Exception as e:
+            instrumentation.record_error("memory", f"Error reading cgroup memory: {e}")
+            cgroup_memory = None
+        if cgroup_memory is not None and cgroup_memory[1] < memory.total:
+            used, total = cgroup_memory
+            return {
+                "memory_total": total,
+                "memory_available": max(total - used, 0),
+                "memory_used": used,
+                "memory_percent": round(used / total * 100, 1),
+                "swap_total": swap.total,
+                "swap_used": swap.used,
+                "swap_free": swap.free,
+                "swap_percent": swap.percent
+            }
+
         return {
             "memory_total": memory.total,
             "memory_available": memory.available,
@@ -171,11 +278,11 @@ class SystemMonitor:
     @staticmethod
     def get_disk_info() -> Dict[str, List[Dict[str, Any]]]:
         """获取系统所有磁盘分区的使用情况"""
-        if os.path.exists('/host/proc'):
+        if HOST_PROC_MOUNTED:
             try:
                 return SystemMonitor._get_host_disk_info()
             except Exception as e:
-                print(f"Error reading host disk info: {e}")
+                instrumentation.record_error("disk", f"Error reading host disk info: {e}", fallback=True)
                 return SystemMonitor._get_container_disk_info()
         else:
             return SystemMonitor._get_container_disk_info()
@@ -185,119 +292,229 @@ class SystemMonitor:
         """从宿主机获取磁盘信息"""
         disks = []
         
-        # 读取/proc/mounts获取挂载点信息
-        with open(f"{HOST_PROC}/mounts", "r") as f:
-            for line in f:
-                parts = line.split()
-                if len(parts) >= 6:
-                    device, mountpoint, fstype = parts[0], parts[1], parts[2]
-                    
-                    # 跳过虚拟文件系统
-                    if fstype in ('proc', 'sysfs', 'devtmpfs', 'devpts', 'tmpfs', 'cgroup', 'cgroup2'):
-                        continue
-                    
-                    # 获取磁盘使用情况
-                    try:
-                        # 尝试使用os.statvfs获取磁盘使用情况
-                        # 注意：这可能不会获取宿主机的真实信息，因为我们无法直接访问宿主机的文件系统
-                        # 这是一个限制，可能需要更复杂的解决方案
-                        stat = os.statvfs(mountpoint)
-                        total = stat.f_blocks * stat.f_frsize
-                        free = stat.f_bfree * stat.f_frsize
-                        used = total - free
-                        percent = (used / total) * 100 if total > 0 else 0
-                        
-                        disks.append({
-                            "device": device,
-                            "mountpoint": mountpoint,
-                            "fstype": fstype,
-                            "total": total,
-                            "used": used,
-                            "free": free,
-                            "percent": round(percent, 1)
-                        })
-                    except Exception as e:
-                        print(f"Error getting disk stats for {mountpoint}: {e}")
+        # 读取挂载点信息（缓存的挂载表），跳过虚拟文件系统并合并同一设备的多个挂载
+        mounts = collapse_devices(
+            mount for mount in _host_mount_table.get() if mount[2] not in VIRTUAL_FSTYPES
+        )
+        
+        # 获取磁盘使用情况
+        # 注意：os.statvfs可能不会获取宿主机的真实信息，因为我们无法直接访问宿主机的文件系统
+        # 这是一个限制，可能需要更复杂的解决方案
+        stats = _host_statvfs.query(mountpoint for _, mountpoint, _ in mounts)
+        for device, mountpoint, fstype in mounts:
+            if mountpoint not in stats:
+                continue
+            stat, stale = stats[mountpoint]
+            total = stat.f_blocks * stat.f_frsize if stat else 0
+            free = stat.f_bfree * stat.f_frsize if stat else 0
+            used = total - free
+            percent = (used / total) * 100 if total > 0 else 0
+            
+            disks.append({
+                "device": device,
+                "mountpoint": mountpoint,
+                "fstype": fstype,
+                "total": total,
+                "used": used,
+                "free": free,
+                "percent": round(percent, 1),
+                "stale": stale
+            })
+        
+        # 读取一次/proc/diskstats获取所有设备的I/O计数
+        io = _host_disk_io_sampler.update(parse_diskstats(_host_diskstats, _accept_disk))
         
-        return {"disks": disks}
+        return {"disks": disks, "io": io}
     
     @staticmethod
     def _get_container_disk_info() -> Dict[str, List[Dict[str, Any]]]:
         """获取容器内磁盘信息（原方法）"""
         disks_info = []
-        for partition in psutil.disk_partitions(all=False):
-            if partition.fstype:
-                usage = psutil.disk_usage(partition.mountpoint)
-                disks_info.append({
-                    "device": partition.device,
-                    "mountpoint": partition.mountpoint,
-                    "fstype": partition.fstype,
-                    "total": usage.total,
-                    "used": usage.used,
-                    "free": usage.free,
-                    "percent": usage.percent
-                })
+        partitions = collapse_devices(
+            (partition.device, partition.mountpoint, partition.fstype)
+            for partition in psutil.disk_partitions(all=False)
+            if partition.fstype
+        )
+        usages = _container_disk_usage.query(mountpoint for _, mountpoint, _ in partitions)
+        for device, mountpoint, fstype in partitions:
+            if mountpoint not in usages:
+                continue
+            usage, stale = usages[mountpoint]
+            disks_info.append({
+                "device": device,
+                "mountpoint": mountpoint,
+                "fstype": fstype,
+                "total": usage.total if usage else 0,
+                "used": usage.used if usage else 0,
+                "free": usage.free if usage else 0,
+                "percent": usage.percent if usage else 0,
+                "stale": stale
+            })
         
-        return {"disks": disks_info}
+        counters = psutil.disk_io_counters(perdisk=True) or {}
+        io = _container_disk_io_sampler.update(
+            (name, (c.read_count, c.read_bytes, c.read_time, c.write_count, c.write_bytes, c.write_time,
+                    getattr(c, "busy_time", 0), 0))
+            for name, c in counters.items()
+            if _accept_disk(name)
+        )
+        
+        return {"disks": disks_info, "io": io}
 
     @staticmethod
     def get_network_info() -> Dict[str, Any]:
         """获取网络接口的数据传输统计信息"""
-        if os.path.exists('/host/proc'):
+        if HOST_PROC_MOUNTED:
             try:
                 return SystemMonitor._get_host_network_info()
             except Exception as e:
-                print(f"Error reading host network info: {e}")
+                instrumentation.record_error("network", f"Error reading host network info: {e}", fallback=True)
                 return SystemMonitor._get_container_network_info()
         else:
             return SystemMonitor._get_container_network_info()
     
     @staticmethod
     def _get_host_network_info() -> Dict[str, Any]:
-        """从宿主机获取网络信息"""
-        # 读取/proc/net/dev获取网络接口统计信息
-        bytes_sent = 0
-        bytes_recv = 0
-        packets_sent = 0
-        packets_recv = 0
-        
-        with open(f"{HOST_PROC}/net/dev", "r") as f:
-            lines = f.readlines()
-            
-        # 跳过前两行（标题行）
-        for line in lines[2:]:
-            parts = line.split(":")
-            if len(parts) >= 2:
-                interface = parts[0].strip()
-                
-                # 跳过loopback和容器接口
-                if interface == "lo" or interface.startswith("docker") or interface.startswith("veth"):
-                    continue
-                
-                values = parts[1].strip().split()
-                if len(values) >= 10:
-                    # 接收字节数在第1列，发送字节数在第9列
-                    bytes_recv += int(values[0])
-                    packets_recv += int(values[1])
-                    bytes_sent += int(values[8])
-                    packets_sent += int(values[9])
-        
-        return {
-            "bytes_sent": bytes_sent,
-            "bytes_recv": bytes_recv,
-            "packets_sent": packets_sent,
-            "packets_recv": packets_recv
-        }
+        """从宿主机/proc/net/dev获取每个网络接口的统计信息"""
+        # 一次扫描完成过滤和解析，被排除的接口（如大量veth）不做数值转换
+        interfaces = [
+            (interface, tuple(values[column] for column in NET_DEV_COLUMNS))
+            for interface, values in parse_net_dev(_host_net_dev, _interface_filter)
+            if len(values) >= 16
+        ]
+        return _host_network_sampler.update(interfaces)
     
     @staticmethod
     def _get_container_network_info() -> Dict[str, Any]:
         """获取容器内网络信息（原方法）"""
-        net_io = psutil.net_io_counters()
+        interfaces = [
+            (interface, (counters.bytes_recv, counters.packets_recv, counters.errin, counters.dropin,
+                         counters.bytes_sent, counters.packets_sent, counters.errout, counters.dropout))
+            for interface, counters in psutil.net_io_counters(pernic=True).items()
+            if _interface_filter(interface)
+        ]
+        return _container_network_sampler.update(interfaces)
+
+    @staticmethod
+    def get_pressure_info() -> Dict[str, Any]:
+        """获取PSI（CPU/内存/IO停顿）、系统负载以及缺页、换页和OOM计数"""
+        try:
+            return _host_pressure_sampler.sample()
+        except Exception as e:
+            instrumentation.record_error("pressure", f"Error reading pressure info: {e}", fallback=True)
+            return SystemMonitor._get_container_pressure_info()
+
+    @staticmethod
+    def _get_container_pressure_info() -> Dict[str, Any]:
+        """无法读取/proc时只返回psutil提供的系统负载"""
+        load1, load5, load15 = psutil.getloadavg()
+        result: Dict[str, Any] = {resource: None for resource in PSI_RESOURCES}
+        result.update({
+            "load1": round(load1, 2),
+            "load5": round(load5, 2),
+            "load15": round(load15, 2),
+            "procs_running": 0,
+            "procs_total": 0,
+            "pgmajfault_rate": 0.0,
+            "pswpin_rate": 0.0,
+            "pswpout_rate": 0.0,
+            "oom_kill": 0,
+            "oom_kill_delta": 0
+        })
+        return result
+
+    @staticmethod
+    def get_sensors_info() -> Dict[str, Any]:
+        """获取温度传感器（hwmon、thermal zone）和CPU热降频计数"""
+        try:
+            return _host_sensors.sample()
+        except Exception as e:
+            instrumentation.record_error("sensors", f"Error reading sensors: {e}", fallback=True)
+            return SystemMonitor._get_container_sensors_info()
+
+    @staticmethod
+    def _get_container_sensors_info() -> Dict[str, Any]:
+        """无法读取/sys时通过psutil获取温度（不包含thermal zone和降频计数）"""
+        temperatures = []
+        for sensor, entries in getattr(psutil, "sensors_temperatures", dict)().items():
+            for index, entry in enumerate(entries):
+                temperatures.append({
+                    "sensor": sensor,
+                    "label": entry.label or f"temp{index + 1}",
+                    "current": entry.current,
+                    "high": entry.high,
+                    "critical": entry.critical
+                })
+        values = [item["current"] for item in temperatures if item["current"] is not None]
+        cpu_values = [item["current"] for item in temperatures
+                      if item["sensor"] in CPU_SENSORS and item["current"] is not None]
+        return {
+            "temperatures": temperatures,
+            "thermal_zones": [],
+            "cpu_temperature": max(cpu_values) if cpu_values else None,
+            "max_temperature": max(values) if values else None,
+            "throttle": None
+        }
+
+    @staticmethod
+    def get_cgroup_info() -> Dict[str, Any]:
+        """获取当前cgroup以及配置的根cgroup下各子cgroup（容器）的资源使用和限流情况"""
+        try:
+            return _cgroup_monitor.sample()
+        except Exception as e:
+            instrumentation.record_error("cgroup", f"Error reading cgroup info: {e}")
+            return {"version": 0, "current": None, "root": CGROUP_ROOT, "children": []}
+
+    @staticmethod
+    def get_process_info(sort: str = "cpu", limit: int = 20) -> Dict[str, Any]:
+        """获取按CPU或内存占用排序的前limit个进程"""
+        try:
+            return SystemMonitor._get_host_process_info(sort, limit)
+        except Exception as e:
+            instrumentation.record_error("processes", f"Error reading process info: {e}", fallback=True)
+            return SystemMonitor._get_container_process_info(sort, limit)
+
+    @staticmethod
+    def _get_host_process_info(sort: str, limit: int) -> Dict[str, Any]:
+        """增量扫描/proc（挂载宿主机时为/host/proc）下的进程，CPU使用率基于两次读取之间的增量"""
+        _process_scanner.scan()
+        memory_total = _host_meminfo.read()["MemTotal"]
+        processes = _process_scanner.top(sort, limit)
+        return {
+            "total": len(_process_scanner),
+            "sort": sort,
+            "max_age": round(_process_scanner.max_age(), 1),
+            "processes": [
+                {**process, "memory_percent": round(process["memory_rss"] / memory_total * 100, 1) if memory_total else 0}
+                for process in processes
+            ]
+        }
+
+    @staticmethod
+    def _get_container_process_info(sort: str, limit: int) -> Dict[str, Any]:
+        """通过psutil获取进程信息（/proc扫描失败时使用）"""
+        processes = []
+        for process in psutil.process_iter(["pid", "name", "status", "memory_info", "memory_percent", "num_threads"]):
+            info = process.info
+            try:
+                cpu_percent = process.cpu_percent(None)
+            except psutil.Error:
+                continue
+            processes.append({
+                "pid": info["pid"],
+                "name": info["name"] or "",
+                "state": info["status"] or "",
+                "cpu_percent": round(cpu_percent, 1),
+                "memory_rss": info["memory_info"].rss if info["memory_info"] else 0,
+                "num_threads": info["num_threads"] or 0,
+                "memory_percent": round(info["memory_percent"] or 0, 1),
+            })
+        key = "memory_rss" if sort == "memory" else "cpu_percent"
         return {
-            "bytes_sent": net_io.bytes_sent,
-            "bytes_recv": net_io.bytes_recv,
-            "packets_sent": net_io.packets_sent,
-            "packets_recv": net_io.packets_recv
+            "total": len(processes),
+            "sort": sort,
+            "max_age": 0.0,
+            "processes": heapq.nlargest(limit, processes, key=lambda process: process[key])
         }
 
     @staticmethod
@@ -312,11 +529,17 @@ class SystemMonitor:
                 - memory: 内存和交换空间使用情况
                 - disk: 各分区的存储使用情况
                 - network: 网络接口的数据传输统计
+                - cgroup: 当前cgroup及各子cgroup的资源使用
+                - pressure: PSI、系统负载和vmstat计数
+                - sensors: 温度传感器和CPU热降频计数
         """
         return {
             "timestamp": time.time(),
             "cpu": SystemMonitor.get_cpu_info(),
             "memory": SystemMonitor.get_memory_info(),
             "disk": SystemMonitor.get_disk_info(),
-            "network": SystemMonitor.get_network_info()
+            "network": SystemMonitor.get_network_info(),
+            "cgroup": SystemMonitor.get_cgroup_info(),
+            "pressure": SystemMonitor.get_pressure_info(),
+            "sensors": SystemMonitor.get_sensors_info()
         }
\ No newline at end of file
@@ -0,0 +1,217 @@
+import json
+import struct
+import zlib
+from array import array
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+# agent与aggregator之间的二进制协议
+#
+# 连接上传输的是一系列帧：4字节大端长度 + 负载。负载以MAGIC、版本号和帧类型开头：
+#   FRAME_HELLO: agent主机名（每个连接的第一帧）
+#   FRAME_BATCH: 一批记录，每条记录以1字节记录类型开头：
+#       RECORD_DEFINE:   指标编号(varint) + 指标名
+#       RECORD_POINTS:   时间戳(f64) + 数量(varint) + 指标编号(varint × 数量) + 数值(f32 × 数量，连续存放)
+#       RECORD_SNAPSHOT: 子系统名 + 时间戳(f64) + zlib压缩的JSON（只包含与上一次发送相比变化的字段）
+# 指标名到编号的映射和快照增量的基准都按连接维护，重连后从头开始，因此不需要额外的确认机制。
+
+MAGIC = b"SM"
+VERSION = 1
+
+FRAME_HELLO = 1
+FRAME_BATCH = 2
+
+RECORD_DEFINE = 1
+RECORD_POINTS = 2
+RECORD_SNAPSHOT = 3
+
+# 单帧负载的上限，超过时认为连接数据损坏
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+_HEADER = struct.Struct(">2sBB")
+_LENGTH = struct.Struct(">I")
+_DOUBLE = struct.Struct("<d")
+
+
+class WireError(ValueError):
+    """帧格式错误"""
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, offset
+        shift += 7
+
+
+def _write_string(out: bytearray, value: str) -> None:
+    encoded = value.encode()
+    _write_varint(out, len(encoded))
+    out += encoded
+
+
+def _read_string(data: bytes, offset: int) -> Tuple[str, int]:
+    length, offset = _read_varint(data, offset)
+    return data[offset:offset + length].decode(), offset + length
+
+
+def frame(frame_type: int, body: bytes) -> bytes:
+    """把负载封装为带长度前缀的帧"""
+    return _LENGTH.pack(_HEADER.size + len(body)) + _HEADER.pack(MAGIC, VERSION, frame_type) + body
+
+
+def encode_hello(host: str) -> bytes:
+    body = bytearray()
+    _write_string(body, host)
+    return frame(FRAME_HELLO, bytes(body))
+
+
+class BatchEncoder:
+    """
+    agent端的批量编码器（每个连接一个实例）
+
+    指标名只在第一次出现时发送一次，之后只发送编号；同一次采样的数值以float32连续存放。
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._sent_snapshots: Dict[str, Dict[str, Any]] = {}
+        self._body = bytearray()
+        self.records = 0
+
+    def add_points(self, timestamp: float, points: Dict[str, float]) -> None:
+        ids: List[int] = []
+        values = array("f")
+        for name, value in points.items():
+            if value is None:
+                continue
+            metric_id = self._ids.get(name)
+            if metric_id is None:
+                metric_id = self._ids[name] = len(self._ids)
+                self._body.append(RECORD_DEFINE)
+                _write_varint(self._body, metric_id)
+                _write_string(self._body, name)
+            ids.append(metric_id)
+            values.append(value)
+        if not ids:
+            return
+        body = self._body
+        body.append(RECORD_POINTS)
+        body += _DOUBLE.pack(timestamp)
+        _write_varint(body, len(ids))
+        for metric_id in ids:
+            _write_varint(body, metric_id)
+        body += values.tobytes()
+        self.records += 1
+
+    def add_snapshot(self, section: str, timestamp: float, data: Dict[str, Any]) -> None:
+        previous = self._sent_snapshots.get(section)
+        self._sent_snapshots[section] = data
+        if previous is None:
+            changed = data
+        else:
+            changed = {key: value for key, value in data.items() if previous.get(key) != value}
+            if not changed:
+                return
+        payload = zlib.compress(json.dumps(changed, separators=(",", ":")).encode(), 1)
+        body = self._body
+        body.append(RECORD_SNAPSHOT)
+        _write_string(body, section)
+        body += _DOUBLE.pack(timestamp)
+        _write_varint(body, len(payload))
+        body += payload
+        self.records += 1
+
+    def flush(self) -> Optional[bytes]:
+        """取出当前批次的帧，没有数据时返回None"""
+        if not self._body:
+            return None
+        data = frame(FRAME_BATCH, bytes(self._body))
+        self._body.clear()
+        self.records = 0
+        return data
+
+
+def parse_header(payload: bytes) -> int:
+    """校验帧头并返回帧类型"""
+    if len(payload) < _HEADER.size:
+        raise WireError("frame too short")
+    magic, version, frame_type = _HEADER.unpack_from(payload)
+    if magic != MAGIC or version != VERSION:
+        raise WireError(f"unsupported frame: magic={magic!r} version={version}")
+    return frame_type
+
+
+def decode_hello(payload: bytes) -> str:
+    host, _ = _read_string(payload, _HEADER.size)
+    return host
+
+
+class BatchDecoder:
+    """
+    aggregator端的批量解码器（每个连接一个实例，保存该连接上定义过的指标名）
+
+    on_points(timestamp, {name: value})和on_snapshot(section, timestamp, changed)在解码时依次回调。
+    """
+
+    def __init__(self, on_points: Callable[[float, Dict[str, float]], None],
+                 on_snapshot: Callable[[str, float, Dict[str, Any]], None]):
+        self._names: List[str] = []
+        self._on_points = on_points
+        self._on_snapshot = on_snapshot
+
+    def decode(self, payload: bytes) -> int:
+        """解码一个FRAME_BATCH负载，返回其中的数据点数量"""
+        data = memoryview(payload)
+        offset = _HEADER.size
+        end = len(payload)
+        samples = 0
+        try:
+            while offset < end:
+                record = payload[offset]
+                offset += 1
+                if record == RECORD_DEFINE:
+                    metric_id, offset = _read_varint(payload, offset)
+                    name, offset = _read_string(payload, offset)
+                    if metric_id != len(self._names):
+                        raise WireError(f"unexpected metric id {metric_id}")
+                    self._names.append(name)
+                elif record == RECORD_POINTS:
+                    (timestamp,) = _DOUBLE.unpack_from(payload, offset)
+                    count, offset = _read_varint(payload, offset + _DOUBLE.size)
+                    ids = []
+                    for _ in range(count):
+                        metric_id, offset = _read_varint(payload, offset)
+                        ids.append(metric_id)
+                    values = array("f")
+                    values.frombytes(data[offset:offset + count * values.itemsize])
+                    offset += count * values.itemsize
+                    names = self._names
+                    self._on_points(timestamp, {names[metric_id]: value for metric_id, value in zip(ids, values)})
+                    samples += count
+                elif record == RECORD_SNAPSHOT:
+                    section, offset = _read_string(payload, offset)
+                    (timestamp,) = _DOUBLE.unpack_from(payload, offset)
+                    length, offset = _read_varint(payload, offset + _DOUBLE.size)
+                    changed = json.loads(zlib.decompress(data[offset:offset + length]))
+                    offset += length
+                    self._on_snapshot(section, timestamp, changed)
+                else:
+                    raise WireError(f"unknown record type {record}")
+        except WireError:
+            raise
+        except (IndexError, struct.error, zlib.error, ValueError) as e:
+            # ValueError包含UnicodeDecodeError和快照JSON的解析错误
+            raise WireError(f"malformed batch: {e}") from e
+        return samples
@@ -5,13 +5,16 @@ class SystemInfo(BaseModel):
     """
     系统信息数据模型
     
-    用于序列化和验证系统监控数据的Pydantic模型，对应SystemMonitor.get_all_info()的返回格式
+    描述/api/system/info响应格式的Pydantic模型，对应SystemMonitor.get_all_info()的返回格式。
+    接口直接编码快照（见app.core.serialization），本模型只用于生成接口文档，不做逐请求校验
     
     Attributes:
         timestamp (float): 数据采集时间戳
         cpu (Dict[str, Any]): CPU相关信息，包含:
             - cpu_percent: CPU总体使用率
             - cpu_per_core: 每个核心的使用率
+            - cpu_breakdown: 按user/system/iowait/irq/steal/guest拆分的使用率（仅宿主机模式）
+            - cpu_per_core_breakdown: 各类别的每核使用率（仅宿主机模式）
             - cpu_freq_current: 当前频率
             - cpu_freq_min: 最小频率
             - cpu_freq_max: 最大频率
@@ -30,15 +33,41 @@ class SystemInfo(BaseModel):
         disk (Dict[str, Any]): 磁盘使用信息，包含:
             - disks: 磁盘分区列表，每个分区包含设备名、挂载点、
                     文件系统类型、容量和使用率等信息
+            - io: 块设备I/O列表，包含吞吐、IOPS、平均等待时间和繁忙度
         
         network (Dict[str, Any]): 网络传输统计信息，包含:
             - bytes_sent: 发送字节数
             - bytes_recv: 接收字节数
             - packets_sent: 发送包数
             - packets_recv: 接收包数
+            - bytes_sent_rate/bytes_recv_rate/packets_sent_rate/packets_recv_rate: 服务端计算的速率
+            - interfaces: 每个接口的计数、错误/丢包数和速率
+        
+        cgroup (Dict[str, Any]): cgroup资源使用，包含:
+            - version: cgroup版本（1或2，读取失败时为0）
+            - current: 当前进程所在cgroup的CPU、限流、内存、I/O和CPU压力
+            - root: 统计子cgroup的根路径（MONITOR_CGROUP_ROOT）
+            - children: 各子cgroup（容器）的资源使用
+        
+        pressure (Dict[str, Any]): 饱和度指标，包含:
+            - cpu/memory/io: PSI的some/full平均值（avg10/avg60/avg300）和采样区间内的停顿占比
+            - load1/load5/load15: 系统负载
+            - pgmajfault_rate/pswpin_rate/pswpout_rate: 主缺页和换入/换出速率
+            - oom_kill: 累计OOM kill次数
+        
+        sensors (Dict[str, Any]): 硬件传感器，包含:
+            - temperatures/thermal_zones: hwmon温度传感器和thermal zone的当前温度（摄氏度）
+            - cpu_temperature/max_temperature: CPU温度和所有传感器中的最高温度
+            - throttle: CPU热降频的累计次数和每秒次数，不支持时为None
+        
+        snapshot_age (float): 后台采集快照的年龄（秒），取各子系统中最旧的一个
     """
     timestamp: float
     cpu: Dict[str, Any]
     memory: Dict[str, Any]
     disk: Dict[str, Any]
-    network: Dict[str, Any]
\ No newline at end of file
+    network: Dict[str, Any]
+    cgroup: Dict[str, Any] = {}
+    pressure: Dict[str, Any] = {}
+    sensors: Dict[str, Any] = {}
+    snapshot_age: float = 0.0
\ No newline at end of file
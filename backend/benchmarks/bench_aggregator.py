@@ -0,0 +1,115 @@
+"""
+aggregator接收吞吐基准测试
+
+在本进程中启动aggregator的接收端（HostRegistry），再启动若干个agent进程，每个进程模拟
+多台主机（每台主机一个连接），按批次间隔推送合成的采样。测量aggregator实际写入的数据点数量，
+并检查每台主机都出现在主机列表中且历史可以查询。
+
+用法（在backend目录下执行）:
+    python -m benchmarks.bench_aggregator --processes 4 --hosts 50 --metrics 200 --duration 10
+
+也可以启动真实的agent（见README中的多主机模式），本脚本只用于测量接收端的上限。
+"""
+import argparse
+import asyncio
+import multiprocessing
+import random
+import time
+
+from app.core.aggregator import HostRegistry
+from app.core.wire import BatchEncoder, encode_hello
+
+
+async def _simulate_host(address, name: str, metrics: int, interval: float, samples_per_batch: int,
+                         deadline: float) -> None:
+    _, writer = await asyncio.open_connection(*address)
+    writer.write(encode_hello(name))
+    encoder = BatchEncoder()
+    names = [f"bench.metric.{index}" for index in range(metrics)]
+    snapshot = {"cpu_percent": 0.0, "cpu_count": 8}
+    # 各主机错开发送时间
+    await asyncio.sleep(random.uniform(0, interval))
+    while time.time() < deadline:
+        now = time.time()
+        for offset in range(samples_per_batch):
+            encoder.add_points(now - offset * 0.1, {metric: random.random() * 100 for metric in names})
+        snapshot = {**snapshot, "cpu_percent": round(random.random() * 100, 1)}
+        encoder.add_snapshot("cpu", now, snapshot)
+        writer.write(encoder.flush())
+        await writer.drain()
+        await asyncio.sleep(interval)
+    writer.close()
+
+
+def _agent_process(address, index: int, hosts: int, metrics: int, interval: float, samples_per_batch: int,
+                   deadline: float) -> None:
+    async def run():
+        await asyncio.gather(*(
+            _simulate_host(address, f"bench-{index}-{host}", metrics, interval, samples_per_batch, deadline)
+            for host in range(hosts)
+        ))
+    asyncio.run(run())
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=4, help="agent进程数")
+    parser.add_argument("--hosts", type=int, default=50, help="每个进程模拟的主机数")
+    parser.add_argument("--metrics", type=int, default=200, help="每台主机每次采样的指标数")
+    parser.add_argument("--interval", type=float, default=1.0, help="批次间隔（秒）")
+    parser.add_argument("--batch", type=int, default=5, help="每个批次包含的采样次数")
+    parser.add_argument("--duration", type=float, default=10.0, help="测量时长（秒）")
+    parser.add_argument("--port", type=int, default=19100)
+    args = parser.parse_args()
+
+    registry = HostRegistry(max_hosts=args.processes * args.hosts)
+    await registry.start(f"127.0.0.1:{args.port}")
+    address = ("127.0.0.1", args.port)
+    deadline = time.time() + args.duration + 1.0
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_agent_process, args=(address, index, args.hosts, args.metrics, args.interval,
+                                                      args.batch, deadline))
+        for index in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    # 等待连接建立后开始计时
+    await asyncio.sleep(1.0)
+    start_samples, start_frames, start_bytes = registry.samples, registry.frames, registry.bytes
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    # 测量事件循环延迟：接收端忙时定时器会滞后
+    lags = []
+    loop = asyncio.get_running_loop()
+    while time.time() < deadline:
+        expected = loop.time() + 0.05
+        await asyncio.sleep(0.05)
+        lags.append(loop.time() - expected)
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+
+    for process in processes:
+        await asyncio.to_thread(process.join)
+    await registry.stop()
+
+    samples = registry.samples - start_samples
+    frames = registry.frames - start_frames
+    received = registry.bytes - start_bytes
+    hosts = registry.hosts()
+    lags.sort()
+    print(f"hosts: {len(hosts)} (expected {args.processes * args.hosts}), errors: {registry.errors}")
+    print(f"ingested {samples / elapsed:,.0f} samples/s, {frames / elapsed:,.0f} frames/s, "
+          f"{received / elapsed / 1024:,.1f} KiB/s ({received / max(samples, 1):.2f} bytes/sample)")
+    print(f"aggregator cpu: {cpu / elapsed * 100:.1f}%, "
+          f"loop lag p50 {lags[len(lags) // 2] * 1000:.2f}ms, p99 {lags[int(len(lags) * 0.99)] * 1000:.2f}ms")
+    host = registry.get(hosts[0]["name"])
+    series = host.history.query("bench.metric.0", time.time() - 60)
+    print(f"history of {hosts[0]['name']}: {sum(value is not None for value in series['values'])} points, "
+          f"{host.history.nbytes() / 1024:.0f} KiB per host")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
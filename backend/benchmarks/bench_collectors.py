@@ -0,0 +1,222 @@
+"""
+采集器与HTTP接口基准测试（可作为回归检查）
+
+在临时目录中生成指定规模的合成/proc和/sys（见benchmarks/fixtures.py），把
+MONITOR_HOST_PROC/MONITOR_HOST_SYS指向它们后再导入app，然后测量：
+    - 每个SystemMonitor采集函数（cpu、memory、disk、network、pressure、sensors、cgroup、processes）
+    - 各HTTP接口（经ASGI在进程内调用，不经过网络），快照由合成数据采集
+每一项报告吞吐（次/秒）、延迟分位数，以及用tracemalloc统计的单次调用分配峰值和
+调用前后的内存净增长。每次调用之间都会推进合成计数（不计入耗时）。
+
+进程扫描和statvfs的最短间隔设为0，每次调用都完整执行（即最坏情况），
+cgroup读取的是本机的/sys/fs/cgroup。
+
+--save把结果写入JSON作为基线；--baseline与基线比较，p50耗时或分配峰值超过基线的
+(1 + threshold)倍时报告回归并以退出码1结束，可以直接用在CI中：
+
+用法（在backend目录下执行）:
+    python -m benchmarks.bench_collectors --cores 128 --interfaces 50 --mounts 50 --processes 5000 --save baseline.json
+    python -m benchmarks.bench_collectors --cores 128 --interfaces 50 --mounts 50 --processes 5000 --baseline baseline.json
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from benchmarks.fixtures import SyntheticHost
+
+# 测量的HTTP接口
+ENDPOINTS = (
+    "/api/system/info", "/api/system/cpu", "/api/system/memory", "/api/system/disk", "/api/system/network",
+    "/api/system/pressure", "/api/system/sensors", "/api/system/cgroups", "/api/system/processes",
+    "/api/system/history?metric=cpu.percent&since=-600", "/api/system/self", "/metrics",
+)
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def summarize(latencies: List[float], peaks: List[int], growth: int) -> Dict[str, float]:
+    return {
+        "throughput": len(latencies) / sum(latencies),
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "alloc_peak_kib": max(peaks) / 1024,
+        "alloc_growth_bytes": growth / len(peaks),
+    }
+
+
+def measure(call: Callable[[], Any], advance: Callable[[], None], number: int, alloc_number: int) -> Dict[str, float]:
+    """先测耗时（不开启tracemalloc），再单独测分配"""
+    advance()
+    call()  # 预热：打开文件描述符、建立差值基线
+    latencies = []
+    for _ in range(number):
+        advance()
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    peaks = []
+    start_size = tracemalloc.get_traced_memory()[0]
+    for _ in range(alloc_number):
+        advance()
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        call()
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    gc.collect()
+    growth = tracemalloc.get_traced_memory()[0] - start_size
+    tracemalloc.stop()
+    return summarize(latencies, peaks, growth)
+
+
+def measure_endpoints(host: SyntheticHost, number: int, alloc_number: int) -> Dict[str, Dict[str, float]]:
+    import httpx
+    from app.core.collector import collector
+    from main import app
+
+    results: Dict[str, Dict[str, float]] = {}
+
+    async def run() -> None:
+        # 不启动后台采集任务，避免采集线程干扰测量；先按需采集几轮，使历史中有数据
+        for _ in range(5):
+            host.advance()
+            for name in collector.intervals:
+                await collector.refresh(name)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for path in ENDPOINTS:
+                async def request() -> None:
+                    response = await client.get(path, headers={"Accept-Encoding": "identity"})
+                    response.raise_for_status()
+
+                await request()
+                latencies = []
+                for _ in range(number):
+                    started = time.perf_counter()
+                    await request()
+                    latencies.append(time.perf_counter() - started)
+                gc.collect()
+                tracemalloc.start()
+                peaks = []
+                start_size = tracemalloc.get_traced_memory()[0]
+                for _ in range(alloc_number):
+                    before = tracemalloc.get_traced_memory()[0]
+                    tracemalloc.reset_peak()
+                    await request()
+                    peaks.append(tracemalloc.get_traced_memory()[1] - before)
+                gc.collect()
+                growth = tracemalloc.get_traced_memory()[0] - start_size
+                tracemalloc.stop()
+                results[f"GET {path.split('?')[0]}"] = summarize(latencies, peaks, growth)
+
+    asyncio.run(run())
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float, min_delta_ms: float) -> List[str]:
+    """返回超过阈值的回归描述"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        limit = previous["p50_ms"] * (1 + threshold)
+        # 微秒级的用例受噪声影响大，差值低于min_delta_ms时不算回归
+        if current["p50_ms"] > limit and current["p50_ms"] - previous["p50_ms"] > min_delta_ms:
+            regressions.append(f"{name}: p50 {previous['p50_ms']:.3f}ms -> {current['p50_ms']:.3f}ms")
+        limit = previous["alloc_peak_kib"] * (1 + threshold)
+        if current["alloc_peak_kib"] > limit and current["alloc_peak_kib"] - previous["alloc_peak_kib"] > 4:
+            regressions.append(f"{name}: alloc peak {previous['alloc_peak_kib']:.1f}KiB -> "
+                               f"{current['alloc_peak_kib']:.1f}KiB")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cores", type=int, default=64)
+    parser.add_argument("--interfaces", type=int, default=20)
+    parser.add_argument("--mounts", type=int, default=20)
+    parser.add_argument("--disks", type=int, default=10)
+    parser.add_argument("--processes", type=int, default=2000)
+    parser.add_argument("--number", type=int, default=200, help="每项测量耗时的调用次数")
+    parser.add_argument("--alloc-number", type=int, default=20, help="每项测量分配的调用次数")
+    parser.add_argument("--only", choices=("collectors", "endpoints"), help="只测量其中一部分")
+    parser.add_argument("--save", help="把结果写入该JSON文件作为基线")
+    parser.add_argument("--baseline", help="与该JSON基线比较")
+    parser.add_argument("--threshold", type=float, default=0.25, help="允许的相对回归（默认25%%）")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="低于该差值（毫秒）的耗时变化不算回归")
+    args = parser.parse_args()
+
+    print(f"generating synthetic host: {args.cores} cores, {args.interfaces} interfaces, {args.mounts} mounts, "
+          f"{args.disks} disks, {args.processes} processes ...")
+    with SyntheticHost(args.cores, args.interfaces, args.mounts, args.disks, args.processes) as host:
+        # 必须在导入app之前设置
+        os.environ.update(host.environ())
+        os.environ["MONITOR_PROCESS_INTERVAL"] = "0"
+        os.environ["MONITOR_STATVFS_INTERVAL"] = "0"
+        from app.core.instrumentation import instrumentation
+        from app.core.system_monitor import SystemMonitor
+
+        results: Dict[str, Dict[str, float]] = {}
+        if args.only != "endpoints":
+            collectors = {
+                "cpu": SystemMonitor.get_cpu_info,
+                "memory": SystemMonitor.get_memory_info,
+                "disk": SystemMonitor.get_disk_info,
+                "network": SystemMonitor.get_network_info,
+                "pressure": SystemMonitor.get_pressure_info,
+                "sensors": SystemMonitor.get_sensors_info,
+                "cgroup": SystemMonitor.get_cgroup_info,
+                "processes": lambda: SystemMonitor.get_process_info("cpu", 20),
+            }
+            for name, collect in collectors.items():
+                results[f"collector {name}"] = measure(collect, host.advance, args.number, args.alloc_number)
+        if args.only != "collectors":
+            results.update(measure_endpoints(host, args.number, args.alloc_number))
+
+    print(f"{'case':<28}{'ops/s':>10}{'p50':>10}{'p99':>10}{'max':>10}{'alloc peak':>12}{'growth/op':>11}")
+    for name, result in results.items():
+        print(f"{name:<28}{result['throughput']:>10,.0f}{result['p50_ms']:>8.3f}ms{result['p99_ms']:>8.3f}ms"
+              f"{result['max_ms']:>8.3f}ms{result['alloc_peak_kib']:>9.1f}KiB{result['alloc_growth_bytes']:>10.0f}B")
+
+    failed = False
+    # 合成数据不完整时采集器会回退到psutil，测到的就不是宿主机路径了
+    stats = instrumentation.summary()
+    if stats["fallbacks"] or stats["errors"]:
+        failed = True
+        for name, collector_stats in stats["collectors"].items():
+            if collector_stats["last_error"]:
+                print(f"ERROR {name}: {collector_stats['last_error']}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"saved baseline to {args.save}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            failed = True
+        else:
+            print(f"no regression beyond {args.threshold:.0%} of {args.baseline}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
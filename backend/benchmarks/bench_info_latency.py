@@ -0,0 +1,151 @@
+"""
+/api/system/info 并发延迟基准测试
+
+启动一个真实的uvicorn服务，用N个并发客户端按固定周期轮询/api/system/info
+（模拟N个打开的仪表盘），统计延迟分位数。对比两种模式：
+    - snapshot: 当前实现，接口读取后台采集器的快照
+    - legacy:   改造前的做法，在async路由中直接采集，CPU使用率阻塞1秒
+
+用法（在backend目录下执行）:
+    python -m benchmarks.bench_info_latency --clients 50 --requests 20 --interval 1
+"""
+import argparse
+import asyncio
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+
+import httpx
+import psutil
+from fastapi import FastAPI
+
+from app.core.system_monitor import SystemMonitor
+
+
+def legacy_app() -> FastAPI:
+    """改造前的行为：每个请求都在事件循环中完整采集一次，CPU部分阻塞1秒"""
+    app = FastAPI()
+
+    @app.get("/api/system/info")
+    async def get_system_info():
+        info = SystemMonitor.get_all_info()
+        info["cpu"]["cpu_per_core"] = psutil.cpu_percent(interval=1, percpu=True)
+        return info
+
+    return app
+
+
+# 各模式对应的uvicorn应用路径
+APPS = {
+    "snapshot": ["main:app"],
+    "legacy": ["--factory", "benchmarks.bench_info_latency:legacy_app"],
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class _Server:
+    """在独立进程中运行uvicorn，避免客户端与服务端争用同一个GIL"""
+
+    def __init__(self, mode: str):
+        self.port = _free_port()
+        self.args = [
+            sys.executable, "-m", "uvicorn", *APPS[mode],
+            "--host", "127.0.0.1", "--port", str(self.port), "--log-level", "warning",
+        ]
+        self.process: subprocess.Popen = None
+
+    def __enter__(self) -> str:
+        self.process = subprocess.Popen(self.args)
+        base_url = f"http://127.0.0.1:{self.port}"
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                httpx.get(f"{base_url}/", timeout=1)
+                return base_url
+            except httpx.TransportError:
+                time.sleep(0.1)
+        self.process.kill()
+        raise RuntimeError("uvicorn did not start in time")
+
+    def __exit__(self, *exc) -> None:
+        self.process.terminate()
+        self.process.wait()
+
+
+async def _client(client: httpx.AsyncClient, requests: int, interval: float,
+                  latencies: List[float]) -> None:
+    """模拟一个仪表盘：按固定周期轮询，interval为0时不间断请求"""
+    if interval > 0:
+        # 随机错开各客户端的起始时间，避免所有请求同时到达
+        await asyncio.sleep(random.uniform(0, interval))
+    next_request = time.perf_counter()
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await client.get("/api/system/info")
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+        if interval > 0:
+            next_request += interval
+            await asyncio.sleep(max(0.0, next_request - time.perf_counter()))
+
+
+async def _load(base_url: str, clients: int, requests: int, interval: float) -> List[float]:
+    latencies: List[float] = []
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as client:
+        # 预热：每个并发客户端先建立连接，连接建立与服务启动后的首次采集不计入结果
+        await asyncio.gather(*(client.get("/api/system/info") for _ in range(clients)))
+        await asyncio.gather(*(_client(client, requests, interval, latencies) for _ in range(clients)))
+    return latencies
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run(mode: str, clients: int, requests: int, interval: float) -> List[float]:
+    with _Server(mode) as base_url:
+        start = time.perf_counter()
+        latencies = asyncio.run(_load(base_url, clients, requests, interval))
+        elapsed = time.perf_counter() - start
+
+    print(
+        f"{mode:>8}: {len(latencies)} requests in {elapsed:.2f}s "
+        f"({len(latencies) / elapsed:.0f} req/s)  "
+        f"p50={_percentile(latencies, 50) * 1000:.1f}ms  "
+        f"p99={_percentile(latencies, 99) * 1000:.1f}ms  "
+        f"max={max(latencies) * 1000:.1f}ms  "
+        f"mean={statistics.mean(latencies) * 1000:.1f}ms"
+    )
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50, help="并发客户端数量")
+    parser.add_argument("--requests", type=int, default=20, help="snapshot模式下每个客户端的请求数")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="每个客户端的轮询周期（秒），0表示不间断请求以测试吞吐上限")
+    parser.add_argument("--legacy-requests", type=int, default=1,
+                        help="legacy模式下每个客户端的请求数（每个请求阻塞1秒，默认只发1个）")
+    parser.add_argument("--modes", default="snapshot,legacy", help="要测试的模式，逗号分隔")
+    args = parser.parse_args()
+
+    for mode in args.modes.split(","):
+        requests = args.requests if mode == "snapshot" else args.legacy_requests
+        run(mode.strip(), args.clients, requests, args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+/metrics渲染基准测试
+
+构造一台大型主机的快照（默认256核、300个网络接口、100个挂载点、50块磁盘、200个cgroup），
+分别测量：
+    - scrape: 快照未变化时的一次抓取（只拼接已缓存的各子系统文本）
+    - update: 单个子系统快照更新后的重新渲染（在采集线程中进行，不在抓取路径上）
+
+用法（在backend目录下执行）:
+    python -m benchmarks.bench_metrics --cores 256 --interfaces 300 --mounts 100
+"""
+import argparse
+import random
+import statistics
+import time
+from typing import Dict, Any, List
+
+from app.core.openmetrics import OpenMetricsRenderer
+
+MODES = ("user", "system", "iowait", "irq", "steal", "guest")
+
+
+def build_snapshots(cores: int, interfaces: int, mounts: int, disks: int, cgroups: int) -> Dict[str, Dict[str, Any]]:
+    def percent() -> float:
+        return round(random.uniform(0, 100), 1)
+
+    cpu = {
+        "cpu_percent": percent(),
+        "cpu_per_core": [percent() for _ in range(cores)],
+        "cpu_breakdown": {mode: percent() for mode in MODES},
+        "cpu_per_core_breakdown": {mode: [percent() for _ in range(cores)] for mode in MODES},
+        "cpu_freq_current": 2400.0,
+        "cpu_freq_min": 800.0,
+        "cpu_freq_max": 3600.0,
+        "cpu_count": cores,
+    }
+    memory = {
+        "memory_total": 1 << 40, "memory_available": 1 << 39, "memory_used": 1 << 39, "memory_percent": 50.0,
+        "swap_total": 0, "swap_used": 0, "swap_free": 0, "swap_percent": 0.0,
+    }
+    disk = {
+        "disks": [
+            {"device": f"/dev/nvme{index}n1", "mountpoint": f"/data/{index}", "fstype": "xfs",
+             "total": 1 << 41, "used": 1 << 40, "free": 1 << 40, "percent": 50.0, "stale": False}
+            for index in range(mounts)
+        ],
+        "io": [
+            {"device": f"nvme{index}n1", "read_bytes_rate": 1e6, "write_bytes_rate": 2e6, "read_iops": 100.0,
+             "write_iops": 200.0, "await_ms": 0.4, "util_percent": 12.5, "queue_depth": 0.3}
+            for index in range(disks)
+        ],
+    }
+    network = {
+        "interfaces": [
+            {"name": f"veth{index:05x}", "bytes_recv": random.getrandbits(40), "bytes_sent": random.getrandbits(40),
+             "packets_recv": random.getrandbits(32), "packets_sent": random.getrandbits(32),
+             "errin": 0, "errout": 0, "dropin": 0, "dropout": 0,
+             "bytes_recv_rate": 1234.5, "bytes_sent_rate": 2345.6}
+            for index in range(interfaces)
+        ],
+    }
+    group = {
+        "cpu_percent": 12.5, "cpu_limit": 2.0, "throttled_percent": 0.0, "memory_working_set": 1 << 28,
+        "memory_limit": 1 << 30, "io_read_bytes_rate": 0.0, "io_write_bytes_rate": 4096.0,
+        "cpu_pressure_some": 1.2, "cpu_pressure_full": 0.1,
+    }
+    cgroup = {
+        "version": 2,
+        "current": {"name": "/", **group},
+        "root": "/system.slice",
+        "children": [{"name": f"/docker-{index:064x}.scope", **group} for index in range(cgroups)],
+    }
+    psi = {f"{kind}_{field}": 1.0 for kind in ("some", "full") for field in ("avg10", "avg60", "avg300", "percent")}
+    pressure = {
+        "cpu": psi, "memory": psi, "io": psi, "load1": 12.0, "load5": 10.0, "load15": 8.0,
+        "procs_running": 12, "procs_total": 4000, "pgmajfault_rate": 0.0, "pswpin_rate": 0.0,
+        "pswpout_rate": 0.0, "oom_kill": 0, "oom_kill_delta": 0,
+    }
+    return {"cpu": cpu, "memory": memory, "disk": disk, "network": network, "cgroup": cgroup, "pressure": pressure}
+
+
+def measure(func, number: int) -> List[float]:
+    samples = []
+    for _ in range(number):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def report(label: str, samples: List[float]) -> None:
+    ordered = sorted(samples)
+    print(
+        f"{label:<20} mean {statistics.mean(samples) * 1e6:9.1f}us  "
+        f"p50 {ordered[len(ordered) // 2] * 1e6:9.1f}us  p99 {ordered[int(len(ordered) * 0.99)] * 1e6:9.1f}us"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cores", type=int, default=256)
+    parser.add_argument("--interfaces", type=int, default=300)
+    parser.add_argument("--mounts", type=int, default=100)
+    parser.add_argument("--disks", type=int, default=50)
+    parser.add_argument("--cgroups", type=int, default=200)
+    parser.add_argument("--number", type=int, default=500, help="每项测量的次数")
+    args = parser.parse_args()
+
+    random.seed(1)
+    snapshots = build_snapshots(args.cores, args.interfaces, args.mounts, args.disks, args.cgroups)
+    ages = {name: 0.5 for name in snapshots}
+    renderer = OpenMetricsRenderer()
+    body = renderer.render(snapshots, ages)
+    print(f"{len(body)} bytes, {len(body.splitlines())} lines")
+
+    report("scrape (cached)", measure(lambda: renderer.render(snapshots, ages), args.number))
+    for name, data in snapshots.items():
+        # 快照更新时采集器传入的是新的字典对象
+        report(f"update {name}", measure(lambda: renderer.update(name, dict(data)), max(args.number // 5, 1)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+/proc解析器微基准测试
+
+对比每次采样的开销：
+    - legacy: 改造前SystemMonitor中的实现（每次open、按行读取、构建中间字典）
+    - reader: app.core.proc_reader（常驻文件描述符 + pread到预分配缓冲区 + 只提取需要的字段）
+    - psutil: 对应的psutil接口
+
+用法（在backend目录下执行）:
+    python -m benchmarks.bench_proc_parsers --proc /proc --number 2000
+"""
+import argparse
+import os
+import timeit
+from typing import Callable, Dict
+
+import psutil
+
+from app.core.cpu_sampler import CpuSampler
+from app.core.proc_reader import ProcFile, MemInfoReader, parse_net_dev, parse_mounts
+
+
+def legacy_cpu(proc: str):
+    with open(f"{proc}/stat", "r") as f:
+        cpu_lines = [line for line in f if line.startswith('cpu')]
+    result = []
+    for line in cpu_lines[1:]:
+        values = [int(val) for val in line.split()[1:8]]
+        user, nice, system, idle, iowait, irq, softirq = values
+        non_idle = user + nice + system + irq + softirq
+        total = non_idle + idle + iowait
+        result.append(round((non_idle / total) * 100 if total > 0 else 0, 1))
+    return result
+
+
+def legacy_memory(proc: str):
+    mem_info = {}
+    with open(f"{proc}/meminfo", "r") as f:
+        for line in f:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                value = value.strip()
+                if value.endswith("kB"):
+                    value = int(value.split()[0]) * 1024
+                mem_info[key.strip()] = value
+    return [int(mem_info.get(key, 0)) for key in
+            ("MemTotal", "MemFree", "Buffers", "Cached", "SwapTotal", "SwapFree")]
+
+
+def legacy_network(proc: str):
+    totals = [0, 0, 0, 0]
+    with open(f"{proc}/net/dev", "r") as f:
+        lines = f.readlines()
+    for line in lines[2:]:
+        parts = line.split(":")
+        if len(parts) >= 2:
+            interface = parts[0].strip()
+            if interface == "lo" or interface.startswith("docker") or interface.startswith("veth"):
+                continue
+            values = parts[1].strip().split()
+            if len(values) >= 10:
+                totals[0] += int(values[0])
+                totals[1] += int(values[1])
+                totals[2] += int(values[8])
+                totals[3] += int(values[9])
+    return totals
+
+
+def legacy_mounts(proc: str):
+    mounts = []
+    with open(f"{proc}/mounts", "r") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 6:
+                mounts.append((parts[0], parts[1], parts[2]))
+    return mounts
+
+
+def build_cases(proc: str) -> Dict[str, Dict[str, Callable]]:
+    cpu_sampler = CpuSampler(f"{proc}/stat")
+    meminfo = MemInfoReader(f"{proc}/meminfo",
+                            ("MemTotal", "MemFree", "Buffers", "Cached", "SwapTotal", "SwapFree"))
+    net_dev = ProcFile(f"{proc}/net/dev")
+    mounts = ProcFile(f"{proc}/mounts")
+
+    return {
+        "cpu": {
+            "legacy": lambda: legacy_cpu(proc),
+            "reader": cpu_sampler.sample,
+            "psutil": lambda: psutil.cpu_times(percpu=True),
+        },
+        "memory": {
+            "legacy": lambda: legacy_memory(proc),
+            "reader": meminfo.read,
+            "psutil": psutil.virtual_memory,
+        },
+        "network": {
+            "legacy": lambda: legacy_network(proc),
+            "reader": lambda: parse_net_dev(net_dev),
+            "psutil": lambda: psutil.net_io_counters(pernic=True),
+        },
+        "mounts": {
+            "legacy": lambda: legacy_mounts(proc),
+            "reader": lambda: parse_mounts(mounts),
+            "psutil": lambda: psutil.disk_partitions(all=True),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--proc", default="/proc", help="/proc目录（可指向宿主机或测试用的目录）")
+    parser.add_argument("--number", type=int, default=2000, help="每个用例的执行次数")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数，取最好的一次")
+    args = parser.parse_args()
+
+    print(f"proc={os.path.abspath(args.proc)}  number={args.number}  (best of {args.repeat}, us/sample)")
+    print(f"{'collector':<10}{'legacy':>10}{'reader':>10}{'psutil':>10}{'speedup':>10}")
+    for name, cases in build_cases(args.proc).items():
+        timings = {}
+        for variant, func in cases.items():
+            func()  # 预热，打开文件描述符
+            best = min(timeit.repeat(func, number=args.number, repeat=args.repeat))
+            timings[variant] = best / args.number * 1e6
+        speedup = timings["legacy"] / timings["reader"]
+        print(f"{name:<10}{timings['legacy']:>10.1f}{timings['reader']:>10.1f}"
+              f"{timings['psutil']:>10.1f}{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
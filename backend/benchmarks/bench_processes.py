@@ -0,0 +1,122 @@
+"""
+进程扫描基准测试
+
+在临时目录中生成包含大量进程的合成/proc（每个进程一个<pid>/stat文件以及uptime），
+测量ProcessScanner的单次扫描耗时和前N个进程的选取耗时，并与改造前常见的做法
+（每次读取全部进程的stat并对整张表排序）对比。每次扫描前都会修改一部分进程的jiffies，
+模拟真实负载的变化。
+
+用法（在backend目录下执行）:
+    python -m benchmarks.bench_processes --processes 20000 --scans 200
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from typing import List
+
+from app.core.processes import ProcessScanner, parse_pid_stat
+
+STAT_TEMPLATE = (
+    "{pid} ({name}) S 1 {pid} {pid} 0 -1 4194560 1200 0 0 0 {utime} {stime} 0 0 20 0 {threads} 0 "
+    "{start} 171892736 {rss} 18446744073709551615 1 1 0 0 0 0 671173123 4096 1260 0 0 0 17 3 0 0 0 0 0\n"
+)
+
+
+def write_stat(proc: str, pid: int, utime: int) -> None:
+    with open(f"{proc}/{pid}/stat", "w") as f:
+        f.write(STAT_TEMPLATE.format(
+            pid=pid, name=f"worker {pid % 97}", utime=utime, stime=utime // 4,
+            threads=1 + pid % 8, start=1000 + pid, rss=500 + pid % 5000,
+        ))
+
+
+def build_proc(processes: int) -> str:
+    proc = tempfile.mkdtemp(prefix="bench-proc-")
+    with open(f"{proc}/uptime", "w") as f:
+        f.write("86400.00 1000000.00\n")
+    for pid in range(1, processes + 1):
+        os.mkdir(f"{proc}/{pid}")
+        write_stat(proc, pid, random.randint(0, 100000))
+    return proc
+
+
+def legacy_top(proc: str, limit: int) -> List[tuple]:
+    """逐个读取所有进程并整表排序"""
+    rows = []
+    for name in os.listdir(proc):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"{proc}/{name}/stat", "rb") as f:
+                parsed = parse_pid_stat(f.read())
+        except OSError:
+            continue
+        if parsed:
+            rows.append((parsed[2], int(name), parsed[0]))
+    rows.sort(reverse=True)
+    return rows[:limit]
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def report(label: str, samples: List[float]) -> None:
+    print(
+        f"{label:<26} mean {statistics.mean(samples) * 1000:8.3f}ms  "
+        f"p50 {percentile(samples, 0.5) * 1000:8.3f}ms  p99 {percentile(samples, 0.99) * 1000:8.3f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=20000, help="合成的进程数量")
+    parser.add_argument("--scans", type=int, default=200, help="测量的扫描次数")
+    parser.add_argument("--budget", type=int, default=256, help="每次扫描读取的冷进程数量")
+    parser.add_argument("--hot", type=int, default=64, help="常驻描述符的热点进程数量")
+    parser.add_argument("--limit", type=int, default=20, help="返回的进程数量")
+    parser.add_argument("--busy", type=int, default=50, help="每次扫描间jiffies变化的进程数量")
+    parser.add_argument("--legacy-scans", type=int, default=5, help="对照实现的测量次数")
+    args = parser.parse_args()
+
+    random.seed(1)
+    print(f"generating synthetic /proc with {args.processes} processes ...")
+    proc = build_proc(args.processes)
+    try:
+        scanner = ProcessScanner(proc, args.budget, args.hot, min_interval=0.0)
+        started = time.perf_counter()
+        scanner.scan()
+        print(f"initial full scan: {(time.perf_counter() - started) * 1000:.1f}ms, {len(scanner)} processes")
+
+        busy = random.sample(range(1, args.processes + 1), args.busy)
+        scans, tops = [], []
+        for _ in range(args.scans):
+            for pid in busy:
+                write_stat(proc, pid, random.randint(100000, 200000))
+            started = time.perf_counter()
+            scanner.scan()
+            scans.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            scanner.top("cpu", args.limit)
+            tops.append(time.perf_counter() - started)
+        report("incremental scan", scans)
+        report(f"top {args.limit} (heap)", tops)
+
+        legacy = []
+        for _ in range(args.legacy_scans):
+            started = time.perf_counter()
+            legacy_top(proc, args.limit)
+            legacy.append(time.perf_counter() - started)
+        report("legacy full scan + sort", legacy)
+        scanner.close()
+    finally:
+        shutil.rmtree(proc, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+/api/system/info响应编码基准测试
+
+构造一台128核、50个挂载点的主机的完整快照，比较各种编码方式每次请求的耗时和响应大小：
+    - pydantic: 旧实现的路径（SystemInfo校验 + jsonable_encoder + json.dumps）
+    - json / orjson / msgpack: 直接编码快照字典
+    - 以上格式再经gzip或brotli压缩
+缺少的可选依赖（orjson、msgpack、brotli）会被跳过。
+
+用法（在backend目录下执行）:
+    python -m benchmarks.bench_serialization --cores 128 --mounts 50
+"""
+import argparse
+import gzip
+import json
+import random
+import statistics
+import time
+from typing import Callable, List
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core import serialization
+from app.core.serialization import GZIP_LEVEL, BROTLI_QUALITY
+from app.schemas.system_info import SystemInfo
+from benchmarks.bench_metrics import build_snapshots
+
+
+def measure(func: Callable[[], bytes], number: int) -> List[float]:
+    samples = []
+    for _ in range(number):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cores", type=int, default=128)
+    parser.add_argument("--mounts", type=int, default=50)
+    parser.add_argument("--interfaces", type=int, default=20)
+    parser.add_argument("--disks", type=int, default=20)
+    parser.add_argument("--cgroups", type=int, default=20)
+    parser.add_argument("--number", type=int, default=300, help="每项测量的次数")
+    args = parser.parse_args()
+
+    random.seed(1)
+    snapshot = {"timestamp": time.time(),
+                **build_snapshots(args.cores, args.interfaces, args.mounts, args.disks, args.cgroups),
+                "snapshot_age": 0.42}
+
+    def pydantic_path() -> bytes:
+        # FastAPI对response_model的处理：校验模型，转换为可序列化的字典，再由JSONResponse编码
+        model = SystemInfo(**snapshot)
+        return json.dumps(jsonable_encoder(model), ensure_ascii=False, allow_nan=False,
+                          indent=None, separators=(",", ":")).encode()
+
+    def stdlib_json() -> bytes:
+        return json.dumps(snapshot, separators=(",", ":"), ensure_ascii=False).encode()
+
+    encoders = {"pydantic": pydantic_path, "json": stdlib_json}
+    if serialization.orjson is not None:
+        encoders["orjson"] = lambda: serialization.orjson.dumps(snapshot)
+    if serialization.msgpack is not None:
+        encoders["msgpack"] = lambda: serialization.dumps_msgpack(snapshot)
+
+    compressors = {"": lambda body: body, "+gzip": lambda body: gzip.compress(body, compresslevel=GZIP_LEVEL)}
+    if serialization.brotli is not None:
+        compressors["+br"] = lambda body: serialization.brotli.compress(body, quality=BROTLI_QUALITY)
+
+    print(f"{'format':<18} {'size':>10} {'mean':>10} {'p99':>10}")
+    for name, encode in encoders.items():
+        for suffix, compress in compressors.items():
+            if name == "pydantic" and suffix:
+                continue
+            samples = measure(lambda: compress(encode()), args.number)
+            ordered = sorted(samples)
+            size = len(compress(encode()))
+            print(f"{name + suffix:<18} {size:>9,}B {statistics.mean(samples) * 1e6:>8.0f}us "
+                  f"{ordered[int(len(ordered) * 0.99)] * 1e6:>8.0f}us")
+
+
+if __name__ == "__main__":
+    main()
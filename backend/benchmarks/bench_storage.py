@@ -0,0 +1,97 @@
+"""
+历史数据持久化基准测试
+
+在临时目录中模拟按1秒周期采样若干小时（时间戳是合成的，不需要真的等待），按刷盘间隔写入段文件，
+然后测量：
+    - 写入：每个数据点占用的字节数、每次刷盘的耗时，以及按此推算的每天/每月写入量
+    - 压缩：重新分块和降采样的耗时与压缩后的大小
+    - 查询：原始精度的1小时查询、1分钟步长的全范围查询和自动步长的全范围查询
+
+用法（在backend目录下执行）:
+    python -m benchmarks.bench_storage --metrics 200 --hours 6
+"""
+import argparse
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from app.core.storage import MetricStore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--metrics", type=int, default=200, help="每次采样的指标数")
+    parser.add_argument("--hours", type=float, default=6, help="模拟的采样时长（小时）")
+    parser.add_argument("--interval", type=float, default=1.0, help="采样周期（秒）")
+    parser.add_argument("--flush", type=float, default=300.0, help="刷盘间隔（秒）")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="bench-storage-")
+    try:
+        # 整段数据都早于原始精度保留时长，压缩时会降采样
+        store = MetricStore(directory, retention=365 * 86400, raw_retention=0, downsample=10,
+                            flush_interval=args.flush, segment_seconds=86400)
+        random.seed(1)
+        # 一半是变化缓慢的百分比，一半是较大的字节数/速率
+        values = [random.uniform(0, 100) if index % 2 else random.uniform(1e6, 1e10) for index in range(args.metrics)]
+        names = [f"bench.metric.{index}" for index in range(args.metrics)]
+        end = (time.time() // 86400 - 1) * 86400
+        start = end - args.hours * 3600
+        timestamp = start
+        next_flush = start + args.flush
+        samples = 0
+        flush_times = []
+        while timestamp < end:
+            points = {}
+            for index, name in enumerate(names):
+                value = values[index]
+                value += value * random.uniform(-0.002, 0.002)
+                values[index] = value
+                points[name] = round(value, 1)
+            store.submit("bench", timestamp, {}, points)
+            samples += 1
+            timestamp += args.interval + random.uniform(-0.002, 0.002)
+            if timestamp >= next_flush:
+                started = time.perf_counter()
+                store.flush()
+                flush_times.append(time.perf_counter() - started)
+                next_flush += args.flush
+        store.flush()
+
+        points = samples * args.metrics
+        written = store.bytes_written
+        per_day = written / (args.hours / 24)
+        print(f"{points:,} points, {written / points:.2f} bytes/point, "
+              f"flush {statistics.mean(flush_times) * 1000:.1f}ms per {args.flush:.0f}s")
+        print(f"projected writes: {per_day / 1e6:.1f} MB/day, {per_day * 30 / 1e9:.2f} GB/month "
+              f"({args.metrics} metrics every {args.interval}s)")
+
+        def query(label, *query_args):
+            started = time.perf_counter()
+            result = store.query(*query_args)
+            elapsed = time.perf_counter() - started
+            print(f"{label:<28} {len(result['values']):5d} points, step {result['step']:>6.0f}s  {elapsed * 1000:8.1f}ms")
+
+        for phase in ("raw", "compacted"):
+            print(f"-- {phase} ({store.nbytes() / 1e6:.1f} MB on disk)")
+            query("1 hour at 1s", names[1], end - 3600, end, 1)
+            query("full range at 60s", names[1], start, end, 60)
+            query("full range, auto step", names[1], start, end)
+            if phase == "raw":
+                raw_size = store.nbytes()
+                started = time.perf_counter()
+                store.maintain()
+                print(f"compaction + 10s downsampling: {time.perf_counter() - started:.1f}s")
+        # 默认配置：原始精度保留7天，其余83天为10秒平均
+        per_day_raw = raw_size / (args.hours / 24)
+        per_day_compacted = store.nbytes() / (args.hours / 24)
+        print(f"projected disk usage with 7 days raw + 83 days at 10s: "
+              f"{(7 * per_day_raw + 83 * per_day_compacted) / 1e9:.2f} GB")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
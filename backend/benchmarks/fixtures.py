@@ -0,0 +1,249 @@
+"""
+合成的/proc和/sys目录，供基准测试在不依赖本机规模的情况下测量采集器
+
+SyntheticHost在临时目录中生成一台指定规模（核心数、网络接口数、挂载点数、磁盘数、进程数）
+主机的/proc和/sys，文件格式与内核输出一致。advance()模拟一个采样周期后的计数增长
+（CPU jiffies、网卡/磁盘计数、PSI、vmstat、热降频计数以及一部分进程的jiffies），使采集器的
+差值计算走到与真实主机相同的路径。
+
+把MONITOR_HOST_PROC、MONITOR_HOST_SYS指向生成的目录后再导入app，SystemMonitor即读取合成数据：
+
+    host = SyntheticHost(cores=128, interfaces=50, mounts=50, disks=20, processes=5000)
+    os.environ.update(host.environ())
+"""
+import os
+import random
+import shutil
+import tempfile
+from typing import Dict, List, Tuple
+
+from benchmarks.bench_processes import write_stat
+
+# /proc/stat每个cpu行的10个计数：user nice system idle iowait irq softirq steal guest guest_nice
+_CPU_FIELDS = 10
+
+# meminfo中采集器不需要的字段，使文件大小与真实内核相当
+_MEMINFO_FILLER = (
+    "MemAvailable", "SwapCached", "Active", "Inactive", "Active(anon)", "Inactive(anon)", "Active(file)",
+    "Inactive(file)", "Unevictable", "Mlocked", "Dirty", "Writeback", "AnonPages", "Mapped", "Shmem",
+    "KReclaimable", "Slab", "SReclaimable", "SUnreclaim", "KernelStack", "PageTables", "NFS_Unstable",
+    "Bounce", "WritebackTmp", "CommitLimit", "Committed_AS", "VmallocTotal", "VmallocUsed", "VmallocChunk",
+    "Percpu", "HardwareCorrupted", "AnonHugePages", "ShmemHugePages", "ShmemPmdMapped", "FileHugePages",
+    "FilePmdMapped", "Hugetlb", "DirectMap4k", "DirectMap2M", "DirectMap1G",
+)
+
+# vmstat中采集器不需要的字段（真实内核约有170个）
+_VMSTAT_FILLER = [f"nr_counter_{index}" for index in range(160)]
+
+
+class SyntheticHost:
+    """在临时目录中生成的一台合成主机"""
+
+    def __init__(self, cores: int = 8, interfaces: int = 4, mounts: int = 8, disks: int = 4,
+                 processes: int = 300, busy: int = 50, seed: int = 1):
+        self.cores = cores
+        self.interfaces = [f"eth{index}" for index in range(interfaces)]
+        self.disks = [f"nvme{index}n1" for index in range(disks)]
+        self.processes = processes
+        self.root = tempfile.mkdtemp(prefix="synthetic-host-")
+        self.proc = os.path.join(self.root, "proc")
+        self.sys = os.path.join(self.root, "sys")
+        self._random = random.Random(seed)
+        self._tick = 0
+        # 每个周期jiffies发生变化的进程
+        self._busy = self._random.sample(range(1, processes + 1), min(busy, processes))
+        self._cpu = [[self._random.randint(10 ** 5, 10 ** 7) for _ in range(_CPU_FIELDS)] for _ in range(cores)]
+        # 字节数和包数（接收、发送各前两列）较大，错误、丢包等计数较小
+        self._net = {
+            name: [self._random.randint(10 ** 6, 10 ** 12) if column % 8 < 2 else self._random.randint(0, 100)
+                   for column in range(16)]
+            for name in self.interfaces
+        }
+        self._disk = {name: [self._random.randint(10 ** 4, 10 ** 9) for _ in range(17)] for name in self.disks}
+        self._psi_totals = [0, 0, 0, 0, 0, 0]
+        self._vmstat = {"pgmajfault": 1000, "pswpin": 0, "pswpout": 0, "oom_kill": 0}
+        # 拓扑：每个物理核心两个超线程（cpuN和cpuN+cores/2），16核以上分为两个CPU封装
+        self._physical = max(cores // 2, 1)
+        self._packages = 2 if cores >= 16 else 1
+        self._core_throttle = [0] * self._physical
+        self._package_throttle = [0] * self._packages
+        self._mounts = self._mount_table(mounts)
+        self._build()
+
+    def environ(self) -> Dict[str, str]:
+        """使SystemMonitor读取本主机的环境变量（需在导入app之前设置）"""
+        return {"MONITOR_HOST_PROC": self.proc, "MONITOR_HOST_SYS": self.sys}
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def __enter__(self) -> "SyntheticHost":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cleanup()
+
+    def _write(self, path: str, content: str) -> None:
+        # 原地重写而不是rename：ProcFile保持文件描述符打开，rename后会一直读到旧文件
+        with open(os.path.join(self.root, path), "w") as f:
+            f.write(content)
+
+    def _mount_table(self, count: int) -> List[str]:
+        lines = [
+            "proc /proc proc rw,nosuid,nodev,noexec,relatime 0 0",
+            "sysfs /sys sysfs rw,nosuid,nodev,noexec,relatime 0 0",
+            "tmpfs /run tmpfs rw,nosuid,nodev,size=1638400k,mode=755 0 0",
+            "cgroup2 /sys/fs/cgroup cgroup2 rw,nosuid,nodev,noexec,relatime 0 0",
+        ]
+        for index in range(count):
+            # 挂载点是临时目录下的真实目录，statvfs可以正常返回
+            mountpoint = os.path.join(self.root, "mnt", f"disk{index}")
+            os.makedirs(mountpoint, exist_ok=True)
+            lines.append(f"/dev/mapper/vg-lv{index} {mountpoint} ext4 rw,relatime 0 0")
+        return lines
+
+    def _build(self) -> None:
+        for directory in ("proc/net", "proc/pressure", "sys/block"):
+            os.makedirs(os.path.join(self.root, directory), exist_ok=True)
+        memory_total = 64 * 1024 * 1024 * self.cores // 8
+        meminfo = [
+            f"MemTotal: {memory_total} kB", f"MemFree: {memory_total // 4} kB", f"Buffers: {memory_total // 64} kB",
+            f"Cached: {memory_total // 8} kB",
+        ]
+        meminfo.extend(f"{field}: {self._random.randint(0, memory_total)} kB" for field in _MEMINFO_FILLER[:20])
+        meminfo.extend((f"SwapTotal: {memory_total // 8} kB", f"SwapFree: {memory_total // 10} kB"))
+        meminfo.extend(f"{field}: {self._random.randint(0, memory_total)} kB" for field in _MEMINFO_FILLER[20:])
+        self._write("proc/meminfo", "".join(f"{line}\n" for line in meminfo))
+        self._write("proc/mounts", "".join(f"{line}\n" for line in self._mounts))
+        self._write("proc/uptime", "86400.00 1000000.00\n")
+        self._write("proc/loadavg", f"{self.cores / 4:.2f} {self.cores / 5:.2f} {self.cores / 6:.2f} "
+                                    f"3/{self.processes} {self.processes + 1}\n")
+        for disk in self.disks:
+            os.makedirs(os.path.join(self.sys, "block", disk), exist_ok=True)
+        per_package = -(-self._physical // self._packages)
+        for core in range(self.cores):
+            cpu = os.path.join("sys", "devices", "system", "cpu", f"cpu{core}")
+            for directory in ("cpufreq", "topology", "thermal_throttle"):
+                os.makedirs(os.path.join(self.root, cpu, directory), exist_ok=True)
+            for name, value in (("scaling_cur_freq", 2400000 + core * 1000), ("scaling_min_freq", 800000),
+                                ("scaling_max_freq", 3600000)):
+                self._write(f"{cpu}/cpufreq/{name}", f"{value}\n")
+            physical = core % self._physical
+            self._write(f"{cpu}/topology/physical_package_id", f"{physical // per_package}\n")
+            self._write(f"{cpu}/topology/core_id", f"{physical % per_package}\n")
+        # hwmon：每个CPU封装一个coretemp（封装温度和各物理核心温度），每块磁盘一个nvme
+        hwmon = 0
+        for package in range(self._packages):
+            sensors = [("Package id %d" % package, 50000)]
+            sensors.extend((f"Core {core}", 45000 + core * 100)
+                           for core in range(min(per_package, self._physical - package * per_package)))
+            self._write_hwmon(hwmon, "coretemp", sensors, 80000, 100000)
+            hwmon += 1
+        for disk in self.disks:
+            self._write_hwmon(hwmon, "nvme", [("Composite", 38850)], 81850, 84850)
+            hwmon += 1
+        # 与很多主机一样，同一类型有多个zone
+        for index, zone in enumerate(("acpitz", "acpitz", "x86_pkg_temp")):
+            directory = os.path.join("sys", "class", "thermal", f"thermal_zone{index}")
+            os.makedirs(os.path.join(self.root, directory), exist_ok=True)
+            self._write(f"{directory}/type", f"{zone}\n")
+            self._write(f"{directory}/temp", f"{40000 + index * 10000}\n")
+        for pid in range(1, self.processes + 1):
+            os.mkdir(os.path.join(self.proc, str(pid)))
+            write_stat(self.proc, pid, self._random.randint(0, 100000))
+        self._write_counters()
+
+    def _write_hwmon(self, index: int, name: str, sensors: List[Tuple[str, int]], high: int, critical: int) -> None:
+        directory = os.path.join("sys", "class", "hwmon", f"hwmon{index}")
+        os.makedirs(os.path.join(self.root, directory), exist_ok=True)
+        self._write(f"{directory}/name", f"{name}\n")
+        for number, (label, value) in enumerate(sensors, 1):
+            self._write(f"{directory}/temp{number}_label", f"{label}\n")
+            self._write(f"{directory}/temp{number}_input", f"{value}\n")
+            self._write(f"{directory}/temp{number}_max", f"{high}\n")
+            self._write(f"{directory}/temp{number}_crit", f"{critical}\n")
+
+    def advance(self, seconds: float = 1.0) -> None:
+        """模拟经过seconds秒：累计计数按随机的负载增长，并重写变化的文件"""
+        self._tick += 1
+        jiffies = int(100 * seconds)
+        for row in self._cpu:
+            busy = self._random.randint(0, jiffies)
+            row[0] += busy * 2 // 3
+            row[2] += busy // 3
+            row[3] += jiffies - busy
+            row[4] += self._random.randint(0, 2)
+        for counters in self._net.values():
+            received = self._random.randint(0, int(1e7 * seconds))
+            sent = self._random.randint(0, int(1e7 * seconds))
+            counters[0] += received
+            counters[1] += received // 1000
+            counters[8] += sent
+            counters[9] += sent // 1000
+        for counters in self._disk.values():
+            reads = self._random.randint(0, int(500 * seconds))
+            writes = self._random.randint(0, int(500 * seconds))
+            counters[0] += reads
+            counters[2] += reads * 8
+            counters[3] += reads // 2
+            counters[4] += writes
+            counters[6] += writes * 16
+            counters[7] += writes
+            counters[9] += int(seconds * 100)
+            counters[10] += (reads + writes) // 2
+        for index in range(len(self._psi_totals)):
+            self._psi_totals[index] += self._random.randint(0, int(10000 * seconds))
+        self._vmstat["pgmajfault"] += self._random.randint(0, 20)
+        # 偶尔有一个物理核心（连同所在封装）发生降频
+        if self._random.random() < 0.2:
+            physical = self._random.randrange(self._physical)
+            self._core_throttle[physical] += 1
+            self._package_throttle[physical // -(-self._physical // self._packages)] += 1
+        self._write_counters()
+        for pid in self._busy:
+            write_stat(self.proc, pid, 100000 + self._tick * self._random.randint(1, 100))
+
+    def _write_counters(self) -> None:
+        total = [sum(row[field] for row in self._cpu) for field in range(_CPU_FIELDS)]
+        stat = ["cpu  " + " ".join(map(str, total))]
+        stat.extend(f"cpu{index} " + " ".join(map(str, row)) for index, row in enumerate(self._cpu))
+        stat.extend(("intr 123456789 0 0", f"ctxt {10 ** 9 + self._tick}", "btime 1700000000",
+                     f"processes {self.processes * 10}", "procs_running 3", "procs_blocked 0",
+                     "softirq 1234567 0 0 0 0 0 0 0 0 0 0"))
+        self._write("proc/stat", "".join(f"{line}\n" for line in stat))
+
+        net = [
+            "Inter-|   Receive                                                |  Transmit",
+            " face |bytes    packets errs drop fifo frame compressed multicast"
+            "|bytes    packets errs drop fifo colls carrier compressed",
+            "    lo: " + " ".join(["1000"] * 16),
+        ]
+        net.extend(f"{name:>6}: " + " ".join(map(str, counters)) for name, counters in self._net.items())
+        self._write("proc/net/dev", "".join(f"{line}\n" for line in net))
+
+        diskstats = []
+        for index, (name, counters) in enumerate(self._disk.items()):
+            diskstats.append(f" 259 {index * 8:7d} {name} " + " ".join(map(str, counters)))
+            # 分区默认不参与统计，但仍需逐行跳过
+            diskstats.append(f" 259 {index * 8 + 1:7d} {name}p1 " + " ".join(map(str, counters)))
+        self._write("proc/diskstats", "".join(f"{line}\n" for line in diskstats))
+
+        for index, resource in enumerate(("cpu", "memory", "io")):
+            some, full = self._psi_totals[index * 2], self._psi_totals[index * 2 + 1]
+            self._write(f"proc/pressure/{resource}",
+                        f"some avg10=1.50 avg60=1.20 avg300=1.00 total={some}\n"
+                        f"full avg10=0.10 avg60=0.05 avg300=0.01 total={full}\n")
+
+        vmstat = [f"{name} {self._random.randint(0, 10 ** 6)}" for name in _VMSTAT_FILLER[:80]]
+        vmstat.extend(f"{name} {value}" for name, value in self._vmstat.items() if name != "oom_kill")
+        vmstat.extend(f"{name} {self._random.randint(0, 10 ** 6)}" for name in _VMSTAT_FILLER[80:])
+        vmstat.append(f"oom_kill {self._vmstat['oom_kill']}")
+        self._write("proc/vmstat", "".join(f"{line}\n" for line in vmstat))
+
+        # 与内核相同，同一物理核心的超线程读到相同的core_throttle_count，同一封装读到相同的package_throttle_count
+        per_package = -(-self._physical // self._packages)
+        for core in range(self.cores):
+            physical = core % self._physical
+            throttle = f"sys/devices/system/cpu/cpu{core}/thermal_throttle"
+            self._write(f"{throttle}/core_throttle_count", f"{self._core_throttle[physical]}\n")
+            self._write(f"{throttle}/package_throttle_count", f"{self._package_throttle[physical // per_package]}\n")
@@ -1,6 +1,40 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.endpoints import system
+from app.api.endpoints import system, metrics, hosts
+from app.core.agent import pusher
+from app.core.aggregator import registry
+from app.core.collector import collector
+from app.core.config import MONITOR_MODE
+from app.core.storage import storage
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    应用生命周期：启动时开启后台采集任务，关闭时停止
+    
+    agent模式下同时启动向aggregator的推送，aggregator模式下同时监听agent连接；
+    设置了MONITOR_STORAGE_DIR时历史数据同时写入磁盘
+    """
+    if storage is not None:
+        collector.attach_storage(storage)
+        await storage.start()
+    if MONITOR_MODE == "agent":
+        # aggregator端的查看者在本机不可见，agent始终按基础周期采样
+        collector.adaptive = False
+        collector.add_sink(pusher.submit)
+        await pusher.start()
+    elif MONITOR_MODE == "aggregator":
+        await registry.start()
+    await collector.start()
+    yield
+    await collector.stop()
+    await pusher.stop()
+    await registry.stop()
+    if storage is not None:
+        await storage.stop()
+
 
 # 创建FastAPI应用实例
 app = FastAPI(
@@ -8,7 +42,8 @@ app = FastAPI(
     description="...",
     version="1.0.0",
     docs_url="/api/docs",    # 自定义API文档路径
-    redoc_url="/api/redoc"   # 自定义ReDoc文档路径
+    redoc_url="/api/redoc",  # 自定义ReDoc文档路径
+    lifespan=lifespan        # 后台采集器的启动与停止
 )
 
 # 配置CORS（跨源资源共享）中间件
@@ -29,6 +64,16 @@ app.include_router(
     tags=["system"]         # API文档分类标签
 )
 
+# 多主机列表（aggregator模式下包含所有agent）
+app.include_router(
+    hosts.router,
+    prefix="/api/hosts",
+    tags=["hosts"]
+)
+
+# Prometheus/OpenMetrics导出（按惯例挂在根路径/metrics）
+app.include_router(metrics.router, tags=["metrics"])
+
 @app.get("/")
 async def root():
     """
@@ -0,0 +1,65 @@
+import type { HistorySeries } from '../stores/schema'
+
+// 图表使用的时间序列：时间戳（毫秒）和值保存在类型化数组中，缺失数据为NaN（ECharts按空值断开折线）。
+// 组件用普通变量而不是ref保存，大量数据点不经过Vue的响应式代理。
+export class SeriesWindow {
+    timestamps: Float64Array
+    values: Float32Array
+    length = 0
+
+    constructor(capacity: number) {
+        this.timestamps = new Float64Array(Math.max(capacity, 16))
+        this.values = new Float32Array(Math.max(capacity, 16))
+    }
+
+    // 由/history的结果（秒级时间戳，可能已由后端LTTB降采样）构造，预留capacity个点的空间
+    static fromHistory(history: HistorySeries, capacity: number): SeriesWindow {
+        const series = new SeriesWindow(Math.max(capacity, history.timestamps.length * 2))
+        const count = history.timestamps.length
+        for (let index = 0; index < count; index++) {
+            series.timestamps[index] = history.timestamps[index] * 1000
+            const value = history.values[index]
+            series.values[index] = value === null ? NaN : value
+        }
+        series.length = count
+        return series
+    }
+
+    // 追加实时数据：距最后一个点不足step毫秒（同一像素）时只覆盖最后一个点的值，返回是否新增了点
+    push(timestamp: number, value: number | null | undefined, step: number): boolean {
+        const number = value === null || value === undefined ? NaN : value
+        if (this.length > 0 && timestamp - this.timestamps[this.length - 1] < step) {
+            this.values[this.length - 1] = number
+            return false
+        }
+        if (this.length === this.timestamps.length) {
+            // 空间用完时丢弃最旧的四分之一
+            this.drop(this.length >> 2)
+        }
+        this.timestamps[this.length] = timestamp
+        this.values[this.length] = number
+        this.length++
+        return true
+    }
+
+    // 丢弃早于since（毫秒）的点
+    trim(since: number) {
+        let count = 0
+        while (count < this.length && this.timestamps[count] < since) count++
+        if (count > 0) this.drop(count)
+    }
+
+    private drop(count: number) {
+        this.timestamps.copyWithin(0, count, this.length)
+        this.values.copyWithin(0, count, this.length)
+        this.length -= count
+    }
+
+    // ECharts dataset的数据源（按列，子数组视图不复制数据）
+    source() {
+        return {
+            t: this.timestamps.subarray(0, this.length),
+            v: this.values.subarray(0, this.length)
+        }
+    }
+}
@@ -0,0 +1,116 @@
+import { apiBaseUrl } from '../config.ts'
+import type { SystemInfo, AlertsEvent } from '../stores/schema'
+
+// 推送流中的子系统名称
+export type StreamSection = 'cpu' | 'memory' | 'disk' | 'network' | 'cgroup' | 'pressure' | 'sensors'
+const SECTIONS: StreamSection[] = ['cpu', 'memory', 'disk', 'network', 'cgroup', 'pressure', 'sensors']
+
+type SectionListener = (data: any) => void
+type ErrorListener = (message: string | null) => void
+
+// 所有store共享同一个EventSource连接
+let source: EventSource | null = null
+const state: Partial<Record<StreamSection, any>> = {}
+const listeners = new Map<StreamSection, Set<SectionListener>>()
+const errorListeners = new Set<ErrorListener>()
+// 告警：连接建立时和每次告警触发/恢复时收到当前所有触发中的告警
+let alerts: AlertsEvent | null = null
+const alertListeners = new Set<(event: AlertsEvent) => void>()
+
+const notify = (section: StreamSection) => {
+    const data = state[section]
+    if (data === undefined) return
+    listeners.get(section)?.forEach(listener => listener(data))
+}
+
+const setError = (message: string | null) => {
+    errorListeners.forEach(listener => listener(message))
+}
+
+const open = () => {
+    source = new EventSource(`${apiBaseUrl}/system/stream`)
+
+    // 完整快照：连接建立（包括自动重连）时发送
+    source.addEventListener('snapshot', (event) => {
+        const snapshot = JSON.parse((event as MessageEvent).data) as SystemInfo
+        setError(null)
+        // 没有订阅者的子系统也保存下来，后续订阅时可以立即拿到数据
+        SECTIONS.forEach(section => {
+            state[section] = snapshot[section]
+            notify(section)
+        })
+    })
+
+    // 增量：只包含发生变化的字段，与已有数据合并后通知订阅者
+    source.addEventListener('delta', (event) => {
+        const delta = JSON.parse((event as MessageEvent).data)
+        for (const section of Object.keys(delta) as Array<StreamSection | 'timestamp'>) {
+            if (section === 'timestamp') continue
+            state[section] = { ...state[section], ...delta[section] }
+            notify(section)
+        }
+    })
+
+    source.addEventListener('alerts', (event) => {
+        alerts = JSON.parse((event as MessageEvent).data) as AlertsEvent
+        alertListeners.forEach(listener => listener(alerts!))
+    })
+
+    // EventSource会自动重连；重连期间继续显示已有数据，
+    // 只有连接被关闭或从未收到过数据时才报告错误
+    source.onerror = () => {
+        if (source?.readyState === EventSource.CLOSED) {
+            setError('Stream closed')
+        } else if (SECTIONS.every(section => state[section] === undefined)) {
+            setError('Unable to connect to stream')
+        }
+    }
+}
+
+const closeIfIdle = () => {
+    const active = [...listeners.values()].some(set => set.size > 0) || alertListeners.size > 0
+    if (!active && source) {
+        source.close()
+        source = null
+    }
+}
+
+// 订阅某个子系统的数据，返回取消订阅的函数
+export function subscribeSection(
+    section: StreamSection,
+    onData: SectionListener,
+    onError: ErrorListener
+): () => void {
+    if (!listeners.has(section)) listeners.set(section, new Set())
+    listeners.get(section)!.add(onData)
+    errorListeners.add(onError)
+
+    if (!source) {
+        open()
+    } else if (state[section] !== undefined) {
+        onData(state[section])
+    }
+
+    return () => {
+        listeners.get(section)?.delete(onData)
+        errorListeners.delete(onError)
+        closeIfIdle()
+    }
+}
+
+// 订阅告警变化，返回取消订阅的函数
+export function subscribeAlerts(onAlerts: (event: AlertsEvent) => void): () => void {
+    alertListeners.add(onAlerts)
+    if (!source) {
+        open()
+    } else if (alerts) {
+        onAlerts(alerts)
+    }
+    return () => {
+        alertListeners.delete(onAlerts)
+        closeIfIdle()
+    }
+}
+
+// 浏览器不支持EventSource时，store退回到定时轮询
+export const streamSupported = typeof EventSource !== 'undefined'
@@ -1,5 +1,5 @@
 import axios from 'axios'
-import type { CpuInfo, MemoryInfo, DiskInfo, NetworkInfo, SystemInfo } from '../stores/schema'
+import type { CpuInfo, MemoryInfo, DiskInfo, NetworkInfo, SystemInfo, HistorySeries, ProcessList, CgroupInfo, PressureInfo, SensorsInfo, HistorySeriesList, HostList, SelfInfo, AlertList, SamplingInfo, BurstState, BurstSamples } from '../stores/schema'
 import { apiBaseUrl } from '../config.ts'
 
 // 创建 axios 实例
@@ -11,17 +11,57 @@ const api = axios.create({
 // API 方法
 export const systemApi = {
     // 获取所有系统信息
-    getSystemInfo: () => api.get<SystemInfo>('/system/info'),
+    getSystemInfo: (host?: string) => api.get<SystemInfo>('/system/info', { params: { host } }),
     
     // 获取 CPU 信息
-    getCpuInfo: () => api.get<CpuInfo>('/system/cpu'),
+    getCpuInfo: (host?: string) => api.get<CpuInfo>('/system/cpu', { params: { host } }),
     
     // 获取内存信息
-    getMemoryInfo: () => api.get<MemoryInfo>('/system/memory'),
+    getMemoryInfo: (host?: string) => api.get<MemoryInfo>('/system/memory', { params: { host } }),
     
     // 获取磁盘信息
-    getDiskInfo: () => api.get<DiskInfo>('/system/disk'),
+    getDiskInfo: (host?: string) => api.get<DiskInfo>('/system/disk', { params: { host } }),
     
     // 获取网络信息
-    getNetworkInfo: () => api.get<NetworkInfo>('/system/network')
+    getNetworkInfo: (host?: string) => api.get<NetworkInfo>('/system/network', { params: { host } }),
+    
+    // 获取PSI、系统负载和缺页/换页/OOM计数
+    getPressureInfo: (host?: string) => api.get<PressureInfo>('/system/pressure', { params: { host } }),
+    
+    // 获取温度传感器和CPU热降频计数
+    getSensorsInfo: (host?: string) => api.get<SensorsInfo>('/system/sensors', { params: { host } }),
+    
+    // 获取cgroup（容器）资源使用
+    getCgroupInfo: (host?: string) => api.get<CgroupInfo>('/system/cgroups', { params: { host } }),
+    
+    // 获取资源占用最高的进程
+    getProcesses: (sort: 'cpu' | 'memory' = 'cpu', limit = 20) =>
+        api.get<ProcessList>('/system/processes', { params: { sort, limit } }),
+    
+    // 获取指标历史（since为负数时表示相对当前时间的秒数；points为图表宽度时由后端用LTTB降采样）
+    getHistory: (metric: string, since = -600, step?: number, host?: string, points?: number) =>
+        api.get<HistorySeries>('/system/history', { params: { metric, since, step, host, points } }),
+    
+    // 一次获取多个指标的历史（metric可以包含*通配符，例如cpu.core.*）
+    getHistorySeries: (metric: string, since = -600, points?: number, host?: string) =>
+        api.get<HistorySeriesList>('/system/history/series', { params: { metric, since, points, host }, timeout: 30000 }),
+    
+    // 获取监控程序自身的开销（进程CPU/内存和各采集的耗时统计）
+    getSelfInfo: () => api.get<SelfInfo>('/system/self'),
+    
+    // 获取触发中和待定的告警（规则在服务端每次采样时求值）
+    getAlerts: (host?: string) => api.get<AlertList>('/system/alerts', { params: { host } }),
+    
+    // 获取各子系统的基础采样周期、当前（自适应）周期和高频采样状态
+    getSampling: () => api.get<SamplingInfo>('/system/sampling'),
+    
+    // 临时以interval秒的周期高频采样一个子系统，持续duration秒
+    startBurst: (section = 'cpu', interval = 0.1, duration = 60) =>
+        api.post<BurstState & { section: string }>('/system/burst', null, { params: { section, interval, duration } }),
+    
+    // 获取正在进行或最近一次高频采样中某个指标的原始采样
+    getBurst: (metric: string) => api.get<BurstSamples>('/system/burst', { params: { metric } }),
+    
+    // 获取主机列表（aggregator模式下各system接口可通过host参数查询对应主机）
+    getHosts: () => api.get<HostList>('/hosts')
 }
\ No newline at end of file
@@ -1,14 +1,34 @@
 import { defineStore } from 'pinia'
 import { systemApi } from '../api/system.ts'
-import { ref } from 'vue'
+import { subscribeSection, streamSupported } from '../api/stream.ts'
+import { ref, shallowRef } from 'vue'
 import type { CpuInfo, MemoryInfo, DiskInfo, NetworkInfo, SystemInfo } from './schema'
 
+// 轮询：每次请求完成后按后端返回的当前采样周期（sample_interval，随自适应采样和burst变化）
+// 安排下一次请求，后端未返回时使用fallback毫秒；返回停止函数
+function poll(fetch: () => Promise<void>, sampleInterval: () => number | undefined, fallback: number): () => void {
+    let timer: number | null = null
+    let stopped = false
+    const tick = async () => {
+        await fetch()
+        if (stopped) return
+        const seconds = sampleInterval()
+        timer = window.setTimeout(tick, seconds ? seconds * 1000 : fallback)
+    }
+    tick() // 立即获取一次数据
+    return () => {
+        stopped = true
+        if (timer) clearTimeout(timer)
+    }
+}
+
 // CPU Store
 export const useCpuStore = defineStore('cpu', () => {
-    const cpuInfo = ref<CpuInfo | null>(null)
+    // 快照整体替换，不需要深层响应（128核时每次更新会为数组的每个元素建立代理）
+    const cpuInfo = shallowRef<CpuInfo | null>(null)
     const loading = ref(true)
     const error = ref<string | null>(null)
-    let intervalId: number | null = null
+    let unsubscribe: (() => void) | null = null
 
     async function fetchCpuInfo() {
         try {
@@ -23,16 +43,25 @@ export const useCpuStore = defineStore('cpu', () => {
         }
     }
 
+    // 订阅后端推送流；浏览器不支持时轮询，interval为后端未返回采样周期时的轮询间隔
     function startAutoUpdate(interval = 3000) {
-        if (intervalId) return
-        fetchCpuInfo() // 立即获取一次数据
-        intervalId = window.setInterval(fetchCpuInfo, interval)
+        if (unsubscribe) return
+        if (streamSupported) {
+            unsubscribe = subscribeSection('cpu', (data) => {
+                cpuInfo.value = data
+                loading.value = false
+            }, (message) => {
+                error.value = message
+            })
+            return
+        }
+        unsubscribe = poll(fetchCpuInfo, () => cpuInfo.value?.sample_interval, interval)
     }
 
     function stopAutoUpdate() {
-        if (intervalId) {
-            clearInterval(intervalId)
-            intervalId = null
+        if (unsubscribe) {
+            unsubscribe()
+            unsubscribe = null
         }
     }
 
@@ -48,10 +77,10 @@ export const useCpuStore = defineStore('cpu', () => {
 
 // Memory Store
 export const useMemoryStore = defineStore('memory', () => {
-    const memoryInfo = ref<MemoryInfo | null>(null)
+    const memoryInfo = shallowRef<MemoryInfo | null>(null)
     const loading = ref(true)
     const error = ref<string | null>(null)
-    let intervalId: number | null = null
+    let unsubscribe: (() => void) | null = null
 
     async function fetchMemoryInfo() {
         try {
@@ -66,16 +95,25 @@ export const useMemoryStore = defineStore('memory', () => {
         }
     }
 
+    // 订阅后端推送流；浏览器不支持时轮询，interval为后端未返回采样周期时的轮询间隔
     function startAutoUpdate(interval = 3000) {
-        if (intervalId) return
-        fetchMemoryInfo()
-        intervalId = window.setInterval(fetchMemoryInfo, interval)
+        if (unsubscribe) return
+        if (streamSupported) {
+            unsubscribe = subscribeSection('memory', (data) => {
+                memoryInfo.value = data
+                loading.value = false
+            }, (message) => {
+                error.value = message
+            })
+            return
+        }
+        unsubscribe = poll(fetchMemoryInfo, () => memoryInfo.value?.sample_interval, interval)
     }
 
     function stopAutoUpdate() {
-        if (intervalId) {
-            clearInterval(intervalId)
-            intervalId = null
+        if (unsubscribe) {
+            unsubscribe()
+            unsubscribe = null
         }
     }
 
@@ -91,10 +129,10 @@ export const useMemoryStore = defineStore('memory', () => {
 
 // Disk Store
 export const useDiskStore = defineStore('disk', () => {
-    const diskInfo = ref<DiskInfo | null>(null)
+    const diskInfo = shallowRef<DiskInfo | null>(null)
     const loading = ref(true)
     const error = ref<string | null>(null)
-    let intervalId: number | null = null
+    let unsubscribe: (() => void) | null = null
 
     async function fetchDiskInfo() {
         try {
@@ -109,16 +147,25 @@ export const useDiskStore = defineStore('disk', () => {
         }
     }
 
+    // 订阅后端推送流；浏览器不支持时轮询，interval为后端未返回采样周期时的轮询间隔
     function startAutoUpdate(interval = 10000) { // 磁盘信息可以更新得慢一些
-        if (intervalId) return
-        fetchDiskInfo()
-        intervalId = window.setInterval(fetchDiskInfo, interval)
+        if (unsubscribe) return
+        if (streamSupported) {
+            unsubscribe = subscribeSection('disk', (data) => {
+                diskInfo.value = data
+                loading.value = false
+            }, (message) => {
+                error.value = message
+            })
+            return
+        }
+        unsubscribe = poll(fetchDiskInfo, () => diskInfo.value?.sample_interval, interval)
     }
 
     function stopAutoUpdate() {
-        if (intervalId) {
-            clearInterval(intervalId)
-            intervalId = null
+        if (unsubscribe) {
+            unsubscribe()
+            unsubscribe = null
         }
     }
 
@@ -134,10 +181,10 @@ export const useDiskStore = defineStore('disk', () => {
 
 // Network Store
 export const useNetworkStore = defineStore('network', () => {
-    const networkInfo = ref<NetworkInfo | null>(null)
+    const networkInfo = shallowRef<NetworkInfo | null>(null)
     const loading = ref(true)
     const error = ref<string | null>(null)  
-    let intervalId: number | null = null
+    let unsubscribe: (() => void) | null = null
 
     async function fetchNetworkInfo() {
         try {
@@ -152,16 +199,25 @@ export const useNetworkStore = defineStore('network', () => {
         }
     }
 
+    // 订阅后端推送流；浏览器不支持时轮询，interval为后端未返回采样周期时的轮询间隔
     function startAutoUpdate(interval = 2000) { // 网络信息可以更新得更频繁
-        if (intervalId) return
-        fetchNetworkInfo()
-        intervalId = window.setInterval(fetchNetworkInfo, interval)
+        if (unsubscribe) return
+        if (streamSupported) {
+            unsubscribe = subscribeSection('network', (data) => {
+                networkInfo.value = data
+                loading.value = false
+            }, (message) => {
+                error.value = message
+            })
+            return
+        }
+        unsubscribe = poll(fetchNetworkInfo, () => networkInfo.value?.sample_interval, interval)
     }
 
     function stopAutoUpdate() {
-        if (intervalId) {
-            clearInterval(intervalId)
-            intervalId = null
+        if (unsubscribe) {
+            unsubscribe()
+            unsubscribe = null
         }
     }
 
@@ -1,10 +1,18 @@
 
+export type CpuBreakdownField = 'user' | 'system' | 'iowait' | 'irq' | 'steal' | 'guest'
+
 export interface CpuInfo {
+    cpu_percent?: number
     cpu_per_core: number[]
+    cpu_breakdown?: Record<CpuBreakdownField, number>
+    cpu_per_core_breakdown?: Record<CpuBreakdownField, number[]>
     cpu_freq_current: number
     cpu_freq_min: number
     cpu_freq_max: number
+    cpu_freq_per_core?: (number | null)[]
     cpu_count: number
+    snapshot_age?: number
+    sample_interval?: number
 }
 
 export interface MemoryInfo {
@@ -16,6 +24,19 @@ export interface MemoryInfo {
     swap_used: number
     swap_free: number
     swap_percent: number
+    snapshot_age?: number
+    sample_interval?: number
+}
+
+export interface DiskIOInfo {
+    device: string
+    read_bytes_rate: number
+    write_bytes_rate: number
+    read_iops: number
+    write_iops: number
+    await_ms: number
+    util_percent: number
+    queue_depth: number
 }
 
 export interface DiskInfo {
@@ -27,7 +48,59 @@ export interface DiskInfo {
         used: number
         free: number
         percent: number
+        stale?: boolean
     }>
+    io?: DiskIOInfo[]
+    snapshot_age?: number
+    sample_interval?: number
+}
+
+export interface HistorySeries {
+    metric: string
+    resolution: number
+    step: number
+    timestamps: number[]
+    values: Array<number | null>
+    points?: number
+}
+
+export interface HistorySeriesList {
+    series: HistorySeries[]
+    truncated: boolean
+}
+
+export interface ProcessInfo {
+    pid: number
+    name: string
+    state: string
+    cpu_percent: number
+    memory_rss: number
+    memory_percent: number
+    num_threads: number
+}
+
+export interface ProcessList {
+    timestamp: number
+    total: number
+    sort: 'cpu' | 'memory'
+    max_age: number
+    processes: ProcessInfo[]
+}
+
+export interface NetworkInterfaceInfo {
+    name: string
+    bytes_recv: number
+    packets_recv: number
+    errin: number
+    dropin: number
+    bytes_sent: number
+    packets_sent: number
+    errout: number
+    dropout: number
+    bytes_recv_rate: number
+    packets_recv_rate: number
+    bytes_sent_rate: number
+    packets_sent_rate: number
 }
 
 export interface NetworkInfo {
@@ -35,19 +108,99 @@ export interface NetworkInfo {
     bytes_recv: number
     packets_sent: number
     packets_recv: number
+    bytes_sent_rate: number
+    bytes_recv_rate: number
+    packets_sent_rate: number
+    packets_recv_rate: number
+    interfaces: NetworkInterfaceInfo[]
+    snapshot_age?: number
+    sample_interval?: number
 }   
 
 
 // 定义接口类型
+export interface CgroupUsage {
+    name: string
+    cpu_percent: number
+    cpu_limit: number
+    cpu_limit_percent: number
+    throttled_percent: number
+    throttled_time: number
+    memory_current: number
+    memory_working_set: number
+    memory_limit: number
+    memory_percent: number
+    io_read_bytes_rate: number
+    io_write_bytes_rate: number
+    cpu_pressure_some: number | null
+    cpu_pressure_full: number | null
+}
+
+export interface CgroupInfo {
+    version: number
+    current: CgroupUsage | null
+    root: string
+    children: CgroupUsage[]
+    snapshot_age?: number
+    sample_interval?: number
+}
+
+export interface PsiInfo {
+    some_avg10: number
+    some_avg60: number
+    some_avg300: number
+    some_percent: number
+    full_avg10?: number
+    full_avg60?: number
+    full_avg300?: number
+    full_percent?: number
+}
+
+export interface PressureInfo {
+    cpu: PsiInfo | null
+    memory: PsiInfo | null
+    io: PsiInfo | null
+    load1: number
+    load5: number
+    load15: number
+    procs_running: number
+    procs_total: number
+    pgmajfault_rate: number
+    pswpin_rate: number
+    pswpout_rate: number
+    oom_kill: number
+    oom_kill_delta: number
+    snapshot_age?: number
+    sample_interval?: number
+}
+
+export interface TemperatureSensor {
+    sensor: string
+    label: string
+    current: number | null
+    high: number | null
+    critical: number | null
+}
+
+export interface SensorsInfo {
+    temperatures: TemperatureSensor[]
+    thermal_zones: { zone: string, type: string, current: number | null }[]
+    cpu_temperature: number | null
+    max_temperature: number | null
+    throttle: {
+        core_events: number
+        package_events: number
+        core_events_rate: number
+        package_events_rate: number
+        throttled_cpus: number[]
+    } | null
+    snapshot_age?: number
+    sample_interval?: number
+}
+
 export interface SystemInfo {
     timestamp: number
-    cpu: {
-        cpu_per_core: number[]
-        cpu_freq_current: number
-        cpu_freq_min: number
-        cpu_freq_max: number
-        cpu_count: number
-    }
+    cpu: CpuInfo
     memory: {
         memory_total: number
         memory_available: number
@@ -58,21 +211,137 @@ export interface SystemInfo {
         swap_free: number
         swap_percent: number
     }
-    disk: {
-        disks: Array<{
-            device: string
-            mountpoint: string
-            fstype: string
-            total: number
-            used: number
-            free: number
-            percent: number
-        }>
+    disk: DiskInfo
+    network: NetworkInfo
+    cgroup?: CgroupInfo
+    pressure?: PressureInfo
+    sensors?: SensorsInfo
+    snapshot_age?: number
+}
+// 主机列表（aggregator模式下包含所有agent）
+export interface HostInfo {
+    name: string
+    local: boolean
+    online: boolean
+    address: string | null
+    last_seen?: number
+    connected_at?: number | null
+    cpu_percent?: number | null
+    cpu_count?: number | null
+    memory_percent?: number | null
+    frames?: number
+    samples?: number
+    bytes?: number
+    history_series?: number
+    alerts_firing?: number
+}
+
+export interface HostList {
+    mode: 'standalone' | 'agent' | 'aggregator'
+    hosts: HostInfo[]
+    ingest?: {
+        listening: boolean
+        connections: number
+        frames: number
+        samples: number
+        bytes: number
+        errors: number
+        samples_per_sec: number
+    }
+    agent?: {
+        host: string
+        aggregator: string
+        connected: boolean
+        pending: number
+        sent_frames: number
+        sent_bytes: number
+        dropped: number
     }
-    network: {
-        bytes_sent: number
-        bytes_recv: number
-        packets_sent: number
-        packets_recv: number
+}
+// 监控程序自身的开销（/api/system/self）
+export interface CollectorStats {
+    calls: number
+    errors: number
+    fallbacks: number
+    bytes_read: number
+    total_seconds: number
+    cpu_seconds: number
+    mean_ms: number | null
+    p50_ms: number | null
+    p99_ms: number | null
+    max_ms: number
+    last_ms: number
+    histogram: { le: (number | '+Inf')[], counts: number[] }
+    last_error: string | null
+    last_error_at: number | null
+}
+
+export interface SelfInfo {
+    timestamp: number
+    process: {
+        pid: number
+        uptime: number
+        cpu_percent: number
+        cpu_user_seconds: number
+        cpu_system_seconds: number
+        memory_rss: number
+        memory_vms: number
+        num_threads: number
+        num_fds: number | null
     }
-}
\ No newline at end of file
+    collector_cpu_percent: number
+    bytes_read: number
+    errors: number
+    fallbacks: number
+    collectors: Record<string, CollectorStats>
+}
+// 服务端告警（/api/system/alerts 和推送流中的 alerts 事件）
+export interface Alert {
+    rule: string
+    metric: string
+    expr: string
+    severity: string
+    state: 'pending' | 'firing' | 'resolved'
+    value: number | null
+    threshold: number
+    since: number | null
+    fired_at: number | null
+    timestamp?: number
+}
+
+export interface AlertList {
+    timestamp: number
+    alerts: Alert[]
+    recent: Alert[]
+    stats: { rules: number, series: number, windows: number, evaluations: number }
+}
+
+export interface AlertsEvent {
+    timestamp: number
+    change: Alert | null
+    alerts: Alert[]
+}
+// 采样周期（/api/system/sampling）和临时高频采样（/api/system/burst）
+export interface BurstState {
+    interval: number
+    started: number
+    until: number
+    active: boolean
+    samples: number
+}
+
+export interface SamplingInfo {
+    adaptive: boolean
+    sections: Record<string, {
+        base_interval: number
+        interval: number
+        last_sample: number | null
+        burst: BurstState | null
+    }>
+}
+
+export interface BurstSamples extends BurstState {
+    metric: string
+    timestamps: number[]
+    values: (number | null)[]
+}